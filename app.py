@@ -4,10 +4,20 @@ import pandas as pd
 from passlib.hash import pbkdf2_sha256
 
 from config import APP_NAME, APP_ICON
-from database.db_manager import DatabaseManager
-from nlp.parser import NLPParser
+from utils.resources import (
+    get_db,
+    get_parser,
+    load_accounts,
+    load_account_summary,
+    load_accounts_overview,
+    load_categories,
+    load_period_totals,
+    load_report_data,
+    load_search_results,
+    load_transactions_page,
+)
 from utils.data_processor import (
-    transactions_to_dataframe,
+    period_totals_to_dataframe,
     df_to_csv_bytes,
     df_to_excel_bytes,
 )
@@ -17,6 +27,7 @@ from utils.visualizations import (
     create_spending_trend_chart,
 )
 from utils.pdf_generator import generate_pdf_report
+from utils.importer import import_statement
 
 
 # ---------- Initialize app ----------
@@ -29,11 +40,11 @@ st.set_page_config(
 
 st.title(f"{APP_ICON} {APP_NAME}")
 
-# Connect to database
-db = DatabaseManager()
+# Connect to database (shared by all sessions, created once per process)
+db = get_db()
 
-# NLP parser
-parser = NLPParser()
+# NLP parser (shared by all sessions)
+parser = get_parser()
 
 
 # ---------- Auth utilities ----------
@@ -222,7 +233,7 @@ st.sidebar.markdown("---")
 
 st.sidebar.header("Accounts")
 
-accounts = db.get_all_accounts(user_id=CURRENT_USER_ID)
+accounts = load_accounts(user_id=CURRENT_USER_ID)
 selected_account = None
 
 # --- Select existing account ---
@@ -287,6 +298,43 @@ if accounts:
 else:
     st.sidebar.info("No accounts to delete.")
 
+# --- Import bank statement ---
+st.sidebar.subheader("Import Statement")
+
+if selected_account:
+    statement_file = st.sidebar.file_uploader(
+        "CSV or Excel (.xlsx) bank statement",
+        type=["csv", "xlsx"],
+        key="statement_upload",
+    )
+    if statement_file is not None and st.sidebar.button(
+        f"Import into '{selected_account['name']}'"
+    ):
+        try:
+            with st.spinner("Importing statement..."):
+                import_result = import_statement(
+                    db, selected_account["id"], statement_file
+                )
+        except Exception as e:
+            st.sidebar.error(f"Import failed: {e}")
+        else:
+            st.sidebar.success(
+                f"Imported {import_result.inserted} transactions "
+                f"({import_result.error_count} rows skipped)."
+            )
+            if import_result.errors:
+                with st.sidebar.expander("Skipped rows"):
+                    st.dataframe(
+                        pd.DataFrame(
+                            [
+                                {"Line": err.line, "Problem": err.message}
+                                for err in import_result.errors
+                            ]
+                        )
+                    )
+else:
+    st.sidebar.info("Create an account to import a statement.")
+
 
 # ---------- Main UI ----------
 
@@ -297,22 +345,22 @@ if selected_account:
         if not accounts:
             st.info("No accounts available.")
         else:
-            rows = []
-            for acc in accounts:
-                acc_summary = db.get_account_summary(account_id=acc["id"])
-                rows.append(
-                    {
-                        "Account": acc["name"],
-                        "Total Income": acc_summary["total_income"],
-                        "Total Expenses": acc_summary["total_expense"],
-                        "Balance": acc_summary["balance"],
-                    }
-                )
+            rows = [
+                {
+                    "Account": acc["name"],
+                    "Total Income": acc["total_income"],
+                    "Total Expenses": acc["total_expense"],
+                    "Balance": acc["balance"],
+                    "Transactions": acc["transaction_count"],
+                    "Last Activity": acc["last_activity"],
+                }
+                for acc in load_accounts_overview(user_id=CURRENT_USER_ID)
+            ]
             overview_df = pd.DataFrame(rows)
             st.dataframe(overview_df)
 
     # ---------- Account Summary Section ----------
-    summary = db.get_account_summary(account_id=selected_account["id"])
+    summary = load_account_summary(account_id=selected_account["id"])
 
     st.subheader(f"Account Summary — {selected_account['name']}")
 
@@ -346,13 +394,20 @@ if selected_account:
             try:
                 parsed = parser.parse(text_input)
 
+                # The user's own history beats the generic keyword rules
+                category = (
+                    db.suggest_category(CURRENT_USER_ID, parsed.description)
+                    or parsed.category
+                    or ""
+                )
+
                 # Insert into DB
                 db.add_transaction(
                     account_id=selected_account["id"],
                     trans_type=parsed.trans_type,
                     amount=parsed.amount,
                     description=parsed.description,
-                    category=parsed.category or "",
+                    category=category,
                     transaction_date=parsed.transaction_date.isoformat(),
                 )
 
@@ -416,33 +471,99 @@ if selected_account:
         category_filter_text.strip() if category_filter_text.strip() else None
     )
 
-    # Fetch filtered transactions
-    txns = db.get_transactions(
+    # ---------- Search ----------
+    search_text = st.text_input(
+        "Search descriptions",
+        placeholder='e.g. coffee, "electricity bill", star*',
+        help=(
+            'All words must match. Use "quotes" for an exact phrase and * for a prefix. '
+            "Archived years are not searched."
+        ),
+        key="txn_search",
+    )
+    if search_text.strip():
+        search_results = load_search_results(
+            account_id=selected_account["id"],
+            query=search_text,
+            start_date=start_date_str,
+            end_date=end_date_str,
+            trans_type=trans_type_filter,
+            category=category_filter,
+            limit=100,
+        )
+        if search_results:
+            st.caption(f"Best {len(search_results)} match(es) for the current filters")
+            st.dataframe(search_results)
+        else:
+            st.info("No transactions match your search.")
+
+    # ---------- Paged transaction table ----------
+    page_size = st.selectbox(
+        "Rows per page",
+        [25, 50, 100, 250],
+        index=1,
+        key="txn_page_size",
+    )
+
+    # Keyset cursors of the pages visited so far (None = first page).
+    # Any change of account, filters or page size starts again at page 1.
+    page_filters = (
+        selected_account["id"],
+        start_date_str,
+        end_date_str,
+        trans_type_filter,
+        category_filter,
+        page_size,
+    )
+    if st.session_state.get("txn_page_filters") != page_filters:
+        st.session_state["txn_page_filters"] = page_filters
+        st.session_state["txn_page_cursors"] = [None]
+    page_cursors = st.session_state["txn_page_cursors"]
+
+    page_txns, next_cursor = load_transactions_page(
         account_id=selected_account["id"],
         start_date=start_date_str,
         end_date=end_date_str,
         trans_type=trans_type_filter,
         category=category_filter,
+        limit=page_size,
+        after=page_cursors[-1],
     )
 
-    # ---------- Table + Downloads ----------
-    if not txns:
+    if page_txns:
+        st.dataframe(page_txns)
+    elif len(page_cursors) == 1:
         st.info("No transactions found for selected filters.")
-        df = transactions_to_dataframe(txns)  # empty DF
     else:
-        st.dataframe(txns)
-
-        df = transactions_to_dataframe(txns)
+        st.info("No more transactions on this page.")
+
+    nav_prev, nav_info, nav_next = st.columns([1, 2, 1])
+    if nav_prev.button(
+        "◀ Newer", disabled=len(page_cursors) == 1, key="txn_page_prev"
+    ):
+        page_cursors.pop()
+        st.rerun()
+    nav_info.caption(f"Page {len(page_cursors)}")
+    if nav_next.button(
+        "Older ▶", disabled=next_cursor is None, key="txn_page_next"
+    ):
+        page_cursors.append(next_cursor)
+        st.rerun()
+
+    # Full filtered set for the downloads (fetched column-wise into pandas)
+    # and the summary for the filtered range, from one consistent snapshot
+    df, filtered_summary = load_report_data(
+        account_id=selected_account["id"],
+        start_date=start_date_str,
+        end_date=end_date_str,
+        trans_type=trans_type_filter,
+        category=category_filter,
+    )
 
+    # ---------- Downloads ----------
+    if not df.empty:
         st.markdown("### Download Data")
 
-        # Summary for current filtered range
-        filtered_summary = db.get_account_summary(
-            account_id=selected_account["id"],
-            start_date=start_date_str,
-            end_date=end_date_str,
-        )
-
         col_d1, col_d2, col_d3 = st.columns(3)
 
         with col_d1:
@@ -484,7 +605,28 @@ if selected_account:
     # ---------- Dashboard: Charts ----------
     st.subheader("Dashboard")
 
-    df = transactions_to_dataframe(txns)
+    # Charts are drawn from pre-aggregated (period, category, type) totals:
+    # whole months come from the monthly rollup table, so long ranges stay
+    # cheap. Short ranges are bucketed by day for a finer trend line.
+    if (
+        start_date_str is not None
+        and end_date_str is not None
+        and date.fromisoformat(end_date_str) - date.fromisoformat(start_date_str)
+        <= timedelta(days=92)
+    ):
+        granularity = "day"
+    else:
+        granularity = "month"
+
+    period_totals = load_period_totals(
+        account_id=selected_account["id"],
+        start_date=start_date_str,
+        end_date=end_date_str,
+        trans_type=trans_type_filter,
+        category=category_filter,
+        granularity=granularity,
+    )
+    df = period_totals_to_dataframe(period_totals)
 
     if df.empty:
         st.info("Not enough data to display charts. Add some transactions first.")
@@ -506,33 +648,30 @@ if selected_account:
     # ---------- Manage Transactions ----------
     st.subheader("Manage Transactions")
 
-    if not txns:
+    if not page_txns:
         st.info("No transactions available to edit or delete.")
     else:
         # ----- Edit Transaction -----
         st.markdown("#### Edit Transaction")
 
-        # Build simple list of (id, label) for selection
-        txn_options = []
-        for t in txns:
-            label = (
-                f"[{t['id']}] {t['transaction_date']} | {t['type']} | "
-                f"{t['amount']} | {t.get('description', '')}"
+        # Only the rows of the current page are offered, so the selectbox
+        # stays small however many transactions the account has.
+        page_txns_by_id = {t["id"]: t for t in page_txns}
+
+        def describe_txn(tid: int) -> str:
+            txn = page_txns_by_id[tid]
+            return (
+                f"[{tid}] {txn['transaction_date']} | {txn['type']} | "
+                f"{txn['amount']} | {txn.get('description', '')}"
             )
-            txn_options.append((t["id"], label))
 
-        txn_labels = [opt[1] for opt in txn_options]
-        selected_label = st.selectbox(
-            "Choose a transaction to edit",
-            txn_labels,
+        selected_txn_id = st.selectbox(
+            "Choose a transaction to edit (current page)",
+            list(page_txns_by_id),
+            format_func=describe_txn,
             key="edit_txn_select",
         )
-
-        # Get the selected transaction id + dict
-        selected_txn_id = next(
-            tid for tid, lbl in txn_options if lbl == selected_label
-        )
-        selected_txn = next(t for t in txns if t["id"] == selected_txn_id)
+        selected_txn = page_txns_by_id[selected_txn_id]
 
         with st.form("edit_txn_form"):
             # Type
@@ -556,17 +695,41 @@ if selected_account:
                 value=selected_txn.get("description", "") or "",
             )
 
-            # Category
-            new_category = st.text_input(
+            # Category: pick one of the user's categories or type a new one.
+            # Names are matched case-insensitively, so retyping an existing
+            # category in another case reuses it.
+            category_names = [
+                c["name"] for c in load_categories(user_id=CURRENT_USER_ID)
+            ]
+            current_category = selected_txn.get("category") or ""
+            category_options = ["(none)"] + category_names
+            picked_category = st.selectbox(
                 "Category",
-                value=selected_txn.get("category", "") or "",
+                category_options,
+                index=(
+                    category_options.index(current_category)
+                    if current_category in category_options
+                    else 0
+                ),
+            )
+            typed_category = st.text_input(
+                "Or new category",
+                placeholder="Leave empty to use the selection above",
             )
+            if typed_category.strip():
+                new_category = typed_category.strip()
+            elif picked_category == "(none)":
+                new_category = ""
+            else:
+                new_category = picked_category
 
             # Date
-            try:
-                current_date_obj = date.fromisoformat(selected_txn["transaction_date"])
-            except Exception:
-                current_date_obj = date.today()
+            current_date_obj = selected_txn["transaction_date"]
+            if not isinstance(current_date_obj, date):
+                try:
+                    current_date_obj = date.fromisoformat(str(current_date_obj))
+                except ValueError:
+                    current_date_obj = date.today()
 
             new_date = st.date_input(
                 "Transaction Date",
@@ -593,21 +756,21 @@ if selected_account:
         # ----- Delete Transaction -----
         st.markdown("#### Delete Transaction")
 
+        # Same rows as the edit selector: only transactions of the selected
+        # account that this session is looking at can be deleted.
         with st.form("delete_txn_form"):
-            del_id = st.number_input(
-                "Enter Transaction ID to delete",
-                min_value=1,
-                step=1,
-                help="Use the ID shown in the transactions table above.",
+            del_id = st.selectbox(
+                "Choose a transaction to delete (current page)",
+                list(page_txns_by_id),
+                format_func=describe_txn,
+                key="delete_txn_select",
             )
             del_submit = st.form_submit_button("Delete Transaction")
 
             if del_submit:
                 try:
-                    db.delete_transaction(int(del_id))
-                    st.success(
-                        f"Deleted transaction with ID {int(del_id)} (if it existed)."
-                    )
+                    db.delete_transaction(del_id)
+                    st.success(f"Deleted transaction ID {del_id}.")
                     st.rerun()
                 except Exception as e:
                     st.error(f"Error deleting transaction: {e}")
@@ -0,0 +1,92 @@
+"""
+DatabaseManager.add_transactions_bulk throughput.
+
+Every imported row also has to reach account_balances, monthly_rollups
+and the full-text index. Bulk imports update those with one grouped
+statement per batch instead of per-row triggers (migration 0010); this
+guards that path.
+
+This inserts the given number of rows into a fresh database (20
+accounts, a handful of categories, three years of dates) and checks the
+derived tables against a full recomputation afterwards.
+
+The script exits with status 1 when the rate is below MIN_ROWS_PER_SEC,
+i.e. when a million rows would take longer than MAX_SECONDS_PER_MILLION.
+On one CPU, 200k rows took 17.0s with the per-row triggers and 5.0s
+without; most of what is left is maintaining the two covering indexes
+on transactions.
+
+Run from the project root:
+    python -m benchmarks.bench_bulk_import            # 200k rows
+    python -m benchmarks.bench_bulk_import 1000000
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import Iterator, Tuple
+
+from database.db_manager import DatabaseManager
+
+
+DEFAULT_ROWS = 200_000
+ACCOUNTS = 20
+POOL_SIZE = 4096
+MAX_SECONDS_PER_MILLION = 35.0
+MIN_ROWS_PER_SEC = 1_000_000 / MAX_SECONDS_PER_MILLION
+
+CATEGORIES = ["Groceries", "Rent", "Transport", "Salary", "Entertainment", ""]
+WORDS = ["coffee", "uber", "rent", "salary", "grocery", "netflix", "fuel", "pharmacy"]
+
+
+def statement_rows(
+    account_ids, rows: int, seed: int = 5
+) -> Iterator[Tuple[int, str, float, str, str, str]]:
+    """
+    `rows` statement rows cycled from a pool of POOL_SIZE random ones, so
+    that generating them costs little next to the import itself.
+    """
+    rng = random.Random(seed)
+    pool = [
+        (
+            "income" if rng.random() < 0.1 else "expense",
+            round(rng.uniform(1, 5_000), 2),
+            f"{rng.choice(WORDS)} {rng.choice(WORDS)} {i % 997}",
+            rng.choice(CATEGORIES),
+            f"{rng.randint(2022, 2024)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+        )
+        for i in range(POOL_SIZE)
+    ]
+    accounts = len(account_ids)
+    for i in range(rows):
+        yield (account_ids[i % accounts],) + pool[i % POOL_SIZE]
+
+
+def main() -> int:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ROWS
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(db_path=os.path.join(tmp, "bulk.db"), durability="batched")
+        try:
+            user_id = db.create_user("bench", "x")
+            account_ids = [db.add_account(user_id, f"Account {i}") for i in range(ACCOUNTS)]
+
+            started = time.perf_counter()
+            inserted = db.add_transactions_bulk(statement_rows(account_ids, rows))
+            elapsed = time.perf_counter() - started
+
+            consistent = not db.verify_account_balances() and not db.verify_monthly_rollups()
+            found = len(db.search_transactions(account_ids[0], "coffee", limit=5))
+        finally:
+            db.close()
+
+    rate = inserted / elapsed
+    print(f"{inserted} rows in {elapsed:.2f}s: {rate:,.0f} rows/s")
+    print(f"1M rows would take {1_000_000 / rate:.1f}s (budget {MAX_SECONDS_PER_MILLION:.0f}s)")
+    print(f"balances and rollups consistent: {consistent}; search finds rows: {found > 0}")
+    return 0 if rate >= MIN_ROWS_PER_SEC and consistent and found else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+"""
+Read/write throughput of DatabaseManager with 1, 8 and 32 concurrent clients.
+
+Each client is a thread sharing one DatabaseManager, the same way Streamlit
+sessions share it inside one server process. Row conversion happens in
+Python under the GIL, so read throughput per process stays roughly flat as
+clients are added; what the pool buys is that reads and writes no longer
+wait on (or fail with "database is locked" because of) each other.
+
+Run from the project root:
+    python -m benchmarks.bench_db_pool
+"""
+
+import os
+import random
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+from typing import Callable, List
+
+from database.db_manager import DatabaseManager
+
+
+CLIENT_COUNTS = [1, 8, 32]
+DURATION_SECONDS = 2.0
+SEED_ROWS = 5_000
+
+
+def seed(db: DatabaseManager, user_id: int) -> int:
+    account_id = db.add_account(user_id, "Bench")
+    start = date.today() - timedelta(days=365)
+    for i in range(SEED_ROWS):
+        db.add_transaction(
+            account_id=account_id,
+            trans_type="expense" if i % 4 else "income",
+            amount=10 + i % 100,
+            description=f"seed {i}",
+            category="Groceries",
+            transaction_date=(start + timedelta(days=i % 365)).isoformat(),
+        )
+    return account_id
+
+
+def run_clients(clients: int, work: Callable[[], None]) -> float:
+    """Run `work` in a loop on `clients` threads; return operations/second."""
+    counts: List[int] = [0] * clients
+    stop = threading.Event()
+
+    def loop(idx: int) -> None:
+        while not stop.is_set():
+            work()
+            counts[idx] += 1
+
+    threads = [threading.Thread(target=loop, args=(i,)) for i in range(clients)]
+    for t in threads:
+        t.start()
+    time.sleep(DURATION_SECONDS)
+    stop.set()
+    for t in threads:
+        t.join()
+    return sum(counts) / DURATION_SECONDS
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(db_path=os.path.join(tmp, "bench.db"))
+        user_id = db.create_user("bench", "x")
+        account_id = seed(db, user_id)
+        # Writes go to their own account so the read workload stays the same size.
+        write_account_id = db.add_account(user_id, "Bench writes")
+        recent = (date.today() - timedelta(days=30)).isoformat()
+
+        def read() -> None:
+            db.get_transactions(account_id, start_date=recent)
+            db.get_account_summary(account_id)
+
+        def write() -> None:
+            db.add_transaction(
+                account_id=write_account_id,
+                trans_type="expense",
+                amount=1,
+                description="bench write",
+                category="",
+                transaction_date=date.today().isoformat(),
+            )
+
+        def mixed() -> None:
+            # Roughly one write per nine reads, like an interactive dashboard.
+            if random.random() < 0.1:
+                write()
+            else:
+                read()
+
+        print(f"pool_size={db.pool.pool_size}, {DURATION_SECONDS:.0f}s per run\n")
+        print(f"{'clients':>8} {'reads/s':>12} {'writes/s':>12} {'mixed ops/s':>12}")
+        for clients in CLIENT_COUNTS:
+            reads = run_clients(clients, read)
+            writes = run_clients(clients, write)
+            mixed_ops = run_clients(clients, mixed)
+            print(f"{clients:>8} {reads:>12.0f} {writes:>12.0f} {mixed_ops:>12.0f}")
+
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Dict path vs columnar path for loading transactions into pandas.
+
+- dict path:     DatabaseManager.get_transactions + transactions_to_dataframe
+- columnar path: DatabaseManager.get_transactions_frame
+
+For each size the account is filled with synthetic rows, then both paths
+load all of them. Reported: wall time, peak Python-tracked memory during
+the load (tracemalloc, includes NumPy buffers) and the final DataFrame
+size.
+
+Run from the project root:
+    python -m benchmarks.bench_fetch                 # 10k, 100k, 1M rows
+    python -m benchmarks.bench_fetch 10000 50000     # custom sizes
+"""
+
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+from typing import Callable, Tuple
+
+import pandas as pd
+
+from database.db_manager import DatabaseManager
+from utils.data_processor import transactions_to_dataframe
+
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+CATEGORIES = ["Groceries", "Transport", "Rent", "Utilities", ""]
+
+
+def measure(load: Callable[[], pd.DataFrame]) -> Tuple[float, float, float]:
+    """
+    Return (seconds, peak MiB, frame MiB) for `load`. Timing and memory
+    are separate calls because tracemalloc slows allocation down a lot.
+    """
+    gc.collect()
+    started = time.perf_counter()
+    df = load()
+    seconds = time.perf_counter() - started
+    frame = df.memory_usage(deep=True).sum()
+    del df
+
+    gc.collect()
+    tracemalloc.start()
+    load()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, peak / 2**20, frame / 2**20
+
+
+def main() -> None:
+    sizes = [int(a) for a in sys.argv[1:]] or DEFAULT_SIZES
+    first_day = date(2015, 1, 1)
+
+    print(
+        f"{'rows':>9}  {'path':<9} {'seconds':>8} {'peak MiB':>9} {'frame MiB':>10}"
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(db_path=os.path.join(tmp, "bench.db"))
+        user_id = db.create_user("bench", "x")
+        for size in sizes:
+            account_id = db.add_account(user_id, f"Account {size}")
+            db.add_transactions_bulk(
+                (
+                    account_id,
+                    "income" if i % 9 == 0 else "expense",
+                    1 + (i * 37) % 5000 / 10,
+                    f"synthetic transaction {i}",
+                    CATEGORIES[i % len(CATEGORIES)],
+                    (first_day + timedelta(days=i % 3650)).isoformat(),
+                )
+                for i in range(size)
+            )
+
+            paths = {
+                "dict": lambda: transactions_to_dataframe(db.get_transactions(account_id)),
+                "columnar": lambda: db.get_transactions_frame(account_id),
+            }
+            for name, load in paths.items():
+                seconds, peak, frame = measure(load)
+                print(f"{size:>9,}  {name:<9} {seconds:>8.3f} {peak:>9.1f} {frame:>10.1f}")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Transaction writes per second with and without group commit, for each
+durability setting.
+
+- direct: every add_transaction is its own commit (the default).
+- group:  add_transaction waits on the group-commit queue, so concurrent
+          clients share commits.
+- async:  one client submits add_transaction_async calls without waiting
+          and collects the futures at the end (e.g. an import).
+
+Clients are threads sharing one DatabaseManager, as Streamlit sessions do.
+The gap between "strict" and "batched" depends on how expensive fsync is
+on the disk the temp directory lives on.
+
+Run from the project root:
+    python -m benchmarks.bench_group_commit
+"""
+
+import os
+import tempfile
+import threading
+import time
+from datetime import date
+from typing import List
+
+from database.db_manager import DatabaseManager
+from database.pool import DURABILITY
+
+
+CLIENT_COUNTS = [1, 8, 32]
+DURATION_SECONDS = 2.0
+ASYNC_WRITES = 5_000
+
+
+def write(db: DatabaseManager, account_id: int) -> None:
+    db.add_transaction(
+        account_id=account_id,
+        trans_type="expense",
+        amount=1,
+        description="bench write",
+        category="Groceries",
+        transaction_date=date.today().isoformat(),
+    )
+
+
+def run_clients(db: DatabaseManager, account_id: int, clients: int) -> float:
+    """Call add_transaction in a loop on `clients` threads; return writes/second."""
+    counts: List[int] = [0] * clients
+    stop = threading.Event()
+
+    def loop(idx: int) -> None:
+        while not stop.is_set():
+            write(db, account_id)
+            counts[idx] += 1
+
+    threads = [threading.Thread(target=loop, args=(i,)) for i in range(clients)]
+    for t in threads:
+        t.start()
+    time.sleep(DURATION_SECONDS)
+    stop.set()
+    for t in threads:
+        t.join()
+    return sum(counts) / DURATION_SECONDS
+
+
+def run_async(db: DatabaseManager, account_id: int) -> float:
+    """Submit ASYNC_WRITES writes from one thread, then wait for all of them."""
+    start = time.perf_counter()
+    futures = [
+        db.add_transaction_async(
+            account_id, "expense", 1, "bench write", "Groceries", date.today().isoformat()
+        )
+        for _ in range(ASYNC_WRITES)
+    ]
+    for f in futures:
+        f.result()
+    return ASYNC_WRITES / (time.perf_counter() - start)
+
+
+def main() -> None:
+    print(f"{DURATION_SECONDS:.0f}s per run; async = {ASYNC_WRITES:,} pipelined writes\n")
+    header = "".join(f"{f'{c} clients':>12}" for c in CLIENT_COUNTS)
+    print(f"{'durability':<11}{'mode':<7}{header}{'async':>12}   (writes/s)")
+
+    for durability in DURABILITY:
+        for group_commit in (False, True):
+            with tempfile.TemporaryDirectory() as tmp:
+                db = DatabaseManager(
+                    db_path=os.path.join(tmp, "bench.db"),
+                    durability=durability,
+                    group_commit=group_commit,
+                )
+                account_id = db.add_account(db.create_user("bench", "x"), "Bench")
+                rates = [run_clients(db, account_id, c) for c in CLIENT_COUNTS]
+                rates.append(run_async(db, account_id))
+                db.close()
+
+            mode = "group" if group_commit else "direct"
+            cells = "".join(f"{rate:>12.0f}" for rate in rates)
+            print(f"{durability:<11}{mode:<7}{cells}")
+
+
+if __name__ == "__main__":
+    main()
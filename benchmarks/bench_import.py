@@ -0,0 +1,107 @@
+"""
+Statement import throughput: utils.importer.import_statement on a CSV
+bank statement, end to end.
+
+The statement has the usual bank layout (date, narration, withdrawal,
+deposit, category) with Indian-style amounts ("1,234.50") and dd/mm/yyyy
+dates, plus one bad row in every thousand. The time is split into
+reading and normalizing the rows (make_row_normalizer over csv.reader,
+nothing inserted) and the whole import; the difference is the database
+side (see bench_bulk_import for that alone).
+
+The goal is a million-row statement in seconds. The script prints the
+projected time for a million rows and exits with status 1 when it is
+above MAX_SECONDS_PER_MILLION.
+
+Run from the project root:
+    python -m benchmarks.bench_import              # 200k rows
+    python -m benchmarks.bench_import 1000000
+"""
+
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+
+from database.db_manager import DatabaseManager
+from utils.importer import import_statement, make_row_normalizer, map_columns
+
+
+DEFAULT_ROWS = 200_000
+MAX_SECONDS_PER_MILLION = 50.0
+BAD_ROW_EVERY = 1_000
+
+HEADER = ["Txn Date", "Narration", "Withdrawal Amt", "Deposit Amt", "Category"]
+NARRATIONS = [
+    "UPI/Swiggy/food order", "POS Big Bazaar", "NEFT salary credit", "ATM withdrawal",
+    "UPI/Uber/ride", "Electricity bill", "IMPS transfer", "Netflix subscription",
+]
+CATEGORIES = ["Food", "Groceries", "Income", "", "Transport", "Utilities", "", "Entertainment"]
+
+
+def write_statement(path: str, rows: int, seed: int = 3) -> None:
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        out = csv.writer(f)
+        out.writerow(HEADER)
+        for i in range(rows):
+            if i % BAD_ROW_EVERY == BAD_ROW_EVERY - 1:
+                out.writerow(["31/02/2024", "bad row", "", "", ""])
+                continue
+            kind = rng.randrange(len(NARRATIONS))
+            amount = f"{rng.uniform(1, 50_000):,.2f}"
+            credit = kind == 2
+            out.writerow(
+                [
+                    f"{rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/{rng.randint(2022, 2024)}",
+                    f"{NARRATIONS[kind]} {i % 9973}",
+                    "" if credit else amount,
+                    amount if credit else "",
+                    CATEGORIES[kind],
+                ]
+            )
+
+
+def normalize_only(path: str) -> float:
+    """Seconds to read and normalize every row, without inserting."""
+    started = time.perf_counter()
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        reader = csv.reader(f)
+        normalize = make_row_normalizer(map_columns(next(reader)), account_id=1)
+        for values in reader:
+            try:
+                normalize(values)
+            except ValueError:
+                pass
+    return time.perf_counter() - started
+
+
+def main() -> int:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ROWS
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "statement.csv")
+        write_statement(path, rows)
+        size_mb = os.path.getsize(path) / 1e6
+        parse_seconds = normalize_only(path)
+
+        db = DatabaseManager(db_path=os.path.join(tmp, "import.db"), durability="batched")
+        try:
+            user_id = db.create_user("bench", "x")
+            account_id = db.add_account(user_id, "Bank")
+            result = import_statement(db, account_id, path)
+        finally:
+            db.close()
+
+    per_million = result.seconds * 1_000_000 / rows
+    print(f"{rows} rows ({size_mb:.1f} MB): {result.inserted} imported, "
+          f"{result.error_count} rejected")
+    print(f"{'read + normalize':<18} {parse_seconds:>7.2f}s")
+    print(f"{'whole import':<18} {result.seconds:>7.2f}s  {rows / result.seconds:>10,.0f} rows/s")
+    print(f"1M rows would take {per_million:.1f}s (budget {MAX_SECONDS_PER_MILLION:.0f}s)")
+    return 0 if per_million <= MAX_SECONDS_PER_MILLION else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+"""
+Before/after timings for the composite transaction indexes
+(database/migrations/0003_composite_indexes.sql).
+
+Builds a synthetic database (2M rows by default), then times the hot
+DatabaseManager queries twice on the same data: once with the original
+single-column indexes and once with the composite/covering ones.
+
+Run from the project root:
+    python -m benchmarks.bench_indexes            # 2,000,000 rows
+    python -m benchmarks.bench_indexes 5000000    # custom size
+"""
+
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from typing import Callable, Dict
+
+from database.db_manager import DatabaseManager
+
+
+ACCOUNTS = 20
+REPEAT = 20
+
+OLD_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_transactions_date ON transactions(transaction_date);
+CREATE INDEX IF NOT EXISTS idx_transactions_account_id ON transactions(account_id);
+CREATE INDEX IF NOT EXISTS idx_transactions_type ON transactions(type);
+CREATE INDEX IF NOT EXISTS idx_accounts_user_id ON accounts(user_id);
+DROP INDEX IF EXISTS idx_transactions_account_date_id;
+DROP INDEX IF EXISTS idx_accounts_user_id_created_at;
+"""
+
+NEW_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_transactions_account_date_id
+    ON transactions(account_id, transaction_date, id, type, amount);
+CREATE INDEX IF NOT EXISTS idx_accounts_user_id_created_at ON accounts(user_id, created_at);
+DROP INDEX IF EXISTS idx_transactions_date;
+DROP INDEX IF EXISTS idx_transactions_account_id;
+DROP INDEX IF EXISTS idx_transactions_type;
+DROP INDEX IF EXISTS idx_accounts_user_id;
+"""
+
+
+def build(db: DatabaseManager, rows: int) -> Dict[str, int]:
+    user_id = db.create_user("bench", "x")
+    account_ids = [db.add_account(user_id, f"Account {i}") for i in range(ACCOUNTS)]
+    first_day = date.today() - timedelta(days=10 * 365)
+    days = [(first_day + timedelta(days=d)).isoformat() for d in range(10 * 365)]
+    db.add_transactions_bulk(
+        (
+            account_ids[i % ACCOUNTS],
+            "income" if i % 7 == 0 else "expense",
+            1 + i % 500,
+            f"synthetic {i}",
+            "Groceries",
+            days[(i * 7919) % len(days)],
+        )
+        for i in range(rows)
+    )
+    return {"user_id": user_id, "account_id": account_ids[0]}
+
+
+def time_queries(db: DatabaseManager, ids: Dict[str, int]) -> Dict[str, float]:
+    account_id, user_id = ids["account_id"], ids["user_id"]
+    last_30 = (date.today() - timedelta(days=30)).isoformat()
+    last_year = (date.today() - timedelta(days=365)).isoformat()
+
+    queries: Dict[str, Callable[[], object]] = {
+        "get_transactions (last 30 days)": lambda: db.get_transactions(
+            account_id, start_date=last_30
+        ),
+        "get_transactions_page (first 50)": lambda: db.get_transactions_page(
+            account_id, limit=50
+        ),
+        "get_account_summary (last year)": lambda: db.get_account_summary(
+            account_id, start_date=last_year
+        ),
+        "get_accounts_overview (last year)": lambda: db.get_accounts_overview(
+            user_id, start_date=last_year
+        ),
+        "get_accounts_overview (all time)": lambda: db.get_accounts_overview(user_id),
+    }
+
+    timings = {}
+    for name, query in queries.items():
+        query()  # warm the page cache
+        started = time.perf_counter()
+        for _ in range(REPEAT):
+            query()
+        timings[name] = (time.perf_counter() - started) / REPEAT * 1000
+    return timings
+
+
+def apply_indexes(db: DatabaseManager, script: str) -> None:
+    with db.pool.writer(transaction=False) as conn:
+        conn.executescript(script)
+        conn.execute("ANALYZE")
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(db_path=os.path.join(tmp, "bench.db"))
+        print(f"Building {rows:,} rows across {ACCOUNTS} accounts...")
+        started = time.perf_counter()
+        ids = build(db, rows)
+        print(f"  done in {time.perf_counter() - started:.1f}s\n")
+
+        apply_indexes(db, OLD_INDEXES)
+        before = time_queries(db, ids)
+        apply_indexes(db, NEW_INDEXES)
+        after = time_queries(db, ids)
+
+        print(f"{'query':<36} {'before ms':>10} {'after ms':>10} {'speed-up':>9}")
+        for name in before:
+            speedup = before[name] / after[name] if after[name] else float("inf")
+            print(f"{name:<36} {before[name]:>10.2f} {after[name]:>10.2f} {speedup:>8.1f}x")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Keyword matching cost as the keyword lists grow (e.g. merchant names).
+
+- loop:    the previous approach, `kw in text` for every keyword.
+- matcher: KeywordMatcher, one pass over the text (nlp/keywords.py).
+
+Run from the project root:
+    python -m benchmarks.bench_keywords
+"""
+
+import random
+import time
+from typing import List
+
+from nlp.keywords import KeywordMatcher
+
+
+KEYWORD_COUNTS = [50, 1_000, 10_000]
+SENTENCES = 2_000
+
+
+def merchants(n: int, rng: random.Random) -> List[str]:
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return list({"".join(rng.choices(letters, k=rng.randint(4, 12))) for _ in range(n)})
+
+
+def main() -> None:
+    rng = random.Random(3)
+    print(f"{SENTENCES} sentences\n")
+    print(f"{'keywords':>8} {'loop µs/text':>13} {'matcher µs/text':>16} {'build ms':>9}")
+    for count in KEYWORD_COUNTS:
+        keywords = merchants(count, rng)
+        texts = [
+            f"paid {rng.randint(1, 5000)} rupees at {rng.choice(keywords)} for groceries yesterday"
+            for _ in range(SENTENCES)
+        ]
+
+        started = time.perf_counter()
+        for text in texts:
+            [kw for kw in keywords if kw in text]
+        loop = (time.perf_counter() - started) / SENTENCES
+
+        started = time.perf_counter()
+        matcher = KeywordMatcher([("category", "Shopping", keywords)])
+        build = time.perf_counter() - started
+        started = time.perf_counter()
+        for text in texts:
+            matcher.find(text)
+        matched = (time.perf_counter() - started) / SENTENCES
+
+        print(f"{count:>8} {1e6 * loop:>13.1f} {1e6 * matched:>16.1f} {1e3 * build:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+NLPParser.parse_many throughput by worker count.
+
+The corpus is synthetic SMS / bank-alert style lines built from a few
+templates, with about 2% unparseable lines. Each run parses the whole
+corpus; lines/s should grow roughly linearly with workers up to the
+number of CPU cores (workers=1 is the in-process path).
+
+Run from the project root:
+    python -m benchmarks.bench_parse_many            # 200k lines
+    python -m benchmarks.bench_parse_many 1000000
+"""
+
+import os
+import random
+import sys
+import time
+from typing import Iterator, List
+
+from nlp.parser import NLPParser
+
+
+DEFAULT_LINES = 200_000
+
+TEMPLATES = [
+    "bought {item} for {amount} rupees",
+    "spent rs {amount} on {item} yesterday",
+    "paid {item} bill of ₹{amount}",
+    "got {amount} rupees salary today",
+    "received rs. {amount} as refund 2 days ago",
+    "INR {amount} debited from a/c xx1234 for {item} on 05/12/2024",
+    "{item} without any amount",
+]
+ITEMS = ["milk", "bus ticket", "electricity", "netflix", "textbook", "petrol", "groceries"]
+
+
+def corpus(lines: int, seed: int = 7) -> Iterator[str]:
+    rng = random.Random(seed)
+    for _ in range(lines):
+        template = TEMPLATES[-1] if rng.random() < 0.02 else rng.choice(TEMPLATES[:-1])
+        yield template.format(item=rng.choice(ITEMS), amount=rng.randint(1, 50_000))
+
+
+def worker_counts() -> List[int]:
+    cores = os.cpu_count() or 1
+    counts = [1, 2, 4, 8, 16]
+    return [n for n in counts if n < cores] + [cores]
+
+
+def main() -> None:
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_LINES
+    parser = NLPParser()
+    print(f"{lines} lines, {os.cpu_count()} CPUs\n")
+    print(f"{'workers':>7} {'lines/s':>10} {'speedup':>8} {'errors':>7}")
+    baseline = None
+    for workers in worker_counts():
+        started = time.perf_counter()
+        errors = sum(not r.ok for r in parser.parse_many(corpus(lines), workers=workers))
+        rate = lines / (time.perf_counter() - started)
+        baseline = baseline or rate
+        print(f"{workers:>7} {rate:>10.0f} {rate / baseline:>7.2f}x {errors:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Per-tier latency and escalation rate of NLPParser (see nlp/stats.py).
+
+The corpus mixes texts the rules read confidently with ones they are
+unsure of (several plain numbers, date words they do not handle, no
+digits at all), about UNSURE_SHARE of the lines. The cache is off so
+every line is parsed. p50 should stay at rule speed; only the unsure
+lines pay for spaCy. Without spaCy installed nothing is escalated and
+the unsure lines are answered by the rules.
+
+Run from the project root:
+    python -m benchmarks.bench_parse_tiers          # 20k lines
+    python -m benchmarks.bench_parse_tiers 100000
+"""
+
+import random
+import sys
+import time
+from typing import Iterator
+
+from nlp.parser import NLPParser
+
+
+DEFAULT_LINES = 20_000
+UNSURE_SHARE = 0.1
+
+CONFIDENT = [
+    "bought {item} for {amount} rupees",
+    "spent rs {amount} on {item} yesterday",
+    "paid {item} bill of ₹{amount}",
+    "got {amount} rupees salary today",
+]
+UNSURE = [
+    "paid 3 people {amount} at Starbucks",
+    "{item} {amount} last friday",
+    "paid {amount} for {item} 5 december",
+]
+ITEMS = ["milk", "bus ticket", "electricity", "netflix", "textbook", "petrol"]
+
+
+def corpus(lines: int, seed: int = 7) -> Iterator[str]:
+    rng = random.Random(seed)
+    for _ in range(lines):
+        templates = UNSURE if rng.random() < UNSURE_SHARE else CONFIDENT
+        yield rng.choice(templates).format(
+            item=rng.choice(ITEMS), amount=rng.randint(10, 50_000)
+        )
+
+
+def main() -> None:
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_LINES
+    parser = NLPParser(cache_size=0)
+    started = time.perf_counter()
+    errors = sum(not r.ok for r in parser.parse_many(corpus(lines), workers=1))
+    elapsed = time.perf_counter() - started
+
+    stats = parser.tier_stats()
+    print(f"{lines} lines in {elapsed:.2f}s ({lines / elapsed:.0f} lines/s), {errors} errors")
+    print(f"escalated {stats.escalated} ({100 * stats.escalation_rate:.1f}%)")
+    if parser._ner_error is not None:
+        print(f"spaCy unavailable, rules only: {parser._ner_error}")
+    print(f"\n{'tier':>6} {'count':>7} {'p50 ms':>8} {'p95 ms':>8}")
+    for tier, info in stats.tiers.items():
+        print(f"{tier:>6} {info.count:>7} {info.p50_ms:>8.3f} {info.p95_ms:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
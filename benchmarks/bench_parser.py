@@ -0,0 +1,244 @@
+"""
+Parser throughput, latency, per-stage time and accuracy on the labelled
+synthetic corpus in benchmarks/parser_corpus.py.
+
+- throughput and p50/p99 latency of parse(), cache off, so every line is
+  parsed in full;
+- mean time per line in each rule stage (_extract_amount,
+  _extract_date, _extract_description, _detect_category), measured in
+  a second pass with the stages wrapped in timers;
+- field-level accuracy against the labels: trans_type, amount, category,
+  transaction_date, all four at once ("exact"), and the share of
+  amount-less sentences rejected. "exact" is also broken down by
+  template, and the first mismatches are listed.
+
+Results can be saved as JSON and compared with an earlier run. When
+both runs used the same corpus (lines and seed), the comparison exits
+with status 1 if any accuracy figure dropped. Throughput differences
+are printed but not judged, as they depend on the machine and its load.
+
+Run from the project root:
+    python -m benchmarks.bench_parser                          # 20k lines
+    python -m benchmarks.bench_parser --lines 100000 --out before.json
+    python -m benchmarks.bench_parser --compare before.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from datetime import date
+from typing import Any, Callable, Dict, List, Optional, Sequence, Union
+
+from nlp.parser import NLPParser, ParsedTransaction
+
+from .parser_corpus import Sample, generate
+
+
+DEFAULT_LINES = 20_000
+STAGES = ("_extract_amount", "_extract_date", "_extract_description", "_detect_category")
+FIELDS = ("trans_type", "amount", "category", "transaction_date")
+MAX_MISMATCHES = 20
+
+Outcome = Union[ParsedTransaction, Exception]
+
+
+def run(lines: int = DEFAULT_LINES, seed: int = 7) -> Dict[str, Any]:
+    """Benchmark the parser on `lines` samples; the report is JSON-serializable."""
+    today = date.today()
+    samples = list(generate(lines, seed, today))
+
+    parser = NLPParser(cache_size=0)
+    latencies: List[float] = []
+    outcomes: List[Outcome] = []
+    started = time.perf_counter()
+    for sample in samples:
+        t = time.perf_counter()
+        try:
+            outcome: Outcome = parser.parse(sample.text)
+        except ValueError as exc:
+            outcome = exc
+        latencies.append(time.perf_counter() - t)
+        outcomes.append(outcome)
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+
+    accuracy, by_template, mismatches = score(samples, outcomes)
+    return {
+        "lines": lines,
+        "seed": seed,
+        "date": today.isoformat(),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "parses_per_sec": lines / elapsed,
+        "latency_us": {
+            "p50": 1e6 * _percentile(latencies, 0.50),
+            "p99": 1e6 * _percentile(latencies, 0.99),
+        },
+        "stages_us": stage_times(samples),
+        "accuracy": accuracy,
+        "exact_by_template": by_template,
+        "mismatches": mismatches,
+    }
+
+
+def stage_times(samples: Sequence[Sample]) -> Dict[str, float]:
+    """Mean microseconds per line spent in each rule stage."""
+    parser = NLPParser(cache_size=0)
+    totals = dict.fromkeys(STAGES, 0.0)
+
+    def timed(name: str, stage: Callable[..., Any]) -> Callable[..., Any]:
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            started = time.perf_counter()
+            try:
+                return stage(*args, **kwargs)
+            finally:
+                totals[name] += time.perf_counter() - started
+        return wrapper
+
+    for name in STAGES:
+        setattr(parser, name, timed(name, getattr(parser, name)))
+    for sample in samples:
+        try:
+            parser.parse(sample.text)
+        except ValueError:
+            pass
+    return {name: 1e6 * total / len(samples) for name, total in totals.items()}
+
+
+def score(samples: Sequence[Sample], outcomes: Sequence[Outcome]):
+    """Accuracy per field, "exact" per template, and the first mismatches."""
+    correct = dict.fromkeys(FIELDS + ("exact",), 0)
+    labelled = rejected = negatives = 0
+    templates: Dict[str, List[int]] = {}
+    mismatches: List[Dict[str, str]] = []
+
+    for sample, outcome in zip(samples, outcomes):
+        expected = sample.expected
+        if expected is None:
+            negatives += 1
+            rejected += isinstance(outcome, Exception)
+            if not isinstance(outcome, Exception) and len(mismatches) < MAX_MISMATCHES:
+                mismatches.append(
+                    {"text": sample.text, "field": "rejected", "got": repr(outcome.amount)}
+                )
+            continue
+
+        labelled += 1
+        wrong = list(FIELDS) if isinstance(outcome, Exception) else [
+            field for field in FIELDS if not _matches(field, getattr(outcome, field), expected)
+        ]
+        for field in FIELDS:
+            correct[field] += field not in wrong
+        correct["exact"] += not wrong
+        counts = templates.setdefault(sample.template, [0, 0])
+        counts[0] += not wrong
+        counts[1] += 1
+
+        for field in wrong[:MAX_MISMATCHES - len(mismatches)]:
+            got = outcome if isinstance(outcome, Exception) else getattr(outcome, field)
+            mismatches.append(
+                {
+                    "text": sample.text,
+                    "field": field,
+                    "got": str(got),
+                    "expected": str(getattr(expected, field)),
+                }
+            )
+
+    accuracy = {field: correct[field] / labelled if labelled else 1.0 for field in correct}
+    accuracy["rejected"] = rejected / negatives if negatives else 1.0
+    by_template = {name: ok / total for name, (ok, total) in sorted(templates.items())}
+    return accuracy, by_template, mismatches
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]) -> List[str]:
+    """
+    Print how `current` differs from `baseline`; returns the accuracy
+    drops (none when the corpora differ, as the figures are not comparable).
+    """
+    print(f"\ncompared with the run of {baseline['date']} ({baseline['lines']} lines)")
+    same_corpus = (current["lines"], current["seed"]) == (baseline["lines"], baseline["seed"])
+    rate, old_rate = current["parses_per_sec"], baseline["parses_per_sec"]
+    print(f"{'parses/s':<26} {old_rate:>10.0f} -> {rate:>10.0f} ({rate / old_rate - 1:+.1%})")
+    for key in ("p50", "p99"):
+        old, new = baseline["latency_us"][key], current["latency_us"][key]
+        print(f"{key + ' µs':<26} {old:>10.1f} -> {new:>10.1f}")
+    for stage, new in current["stages_us"].items():
+        old = baseline["stages_us"].get(stage)
+        if old is not None:
+            print(f"{stage + ' µs':<26} {old:>10.2f} -> {new:>10.2f}")
+
+    drops = []
+    for field, new in current["accuracy"].items():
+        old = baseline["accuracy"].get(field)
+        if old is None:
+            continue
+        print(f"{field + ' accuracy':<26} {old:>10.2%} -> {new:>10.2%}")
+        if same_corpus and new < old:
+            drops.append(f"{field}: {old:.2%} -> {new:.2%}")
+    if not same_corpus:
+        print("(different lines or seed: accuracy not judged)")
+    return drops
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    cpus = report["environment"]["cpus"]
+    print(f"{report['lines']} lines (seed {report['seed']}), {cpus} CPUs\n")
+    print(f"{'parses/s':<26} {report['parses_per_sec']:>10.0f}")
+    for key, value in report["latency_us"].items():
+        print(f"{key + ' µs':<26} {value:>10.1f}")
+    for stage, value in report["stages_us"].items():
+        print(f"{stage + ' µs':<26} {value:>10.2f}")
+    print()
+    for field, value in report["accuracy"].items():
+        print(f"{field + ' accuracy':<26} {value:>10.2%}")
+    for template, value in report["exact_by_template"].items():
+        print(f"{'exact: ' + template:<26} {value:>10.2%}")
+    if report["mismatches"]:
+        print("\nfirst mismatches:")
+        for m in report["mismatches"]:
+            expected = m.get("expected", "an error")
+            print(f"- {m['text']!r}: {m['field']} {m['got']} (expected {expected})")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("--lines", type=int, default=DEFAULT_LINES)
+    ap.add_argument("--seed", type=int, default=7)
+    ap.add_argument("--out", help="save the results as JSON")
+    ap.add_argument("--compare", metavar="JSON", help="an earlier --out file")
+    args = ap.parse_args(argv)
+
+    report = run(args.lines, args.seed)
+    print_report(report)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"\nsaved to {args.out}")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            drops = compare(report, json.load(f))
+        if drops:
+            print("\naccuracy dropped: " + "; ".join(drops))
+            return 1
+    return 0
+
+
+def _matches(field: str, got: Any, expected: Any) -> bool:
+    if field == "amount":
+        return abs(got - expected.amount) < 0.005
+    return got == getattr(expected, field)
+
+
+def _percentile(ordered: Sequence[float], q: float) -> float:
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,73 @@
+"""
+Cold start of the NLP parser: importing nlp.parser and constructing an
+NLPParser in a fresh interpreter, as the app does on its first request.
+
+Both used to load spaCy and the en_core_web_sm model (seconds and a few
+hundred MB) although parse() never used them. Each run happens in a new
+process so nothing is already imported. The script exits with status 1
+when the slowest run is over STARTUP_BUDGET_MS or when spaCy/dateutil
+were imported during construction; tests/test_parser_startup.py runs the
+same check.
+
+Run from the project root:
+    python -m benchmarks.bench_parser_startup
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Any, Dict, List
+
+
+RUNS = 5
+STARTUP_BUDGET_MS = 200.0
+
+# Modules that must not be imported just to construct a parser.
+HEAVY_MODULES = ("spacy", "dateutil")
+
+_PROBE = f"""
+import json, sys, time
+started = time.perf_counter()
+from nlp.parser import NLPParser
+NLPParser()
+elapsed = time.perf_counter() - started
+print(json.dumps({{
+    "ms": 1000 * elapsed,
+    "heavy": [m for m in {HEAVY_MODULES!r} if m in sys.modules],
+}}))
+"""
+
+
+def measure_cold_start() -> Dict[str, Any]:
+    """Time import + construction in a fresh interpreter."""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    out = subprocess.run(
+        [sys.executable, "-c", _PROBE],
+        cwd=root,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main() -> None:
+    runs: List[Dict[str, Any]] = [measure_cold_start() for _ in range(RUNS)]
+    times = [r["ms"] for r in runs]
+    heavy = sorted({m for r in runs for m in r["heavy"]})
+    print(
+        f"NLPParser cold start over {RUNS} runs: median {statistics.median(times):.1f} ms, "
+        f"max {max(times):.1f} ms (budget {STARTUP_BUDGET_MS:.0f} ms)"
+    )
+    if heavy:
+        print(f"FAIL: imported during construction: {', '.join(heavy)}")
+    if max(times) > STARTUP_BUDGET_MS:
+        print("FAIL: over budget")
+    if heavy or max(times) > STARTUP_BUDGET_MS:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
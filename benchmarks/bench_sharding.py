@@ -0,0 +1,98 @@
+"""
+Multi-tenant write throughput: one SQLite file vs. sharded layouts.
+
+Each tenant is a user with one account, writing from its own thread
+(like Streamlit sessions of different users in one server process).
+
+- uniform: every tenant calls add_transaction in a loop.
+- heavy:   one tenant runs bulk imports back to back while the others
+           keep writing; reported for the light tenants only, with their
+           95th percentile write latency.
+
+Run from the project root:
+    python -m benchmarks.bench_sharding
+"""
+
+import os
+import tempfile
+import threading
+import time
+from datetime import date
+from typing import Any, Callable, Dict, List, Tuple
+
+from database.db_manager import DatabaseManager
+from database.sharding import ShardedDatabaseManager
+
+
+TENANTS = 16
+DURATION_SECONDS = 2.0
+IMPORT_ROWS = 20_000
+
+LAYOUTS: List[Tuple[str, Callable[[str], Any]]] = [
+    ("single file", lambda tmp: DatabaseManager(db_path=os.path.join(tmp, "mono.db"))),
+    ("4 buckets", lambda tmp: ShardedDatabaseManager("bucket", os.path.join(tmp, "b4"), buckets=4)),
+    ("16 buckets", lambda tmp: ShardedDatabaseManager("bucket", os.path.join(tmp, "b16"), buckets=16)),
+    ("per user", lambda tmp: ShardedDatabaseManager("user", os.path.join(tmp, "user"))),
+]
+
+
+def run(db: Any, accounts: List[int], heavy: bool) -> Dict[str, float]:
+    stop = threading.Event()
+    latencies: List[List[float]] = [[] for _ in accounts]
+    today = date.today().isoformat()
+
+    def light(idx: int) -> None:
+        while not stop.is_set():
+            started = time.perf_counter()
+            db.add_transaction(accounts[idx], "expense", 1, "bench write", "Food", today)
+            latencies[idx].append(time.perf_counter() - started)
+
+    def importer() -> None:
+        rows = [(accounts[0], "expense", 1, "import", "Food", today)] * IMPORT_ROWS
+        while not stop.is_set():
+            db.add_transactions_bulk(rows)
+
+    # In the heavy run tenant 0 is the importer.
+    threads = [threading.Thread(target=importer)] if heavy else []
+    threads += [
+        threading.Thread(target=light, args=(i,))
+        for i in range(1 if heavy else 0, len(accounts))
+    ]
+    for t in threads:
+        t.start()
+    time.sleep(DURATION_SECONDS)
+    stop.set()
+    for t in threads:
+        t.join()
+
+    measured = [l for l in latencies if l]
+    all_latencies = sorted(x for l in measured for x in l)
+    return {
+        "writes_per_s": sum(len(l) for l in measured) / DURATION_SECONDS,
+        "p95_ms": 1000 * all_latencies[int(0.95 * (len(all_latencies) - 1))],
+    }
+
+
+def main() -> None:
+    print(f"{TENANTS} tenants, {DURATION_SECONDS:.0f}s per run\n")
+    print(
+        f"{'layout':<12} {'uniform w/s':>12} {'p95 ms':>8}   "
+        f"{'heavy: light w/s':>17} {'p95 ms':>8}"
+    )
+    for name, make in LAYOUTS:
+        with tempfile.TemporaryDirectory() as tmp:
+            db = make(tmp)
+            accounts = [
+                db.add_account(db.create_user(f"tenant{i}", "x"), "Main") for i in range(TENANTS)
+            ]
+            uniform = run(db, accounts, heavy=False)
+            heavy = run(db, accounts, heavy=True)
+            db.close()
+        print(
+            f"{name:<12} {uniform['writes_per_s']:>12.0f} {uniform['p95_ms']:>8.1f}   "
+            f"{heavy['writes_per_s']:>17.0f} {heavy['p95_ms']:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
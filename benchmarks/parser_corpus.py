@@ -0,0 +1,189 @@
+"""
+Synthetic, labelled corpus for the parser benchmark (bench_parser.py).
+
+Each sample is a sentence built from a template, with the transaction
+the parser should read from it. Templates cover:
+
+- currency forms: ₹500, Rs 500, Rs. 5,000, 500 rupees, 500 rs, plain
+  numbers, decimals;
+- dates: today, yesterday, "N days ago", "on" with 05/12/2024,
+  2024-12-05, 5 dec, Dec 5, 5th of December 2024, and no date (today);
+- multiplicative "N <items> of/for P each" phrases;
+- income and expense keywords, and items of every keyword category as
+  well as uncategorized ones;
+- sentences without an amount, which the parser must reject.
+
+Labels only use behaviour the parser promises (see NLPParser), so a
+drop in accuracy means a pattern in nlp/patterns.py broke something.
+"""
+
+import random
+from datetime import date, timedelta
+from typing import Callable, Iterator, List, NamedTuple, Optional, Tuple
+
+
+class Expected(NamedTuple):
+    trans_type: str
+    amount: float
+    category: Optional[str]
+    transaction_date: date
+
+
+class Sample(NamedTuple):
+    text: str
+    # None: the parser must reject the text
+    expected: Optional[Expected]
+    template: str
+
+
+# (word, category) for the thing bought
+EXPENSE_ITEMS = [
+    ("milk", "Groceries"),
+    ("bread", "Groceries"),
+    ("vegetables", "Groceries"),
+    ("textbook", "Education"),
+    ("tuition", "Education"),
+    ("bus ticket", "Transport"),
+    ("petrol", "Transport"),
+    ("taxi", "Transport"),
+    ("electricity", "Utilities"),
+    ("wifi", "Utilities"),
+    ("movie", "Entertainment"),
+    ("netflix", "Entertainment"),
+    ("pen", None),
+    ("shoes", None),
+    ("haircut", None),
+]
+# Countable items for "each" phrases: (plural, category)
+COUNTABLE_ITEMS = [
+    ("books", "Education"),
+    ("games", "Entertainment"),
+    ("shirts", None),
+    ("pens", None),
+]
+INCOME_SOURCES = [("salary", "Income"), ("refund", "Income"), ("bonus", "Income")]
+EXPENSE_VERBS = ["spent", "paid", "bought", "purchased"]
+INCOME_VERBS = ["got", "received", "earned"]
+
+MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+MONTH_NAMES = [
+    "January", "February", "March", "April", "May", "June",
+    "July", "August", "September", "October", "November", "December",
+]
+
+
+# ---------- Amount forms ----------
+
+def _amount(rng: random.Random) -> Tuple[str, float]:
+    """An amount as written in the text, and its value."""
+    value = rng.randint(1, 50_000)
+    form = rng.randrange(7)
+    if form == 0:
+        return f"₹{value}", value
+    if form == 1:
+        return f"Rs {value}", value
+    if form == 2:
+        return f"Rs. {value:,}", value
+    if form == 3:
+        return f"{value} rupees", value
+    if form == 4:
+        return f"{value} rs", value
+    if form == 5:
+        cents = rng.randint(1, 99)
+        return f"₹{value}.{cents:02d}", value + cents / 100
+    return str(value), value
+
+
+# ---------- Date forms ----------
+
+def _date(rng: random.Random, today: date) -> Tuple[str, date]:
+    """A date phrase (possibly empty) and the date it means."""
+    form = rng.randrange(9)
+    if form == 0:
+        return "", today
+    if form == 1:
+        return " today", today
+    if form == 2:
+        return " yesterday", today - timedelta(days=1)
+    if form == 3:
+        days = rng.randint(2, 60)
+        return f" {days} days ago", today - timedelta(days=days)
+
+    day = date(rng.randint(2015, today.year), rng.randint(1, 12), rng.randint(1, 28))
+    if form == 4:
+        return f" on {day:%d/%m/%Y}", day
+    if form == 5:
+        return f" on {day.isoformat()}", day
+    if form == 6:
+        day = day.replace(year=today.year)
+        return f" on {day.day} {MONTHS[day.month - 1].lower()}", day
+    if form == 7:
+        day = day.replace(year=today.year)
+        return f" on {MONTHS[day.month - 1]} {day.day}", day
+    return f" on {_ordinal(day.day)} of {MONTH_NAMES[day.month - 1]} {day.year}", day
+
+
+def _ordinal(n: int) -> str:
+    suffix = "th" if 10 <= n % 100 <= 20 else {1: "st", 2: "nd", 3: "rd"}.get(n % 10, "th")
+    return f"{n}{suffix}"
+
+
+# ---------- Templates ----------
+
+def _expense(rng: random.Random, today: date) -> Sample:
+    item, category = rng.choice(EXPENSE_ITEMS)
+    amount_text, amount = _amount(rng)
+    date_text, day = _date(rng, today)
+    verb = rng.choice(EXPENSE_VERBS)
+    text = rng.choice(
+        [
+            f"{verb} {item} for {amount_text}{date_text}",
+            f"{verb} {amount_text} on {item}{date_text}",
+            f"{item} {amount_text}{date_text}",
+        ]
+    )
+    return Sample(text, Expected("expense", amount, category, day), "expense")
+
+
+def _income(rng: random.Random, today: date) -> Sample:
+    source, category = rng.choice(INCOME_SOURCES)
+    amount_text, amount = _amount(rng)
+    date_text, day = _date(rng, today)
+    verb = rng.choice(INCOME_VERBS)
+    text = f"{verb} {amount_text} {source}{date_text}"
+    return Sample(text, Expected("income", amount, category, day), "income")
+
+
+def _each(rng: random.Random, today: date) -> Sample:
+    item, category = rng.choice(COUNTABLE_ITEMS)
+    quantity = rng.randint(2, 12)
+    price = rng.randint(10, 2_000)
+    date_text, day = _date(rng, today)
+    joiner = rng.choice(["of", "for"])
+    text = f"bought {quantity} {item} {joiner} {price} each{date_text}"
+    return Sample(text, Expected("expense", quantity * price, category, day), "each")
+
+
+def _no_amount(rng: random.Random, today: date) -> Sample:
+    item, _ = rng.choice(EXPENSE_ITEMS)
+    date_text = rng.choice(["", " today", " yesterday"])
+    return Sample(f"bought {item}{date_text}", None, "no amount")
+
+
+# (template, weight)
+TEMPLATES: List[Tuple[Callable[[random.Random, date], Sample], int]] = [
+    (_expense, 60),
+    (_income, 20),
+    (_each, 15),
+    (_no_amount, 5),
+]
+
+
+def generate(lines: int, seed: int = 7, today: Optional[date] = None) -> Iterator[Sample]:
+    """`lines` labelled samples, the same ones for the same seed and day."""
+    rng = random.Random(seed)
+    today = today or date.today()
+    makers = [maker for maker, _ in TEMPLATES]
+    weights = [weight for _, weight in TEMPLATES]
+    for _ in range(lines):
+        yield rng.choices(makers, weights)[0](rng, today)
@@ -11,6 +11,50 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DATA_DIR = os.path.join(BASE_DIR, "data")
 DB_PATH = os.path.join(DATA_DIR, "expenses.db")
 
+# SQLite connection pool (see database/pool.py)
+# Maximum number of concurrent reader connections per process.
+DB_POOL_SIZE = 8
+# How long a connection waits on a locked database before giving up.
+DB_BUSY_TIMEOUT_MS = 5000
+# When writes are fsynced: "strict" on every commit (synchronous=FULL),
+# "batched" only at WAL checkpoints (synchronous=NORMAL; survives an app
+# crash, but the last commits can be lost on power failure).
+DB_DURABILITY = "strict"
+
+# Group commit (see database/write_queue.py): transaction writes are
+# queued and committed in batches by one background thread.
+DB_GROUP_COMMIT = False
+# Upper bounds on one batch: number of writes, and how long the first
+# write of a batch may wait for others to join it. With 0, a batch is
+# whatever queued up while the previous batch was committing, so a lone
+# writer pays no extra latency.
+DB_GROUP_COMMIT_MAX_BATCH = 256
+DB_GROUP_COMMIT_MAX_DELAY_MS = 0
+
+# Sharded layout (see database/sharding.py): None keeps everything in
+# DB_PATH; "bucket" spreads users over DB_SHARD_BUCKETS files by user id;
+# "user" gives every user a file of their own. Existing data is moved
+# with: python -m database.maintenance split-shards
+DB_SHARDING = None
+DB_SHARD_BUCKETS = 16
+DB_SHARD_DIR = os.path.join(DATA_DIR, "shards")
+
+# NLP parser: how many recent parse results are cached (see nlp/cache.py);
+# 0 turns the cache off.
+PARSER_CACHE_SIZE = 4096
+# Texts the parser's rules are less sure of than this (0-1) are also run
+# through spaCy's entity recognizer; 0 keeps parsing to the rules alone.
+PARSER_ESCALATION_THRESHOLD = 0.5
+
+# Shared parser service (see nlp/service.py): with a socket path, app
+# processes send parsing to one `python -m nlp.service` process, so only
+# it loads the spaCy model, and parse in-process while it is down.
+PARSER_SOCKET = None  # e.g. os.path.join(DATA_DIR, "parser.sock")
+# Upper bounds on one service batch: texts, and how long the first
+# request of a batch may wait for others to join it.
+PARSER_SERVICE_MAX_BATCH = 256
+PARSER_SERVICE_MAX_DELAY_MS = 2.0
+
 # Streamlit UI settings
 APP_NAME = "Smart Expense Tracker"
 APP_ICON = "💰"
@@ -0,0 +1,385 @@
+"""
+Archive partitions: closed years moved out of the main database.
+
+The interactive app mostly reads the last few weeks, but every query
+shared B-trees and page cache with the whole history. archive_year()
+moves all transactions of a closed year into their own SQLite file,
+archive/<db name>_<year>.db next to the main database, and records it in
+the archive_partitions table.
+
+- account_balances and monthly_rollups keep the archived rows' totals,
+  so lifetime summaries and monthly dashboards are unchanged.
+- Listings (get_transactions, pages, iter_transactions, the frame) and
+  dated totals (get_account_summary, get_accounts_overview, category
+  and period totals) ATTACH only the partitions whose year overlaps the
+  requested range. Queries inside the hot years never touch an archive
+  file.
+- Search only sees the main database: archiving removes the rows from
+  the search index.
+- Archived rows are read-only; updating or deleting one raises
+  ValueError. A transaction later added with a date in an archived year
+  stays in the main database until the year is archived again.
+
+Moving a year takes two transactions while the writer is held: copy into
+the partition file, then delete from the main database and register the
+partition. A crash in between leaves an unregistered copy that queries
+ignore. Re-running the archive finishes the move. Only when re-archiving
+an already registered year can such a crash show rows twice until the
+re-run.
+
+Usage (from the project root):
+    python -m database.maintenance archive             # every closed year
+    python -m database.maintenance archive --before 2022 --vacuum
+"""
+
+import os
+import sqlite3
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Iterator, List, Optional, Sequence, Tuple
+
+from .pool import ConnectionPool
+
+
+ARCHIVE_DIR = "archive"
+
+# Columns copied into partitions, in table order.
+ARCHIVE_COLUMNS = (
+    "id, account_id, type, amount, description, category_id, transaction_date, created_at"
+)
+
+CREATE_PARTITION_TABLE = """
+CREATE TABLE IF NOT EXISTS {schema}.transactions (
+    id INTEGER PRIMARY KEY,
+    account_id INTEGER NOT NULL,
+    type TEXT NOT NULL,
+    amount REAL NOT NULL,
+    description TEXT,
+    category_id INTEGER,
+    transaction_date DATE NOT NULL,
+    created_at TIMESTAMP
+)
+"""
+
+# Same shape as the main table's listing index.
+CREATE_PARTITION_INDEX = """
+CREATE INDEX IF NOT EXISTS {schema}.idx_transactions_account_date_id
+    ON transactions(account_id, transaction_date, id, type, amount)
+"""
+
+
+@dataclass(frozen=True)
+class Partition:
+    year: int
+    path: str
+
+    @property
+    def schema(self) -> str:
+        """Name the partition is attached under."""
+        return f"archive_{self.year:d}"
+
+
+def partition_path(db_path: str, year: int) -> str:
+    stem = os.path.splitext(os.path.basename(db_path))[0]
+    return os.path.join(os.path.dirname(db_path), ARCHIVE_DIR, f"{stem}_{year:d}.db")
+
+
+def list_partitions(
+    conn: sqlite3.Connection,
+    db_path: str,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+) -> List[Partition]:
+    """Archived years overlapping [start_date, end_date] (open ends allowed)."""
+    first = int(str(start_date)[:4]) if start_date is not None else 0
+    last = int(str(end_date)[:4]) if end_date is not None else 9999
+    rows = conn.execute(
+        "SELECT year, file FROM archive_partitions WHERE year BETWEEN ? AND ? ORDER BY year",
+        (first, last),
+    ).fetchall()
+    directory = os.path.join(os.path.dirname(db_path), ARCHIVE_DIR)
+    return [Partition(r["year"], os.path.join(directory, r["file"])) for r in rows]
+
+
+@contextmanager
+def attached(conn: sqlite3.Connection, partitions: List[Partition]) -> Iterator[None]:
+    """
+    ATTACH `partitions` to conn for the duration of the block.
+
+    SQLite cannot DETACH inside a transaction, so partitions attached
+    during one (e.g. in a pool snapshot) stay attached, are reused by
+    later queries, and go away when the connection is closed (see
+    union_sources for how it stays under the limit).
+    """
+    present = {row[1] for row in conn.execute("PRAGMA database_list")}
+    done: List[Partition] = []
+    try:
+        for p in partitions:
+            if p.schema not in present:
+                conn.execute(f"ATTACH DATABASE ? AS {p.schema}", (p.path,))
+                done.append(p)
+        yield
+    finally:
+        if not conn.in_transaction:
+            for p in done:
+                conn.execute(f"DETACH DATABASE {p.schema}")
+
+
+def _union(tables: List[str]) -> str:
+    return "(" + " UNION ALL ".join(
+        f"SELECT {ARCHIVE_COLUMNS} FROM {table}" for table in tables
+    ) + ")"
+
+
+def _side_connection(conn: sqlite3.Connection) -> sqlite3.Connection:
+    """A short-lived read-only connection to conn's main database."""
+    db_path = next(row[2] for row in conn.execute("PRAGMA database_list") if row[1] == "main")
+    side = sqlite3.connect(db_path, detect_types=sqlite3.PARSE_DECLTYPES, isolation_level=None)
+    side.row_factory = conn.row_factory
+    side.execute("PRAGMA query_only = ON;")
+    return side
+
+
+def union_sources(
+    conn: sqlite3.Connection, partitions: List[Partition]
+) -> Iterator[Tuple[sqlite3.Connection, str]]:
+    """
+    Yield (connection, FROM-clause source) pairs that together cover the
+    main transactions table and `partitions`, attaching each group of
+    partitions while its source is in use. Callers run their query for
+    each source on the connection it comes with and combine the results.
+
+    Without partitions this yields (conn, "transactions") once, so hot
+    queries run unchanged. Otherwise partitions are attached in groups
+    that fit SQLite's limit on attached databases (one slot is left
+    free), and each group is a UNION ALL subquery; the first one is on
+    conn and includes the main table.
+
+    Inside a transaction (e.g. a pool snapshot) conn cannot detach, so
+    only the partitions that still fit are attached to it. The rest are
+    read on a connection of their own; partitions do not change once
+    written, so the combined result is still one point in time.
+    """
+    if not partitions:
+        yield conn, "transactions"
+        return
+
+    group_size = max(1, conn.getlimit(sqlite3.SQLITE_LIMIT_ATTACHED) - 1)
+    on_conn, elsewhere = list(partitions), []
+    if conn.in_transaction:
+        present = {row[1] for row in conn.execute("PRAGMA database_list")}
+        free = max(0, group_size - len(present - {"main", "temp"}))
+        new = [p for p in partitions if p.schema not in present]
+        on_conn = [p for p in partitions if p.schema in present] + new[:free]
+        elsewhere = new[free:]
+
+    for i in range(0, max(1, len(on_conn)), group_size):
+        group = on_conn[i:i + group_size]
+        tables = [f"{p.schema}.transactions" for p in group]
+        if i == 0:
+            tables.insert(0, "main.transactions")
+        with attached(conn, group):
+            yield conn, _union(tables)
+
+    if elsewhere:
+        side = _side_connection(conn)
+        try:
+            for i in range(0, len(elsewhere), group_size):
+                group = elsewhere[i:i + group_size]
+                with attached(side, group):
+                    yield side, _union([f"{p.schema}.transactions" for p in group])
+        finally:
+            side.close()
+
+
+def archived_year(conn: sqlite3.Connection, db_path: str, transaction_id: int) -> Optional[int]:
+    """
+    Year of the partition holding `transaction_id`, or None. Partitions
+    are opened on their own connections rather than attached, so this
+    also works inside a write transaction on conn.
+    """
+    for partition in list_partitions(conn, db_path):
+        if not os.path.exists(partition.path):
+            continue
+        part = sqlite3.connect(partition.path)
+        try:
+            found = part.execute(
+                "SELECT 1 FROM transactions WHERE id = ?", (transaction_id,)
+            ).fetchone()
+        finally:
+            part.close()
+        if found:
+            return partition.year
+    return None
+
+
+def archive_year(pool: ConnectionPool, year: int, today: Optional[date] = None) -> int:
+    """
+    Move every transaction dated in `year` into its partition file.
+    Only closed years (before the current one) can be archived.
+    Returns the number of rows moved; archiving a year again moves the
+    rows added to it since.
+    """
+    if year >= (today or date.today()).year:
+        raise ValueError(f"Only closed years can be archived, not {year}")
+
+    path = partition_path(pool.db_path, year)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    partition = Partition(year, path)
+    schema = partition.schema
+    start, end = f"{year:04d}-01-01", f"{year + 1:04d}-01-01"
+
+    with pool.writer(transaction=False) as conn, attached(conn, [partition]):
+        # 1. Copy; this transaction only writes to the partition file.
+        with pool.writer():
+            conn.execute(CREATE_PARTITION_TABLE.format(schema=schema))
+            conn.execute(CREATE_PARTITION_INDEX.format(schema=schema))
+            conn.execute(
+                f"""
+                INSERT OR REPLACE INTO {schema}.transactions ({ARCHIVE_COLUMNS})
+                SELECT {ARCHIVE_COLUMNS} FROM main.transactions
+                WHERE transaction_date >= ? AND transaction_date < ?
+                """,
+                (start, end),
+            )
+
+        # 2. Delete the copied rows; this one only writes to the main file.
+        with pool.writer():
+            conn.execute(
+                f"""
+                CREATE TEMP TABLE archived_now AS
+                SELECT id, account_id, type, amount, category_id, transaction_date
+                FROM main.transactions
+                WHERE transaction_date >= ? AND transaction_date < ?
+                  AND id IN (SELECT id FROM {schema}.transactions)
+                """,
+                (start, end),
+            )
+            try:
+                moved = conn.execute(
+                    "DELETE FROM main.transactions WHERE id IN (SELECT id FROM temp.archived_now)"
+                ).rowcount
+
+                # The delete triggers took the rows out of the running
+                # totals; put them back, the rows still exist.
+                conn.execute(
+                    """
+                    INSERT INTO account_balances (
+                        account_id, total_income, total_expense, transaction_count
+                    )
+                    SELECT
+                        account_id,
+                        SUM(CASE WHEN type = 'income' THEN amount ELSE 0 END),
+                        SUM(CASE WHEN type = 'expense' THEN amount ELSE 0 END),
+                        COUNT(*)
+                    FROM temp.archived_now
+                    WHERE true
+                    GROUP BY account_id
+                    ON CONFLICT (account_id) DO UPDATE SET
+                        total_income = total_income + excluded.total_income,
+                        total_expense = total_expense + excluded.total_expense,
+                        transaction_count = transaction_count + excluded.transaction_count
+                    """
+                )
+                conn.execute(
+                    """
+                    INSERT INTO monthly_rollups (
+                        account_id, month, category_id, type, total_amount, transaction_count
+                    )
+                    SELECT
+                        account_id,
+                        substr(transaction_date, 1, 7),
+                        COALESCE(category_id, 0),
+                        type,
+                        SUM(amount),
+                        COUNT(*)
+                    FROM temp.archived_now
+                    WHERE true
+                    GROUP BY 1, 2, 3, 4
+                    ON CONFLICT (account_id, month, category_id, type) DO UPDATE SET
+                        total_amount = total_amount + excluded.total_amount,
+                        transaction_count = transaction_count + excluded.transaction_count
+                    """
+                )
+                conn.execute(
+                    f"""
+                    INSERT INTO archive_partitions (year, file, row_count)
+                    VALUES (?, ?, (SELECT COUNT(*) FROM {schema}.transactions))
+                    ON CONFLICT (year) DO UPDATE SET
+                        file = excluded.file,
+                        row_count = excluded.row_count,
+                        archived_at = CURRENT_TIMESTAMP
+                    """,
+                    (year, os.path.basename(path)),
+                )
+            finally:
+                conn.execute("DROP TABLE temp.archived_now")
+    return moved
+
+
+def archivable_years(pool: ConnectionPool, before: int) -> List[int]:
+    """Years before `before` that still have rows in the main database."""
+    with pool.reader() as conn:
+        rows = conn.execute(
+            """
+            SELECT DISTINCT CAST(substr(transaction_date, 1, 4) AS INTEGER) AS year
+            FROM transactions
+            WHERE transaction_date < ?
+            ORDER BY year
+            """,
+            (f"{before:04d}-01-01",),
+        ).fetchall()
+    return [r["year"] for r in rows]
+
+
+def partition_rows(
+    conn: sqlite3.Connection, db_path: str, sql: str, params: Sequence[Any] = ()
+) -> Iterator[Tuple[Any, ...]]:
+    """
+    Run `sql` (a query on `transactions`) in every partition file and
+    yield the rows. Each file is opened on a connection of its own, so
+    unlike union_sources this works inside a write transaction on conn
+    however many partitions there are (ATTACHed files cannot be detached
+    before the transaction ends).
+    """
+    for partition in list_partitions(conn, db_path):
+        if not os.path.exists(partition.path):
+            continue
+        part = sqlite3.connect(partition.path)
+        try:
+            yield from part.execute(sql, params).fetchall()
+        finally:
+            part.close()
+
+
+def purge_account(
+    conn: sqlite3.Connection, db_path: str, account_id: int, timeout: float = 5.0
+) -> int:
+    """
+    Delete an account's archived transactions (the foreign key cascade
+    does not reach other files). Returns the number of rows deleted.
+
+    Runs inside the caller's write transaction on conn, which records the
+    new partition row counts. Each partition file is changed on its own
+    connection and commits by itself (SQLite is not atomic across files
+    in WAL mode anyway), so call this last in the transaction.
+    """
+    deleted = 0
+    for partition in list_partitions(conn, db_path):
+        if not os.path.exists(partition.path):
+            continue
+        part = sqlite3.connect(partition.path, timeout=timeout)
+        try:
+            with part:
+                deleted += part.execute(
+                    "DELETE FROM transactions WHERE account_id = ?", (account_id,)
+                ).rowcount
+                row_count = part.execute("SELECT COUNT(*) FROM transactions").fetchone()[0]
+        finally:
+            part.close()
+        conn.execute(
+            "UPDATE archive_partitions SET row_count = ? WHERE year = ?",
+            (row_count, partition.year),
+        )
+    return deleted
@@ -0,0 +1,146 @@
+"""
+Storage for the per-user category classifier (nlp/classifier.py).
+
+category_model holds one row per (user, category): how many of the
+user's transactions are in the category, and per hashed word bucket how
+many of those contain it. DatabaseManager keeps it equal to those counts
+over the user's categorized transactions:
+
+- add/bulk add learn the new rows,
+- update_transaction unlearns the old description/category and learns
+  the new one (a corrected category moves the example),
+- delete_transaction unlearns the row,
+- deleting an account retrains the user's model.
+
+Archived transactions keep counting, as they do in account_balances.
+Every function here runs on the writer connection inside the caller's
+transaction, so the model commits or rolls back with the rows.
+"""
+
+import sqlite3
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from nlp.classifier import N_BUCKETS, CategoryModel, decode_counts, encode_counts, token_buckets
+
+from .archive import partition_rows
+
+
+# (category_id, description); rows without a category are ignored.
+Example = Tuple[Optional[int], Optional[str]]
+
+
+def learn_categories(
+    conn: sqlite3.Connection, user_id: int, examples: Iterable[Example], sign: int = 1
+) -> None:
+    """
+    Add (sign=1) or remove (sign=-1) examples from the user's model, with
+    one read and one write per category touched.
+    """
+    docs: Dict[int, int] = {}
+    buckets: Dict[int, List[np.ndarray]] = {}
+    # Statement imports repeat the same few descriptions many times over.
+    tokenized: Dict[Optional[str], np.ndarray] = {}
+    for category_id, description in examples:
+        if category_id is None:
+            continue
+        docs[category_id] = docs.get(category_id, 0) + 1
+        words = tokenized.get(description)
+        if words is None:
+            words = tokenized[description] = token_buckets(description)
+        buckets.setdefault(category_id, []).append(words)
+    if not docs:
+        return
+
+    placeholders = ", ".join("?" * len(docs))
+    stored = {
+        r["category_id"]: r
+        for r in conn.execute(
+            f"""
+            SELECT category_id, doc_count, term_counts FROM category_model
+            WHERE user_id = ? AND category_id IN ({placeholders})
+            """,
+            (user_id, *docs),
+        )
+    }
+    for category_id, doc_delta in docs.items():
+        row = stored.get(category_id)
+        counts = decode_counts(row["term_counts"]) if row else np.zeros(N_BUCKETS)
+        np.add.at(counts, np.concatenate(buckets[category_id]), sign)
+        doc_count = (row["doc_count"] if row else 0) + sign * doc_delta
+        if doc_count <= 0:
+            conn.execute(
+                "DELETE FROM category_model WHERE user_id = ? AND category_id = ?",
+                (user_id, category_id),
+            )
+            continue
+        conn.execute(
+            """
+            INSERT INTO category_model (user_id, category_id, doc_count, term_counts)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT (user_id, category_id) DO UPDATE SET
+                doc_count = excluded.doc_count,
+                term_counts = excluded.term_counts
+            """,
+            (user_id, category_id, doc_count, encode_counts(np.maximum(counts, 0))),
+        )
+
+
+def retrain_categories(conn: sqlite3.Connection, db_path: str, user_id: int) -> int:
+    """
+    Rebuild the user's model from all their categorized transactions,
+    archived years included. Returns the number of examples.
+    """
+    conn.execute("DELETE FROM category_model WHERE user_id = ?", (user_id,))
+    examples: List[Example] = [
+        (r["category_id"], r["description"])
+        for r in conn.execute(
+            """
+            SELECT t.category_id, t.description
+            FROM transactions t
+            JOIN accounts a ON a.id = t.account_id
+            WHERE a.user_id = ? AND t.category_id IS NOT NULL
+            """,
+            (user_id,),
+        )
+    ]
+    # Archived years are read file by file: this runs inside the caller's
+    # write transaction, which could not detach attached partitions.
+    account_ids = [
+        r["id"] for r in conn.execute("SELECT id FROM accounts WHERE user_id = ?", (user_id,))
+    ]
+    if account_ids:
+        examples.extend(
+            partition_rows(
+                conn,
+                db_path,
+                f"""
+                SELECT category_id, description FROM transactions
+                WHERE category_id IS NOT NULL
+                  AND account_id IN ({", ".join("?" * len(account_ids))})
+                """,
+                account_ids,
+            )
+        )
+    learn_categories(conn, user_id, examples)
+    return len(examples)
+
+
+def load_category_model(conn: sqlite3.Connection, user_id: int) -> Optional[CategoryModel]:
+    """The user's model, or None before any categorized transaction."""
+    rows = conn.execute(
+        """
+        SELECT category_id, doc_count, term_counts FROM category_model
+        WHERE user_id = ?
+        ORDER BY category_id
+        """,
+        (user_id,),
+    ).fetchall()
+    if not rows:
+        return None
+    return CategoryModel(
+        category_ids=np.array([r["category_id"] for r in rows], dtype=np.int64),
+        doc_counts=np.array([r["doc_count"] for r in rows], dtype=np.float64),
+        counts=np.vstack([decode_counts(r["term_counts"]) for r in rows]),
+    )
@@ -1,10 +1,124 @@
 import os
+import re
 import sqlite3
-from typing import Optional, List, Dict, Any
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager
+from datetime import date, timedelta
+from functools import partial
+from itertools import islice
+from typing import TYPE_CHECKING, Optional, List, Dict, Any, Iterable, Iterator, Tuple
+
+from config import DB_POOL_SIZE, DB_BUSY_TIMEOUT_MS, DB_DURABILITY, DB_GROUP_COMMIT
+from .archive import archived_year, list_partitions, purge_account, union_sources
+from .category_model import learn_categories, load_category_model, retrain_categories
+from .migrate import MIGRATIONS_DIR, migrate
+from .pool import ConnectionPool
+from .write_queue import GroupCommitQueue, Write
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+    from nlp.classifier import CategoryModel
 
 
 DB_PATH = os.path.join("data", "expenses.db")
-SCHEMA_PATH = os.path.join("database", "schema.sql")
+
+# Transaction listing columns; the category name comes from the categories
+# table (see TRANSACTION_FROM).
+TRANSACTION_COLUMNS = (
+    "t.id, t.account_id, t.type, t.amount, t.description, c.name AS category, "
+    "t.transaction_date, t.created_at"
+)
+TRANSACTION_FROM = "transactions t LEFT JOIN categories c ON c.id = t.category_id"
+
+# Keyset pagination cursor: (transaction_date, id) of the last row of a page.
+PageCursor = Tuple[str, int]
+
+# Bucket sizes accepted by get_period_totals.
+GRANULARITIES = ("day", "month")
+
+# A search box term: a "quoted phrase" or a bare word, either optionally
+# followed by * for a prefix match.
+_SEARCH_TERM = re.compile(r'"([^"]*)"(\*?)|([^\s"]+)')
+
+# Lifetime aggregates over a transactions source (see _grouped_totals), in
+# the column order of account_balances and monthly_rollups.
+_BALANCE_TOTALS_SQL = """
+    SELECT
+        account_id,
+        SUM(CASE WHEN type = 'income' THEN amount ELSE 0 END),
+        SUM(CASE WHEN type = 'expense' THEN amount ELSE 0 END),
+        COUNT(*)
+    FROM {source}
+    GROUP BY account_id
+"""
+_ROLLUP_TOTALS_SQL = """
+    SELECT
+        account_id,
+        substr(transaction_date, 1, 7),
+        COALESCE(category_id, 0),
+        type,
+        SUM(amount),
+        COUNT(*)
+    FROM {source}
+    GROUP BY 1, 2, 3, 4
+"""
+
+# add_transactions_bulk: derived tables for the rows of one batch (ids
+# above ?), while bulk_load holds the insert triggers back (migration 0010).
+_BULK_BALANCES_SQL = """
+    INSERT INTO account_balances (account_id, total_income, total_expense, transaction_count)
+    SELECT
+        account_id,
+        SUM(CASE WHEN type = 'income' THEN amount ELSE 0 END),
+        SUM(CASE WHEN type = 'expense' THEN amount ELSE 0 END),
+        COUNT(*)
+    FROM transactions
+    WHERE id > ?
+    GROUP BY account_id
+    ON CONFLICT (account_id) DO UPDATE SET
+        total_income = total_income + excluded.total_income,
+        total_expense = total_expense + excluded.total_expense,
+        transaction_count = transaction_count + excluded.transaction_count
+"""
+_BULK_ROLLUPS_SQL = """
+    INSERT INTO monthly_rollups (
+        account_id, month, category_id, type, total_amount, transaction_count
+    )
+    SELECT
+        account_id,
+        substr(transaction_date, 1, 7),
+        COALESCE(category_id, 0),
+        type,
+        SUM(amount),
+        COUNT(*)
+    FROM transactions
+    WHERE id > ?
+    GROUP BY 1, 2, 3, 4
+    ON CONFLICT (account_id, month, category_id, type) DO UPDATE SET
+        total_amount = total_amount + excluded.total_amount,
+        transaction_count = transaction_count + excluded.transaction_count
+"""
+_BULK_SEARCH_SQL = """
+    INSERT INTO transactions_fts (rowid, description, account)
+    SELECT id, COALESCE(description, ''), 'a' || account_id
+    FROM transactions
+    WHERE id > ?
+"""
+
+# search_transactions ranks at most this many of the newest matching rows.
+# BM25 costs time per scored row, so this keeps searches for very common
+# words in the millisecond range on multi-million-row tables.
+SEARCH_RANK_WINDOW = 500
+
+# Lowest classifier probability at which suggest_category names a category,
+# and at which backfill_categories assigns one without the user looking.
+SUGGEST_MIN_CONFIDENCE = 0.6
+BACKFILL_MIN_CONFIDENCE = 0.8
+
+# Users whose category model is kept in memory (see _category_model).
+CATEGORY_MODEL_CACHE_SIZE = 256
 
 
 class DatabaseManager:
@@ -12,27 +126,121 @@ class DatabaseManager:
     Handles all DB operations:
     - users
     - accounts (per user)
+    - categories (per user)
     - transactions
+
+    One instance is safe to share between threads (e.g. all Streamlit
+    sessions of a process): reads use pooled WAL reader connections and
+    writes are serialized through a single writer (see database/pool.py).
+
+    With group_commit, transaction writes (add/update/delete) are committed
+    in batches by a background thread (see database/write_queue.py). The
+    *_async variants return a Future that resolves once the write is
+    committed; the plain methods wait for it.
     """
 
-    def __init__(self, db_path: str = DB_PATH, schema_path: str = SCHEMA_PATH) -> None:
+    def __init__(
+        self,
+        db_path: str = DB_PATH,
+        migrations_dir: str = MIGRATIONS_DIR,
+        pool_size: int = DB_POOL_SIZE,
+        busy_timeout_ms: int = DB_BUSY_TIMEOUT_MS,
+        auto_migrate: bool = True,
+        durability: str = DB_DURABILITY,
+        group_commit: bool = DB_GROUP_COMMIT,
+    ) -> None:
+        """
+        Open (creating if needed) the database at db_path.
+
+        With auto_migrate (the default) any pending schema migrations are
+        applied first; on an up-to-date database this is a single
+        PRAGMA user_version read. Pass auto_migrate=False to open a database
+        without touching its schema (see database/migrate.py).
+
+        durability is "strict" (fsync on every commit) or "batched" (see
+        database/pool.py); group_commit turns on the write queue.
+        """
         os.makedirs(os.path.dirname(db_path), exist_ok=True)
 
-        self.conn = sqlite3.connect(db_path, detect_types=sqlite3.PARSE_DECLTYPES)
-        self.conn.row_factory = sqlite3.Row
-        self.conn.execute("PRAGMA foreign_keys = ON;")
+        self.pool = ConnectionPool(
+            db_path,
+            pool_size=pool_size,
+            busy_timeout_ms=busy_timeout_ms,
+            durability=durability,
+        )
+
+        # Bumped on every write of this manager that changes accounts or
+        # transactions; data_version adds the file's own commit counter.
+        self._data_version = 0
+        self._version_lock = threading.Lock()
+
+        # user_id -> (data_version it was loaded at, category model)
+        self._category_models: Dict[int, Tuple[int, Optional["CategoryModel"]]] = {}
 
-        self._initialize_db(schema_path)
+        if auto_migrate:
+            migrate(self.pool, migrations_dir)
 
-    # ---------- Initialization ----------
+        self._write_queue: Optional[GroupCommitQueue] = None
+        if group_commit:
+            self._write_queue = GroupCommitQueue(self.pool, on_commit=self._mark_changed)
 
-    def _initialize_db(self, schema_path: str) -> None:
-        """Create tables if they don't exist."""
-        with open(schema_path, "r", encoding="utf-8") as f:
-            schema_sql = f.read()
+    @property
+    def data_version(self) -> int:
+        """
+        Value that changes whenever account/transaction data changes,
+        for keying cached query results. It combines this manager's own
+        write counter with SQLite's data_version of the file, so commits
+        made by other processes (or other managers on the same file)
+        change it too.
+        """
+        return self._data_version + self.pool.data_version()
+
+    def _mark_changed(self) -> None:
+        # Called after the write has committed, so a reader that sees the
+        # new version also sees the new data. Writes can finish on several
+        # threads at once (e.g. the group-commit thread), hence the lock.
+        with self._version_lock:
+            self._data_version += 1
+
+    @contextmanager
+    def snapshot(self) -> Iterator["DatabaseManager"]:
+        """
+        Read a consistent point in time, e.g. for a long export or report:
+
+            with db.snapshot() as snap:
+                df = snap.get_transactions_frame(account_id)
+                summary = snap.get_account_summary(account_id)
 
-        self.conn.executescript(schema_sql)
-        self.conn.commit()
+        Every read this thread makes inside the block sees the database as
+        it was when the block started, on a dedicated read-only connection
+        (see ConnectionPool.snapshot). Writers are never blocked by it.
+        Archive partitions that no longer fit on the snapshot connection
+        are read on their own (see archive.union_sources).
+        """
+        with self.pool.snapshot():
+            yield self
+
+    def _submit_write(self, write: Write) -> "Future[Any]":
+        """
+        Run `write(conn)` in a write transaction and return a Future for
+        its result: through the group-commit queue if enabled, otherwise
+        right away (the returned Future is already done).
+        """
+        # A thread already inside a write joins that transaction; queueing
+        # would wait on the batch thread, which needs the same writer.
+        if self._write_queue is not None and not self.pool.holds_writer():
+            return self._write_queue.submit(write)
+
+        future: "Future[Any]" = Future()
+        try:
+            with self.pool.writer() as conn:
+                result = write(conn)
+        except Exception as exc:
+            future.set_exception(exc)
+        else:
+            self._mark_changed()
+            future.set_result(result)
+        return future
 
     # ---------- User management ----------
 
@@ -48,52 +256,48 @@ class DatabaseManager:
         Returns user_id if created, or None if username already exists.
         """
         try:
-            cur = self.conn.cursor()
-            cur.execute(
-                """
-                INSERT INTO users (username, password_hash, recovery_question, recovery_answer_hash)
-                VALUES (?, ?, ?, ?)
-                """,
-                (username, password_hash, recovery_question, recovery_answer_hash),
-            )
-            self.conn.commit()
-            return cur.lastrowid
+            with self.pool.writer() as conn:
+                cur = conn.execute(
+                    """
+                    INSERT INTO users (username, password_hash, recovery_question, recovery_answer_hash)
+                    VALUES (?, ?, ?, ?)
+                    """,
+                    (username, password_hash, recovery_question, recovery_answer_hash),
+                )
+                return cur.lastrowid
         except sqlite3.IntegrityError:
             # UNIQUE(username) violated
             return None
 
     def get_user_by_username(self, username: str) -> Optional[Dict[str, Any]]:
-        cur = self.conn.cursor()
-        cur.execute(
-            "SELECT * FROM users WHERE username = ?",
-            (username,),
-        )
-        row = cur.fetchone()
+        with self.pool.reader() as conn:
+            row = conn.execute(
+                "SELECT * FROM users WHERE username = ?",
+                (username,),
+            ).fetchone()
         return dict(row) if row else None
 
     def get_user_by_id(self, user_id: int) -> Optional[Dict[str, Any]]:
-        cur = self.conn.cursor()
-        cur.execute(
-            "SELECT * FROM users WHERE id = ?",
-            (user_id,),
-        )
-        row = cur.fetchone()
+        with self.pool.reader() as conn:
+            row = conn.execute(
+                "SELECT * FROM users WHERE id = ?",
+                (user_id,),
+            ).fetchone()
         return dict(row) if row else None
 
     def update_user_password(self, user_id: int, new_password_hash: str) -> None:
         """
         Update the password hash for a user (used by 'forgot password' flow).
         """
-        cur = self.conn.cursor()
-        cur.execute(
-            """
-            UPDATE users
-            SET password_hash = ?
-            WHERE id = ?
-            """,
-            (new_password_hash, user_id),
-        )
-        self.conn.commit()
+        with self.pool.writer() as conn:
+            conn.execute(
+                """
+                UPDATE users
+                SET password_hash = ?
+                WHERE id = ?
+                """,
+                (new_password_hash, user_id),
+            )
 
     # ---------- Account management (per user) ----------
 
@@ -103,53 +307,217 @@ class DatabaseManager:
         Returns account_id if created, or None if (user_id, name) already exists.
         """
         try:
-            cur = self.conn.cursor()
-            cur.execute(
-                """
-                INSERT INTO accounts (user_id, name, description)
-                VALUES (?, ?, ?)
-                """,
-                (user_id, name, description),
-            )
-            self.conn.commit()
-            return cur.lastrowid
+            with self.pool.writer() as conn:
+                cur = conn.execute(
+                    """
+                    INSERT INTO accounts (user_id, name, description)
+                    VALUES (?, ?, ?)
+                    """,
+                    (user_id, name, description),
+                )
         except sqlite3.IntegrityError:
             return None
+        self._mark_changed()
+        return cur.lastrowid
 
     def get_all_accounts(self, user_id: int) -> List[Dict[str, Any]]:
         """
         Return all accounts belonging to this user.
         """
-        cur = self.conn.cursor()
-        cur.execute(
-            """
-            SELECT id, user_id, name, description, created_at
-            FROM accounts
-            WHERE user_id = ?
-            ORDER BY created_at
-            """,
-            (user_id,),
-        )
-        rows = cur.fetchall()
+        with self.pool.reader() as conn:
+            rows = conn.execute(
+                """
+                SELECT id, user_id, name, description, created_at
+                FROM accounts
+                WHERE user_id = ?
+                ORDER BY created_at, id
+                """,
+                (user_id,),
+            ).fetchall()
         return [dict(r) for r in rows]
 
     def delete_account(self, account_id: int, user_id: Optional[int] = None) -> None:
         """
-        Delete an account (and cascade-delete its transactions).
-        If user_id is given, ensures the account belongs to that user.
+        Delete an account (and cascade-delete its transactions, archived
+        ones included). If user_id is given, ensures the account belongs
+        to that user.
         """
-        cur = self.conn.cursor()
-        if user_id is not None:
-            cur.execute(
-                "DELETE FROM accounts WHERE id = ? AND user_id = ?",
-                (account_id, user_id),
-            )
-        else:
-            cur.execute(
-                "DELETE FROM accounts WHERE id = ?",
+        with self.pool.writer() as conn:
+            owner = conn.execute(
+                "SELECT user_id FROM accounts WHERE id = ?",
                 (account_id,),
-            )
-        self.conn.commit()
+            ).fetchone()
+            if user_id is not None:
+                cur = conn.execute(
+                    "DELETE FROM accounts WHERE id = ? AND user_id = ?",
+                    (account_id, user_id),
+                )
+            else:
+                cur = conn.execute(
+                    "DELETE FROM accounts WHERE id = ?",
+                    (account_id,),
+                )
+            if cur.rowcount:
+                # The cascade removed the account's rows behind the category
+                # model's back; recount the owner's remaining transactions.
+                retrain_categories(conn, self.pool.db_path, owner["user_id"])
+                purge_account(
+                    conn, self.pool.db_path, account_id, self.pool.busy_timeout_ms / 1000.0
+                )
+        self._mark_changed()
+
+    # ---------- Category management (per user) ----------
+
+    @staticmethod
+    def _category_id(conn: sqlite3.Connection, user_id: int, name: Optional[str]) -> Optional[int]:
+        """
+        Resolve a category name to its id for this user, creating the
+        category on first use. Blank names resolve to None (uncategorized).
+        Must be called on the writer connection.
+        """
+        name = (name or "").strip()
+        if not name:
+            return None
+        key = name.casefold()
+        row = conn.execute(
+            "SELECT id FROM categories WHERE user_id = ? AND name_key = ?",
+            (user_id, key),
+        ).fetchone()
+        if row is not None:
+            return row["id"]
+        cur = conn.execute(
+            "INSERT INTO categories (user_id, name, name_key) VALUES (?, ?, ?)",
+            (user_id, name, key),
+        )
+        return cur.lastrowid
+
+    @staticmethod
+    def _account_user_id(conn: sqlite3.Connection, account_id: int) -> int:
+        row = conn.execute(
+            "SELECT user_id FROM accounts WHERE id = ?",
+            (account_id,),
+        ).fetchone()
+        if row is None:
+            raise ValueError(f"Account {account_id} does not exist")
+        return row["user_id"]
+
+    def get_categories(self, user_id: int) -> List[Dict[str, Any]]:
+        """
+        Return all categories of this user, ordered by name.
+        """
+        with self.pool.reader() as conn:
+            rows = conn.execute(
+                """
+                SELECT id, name
+                FROM categories
+                WHERE user_id = ?
+                ORDER BY name_key
+                """,
+                (user_id,),
+            ).fetchall()
+        return [dict(r) for r in rows]
+
+    def _category_model(self, user_id: int) -> Optional["CategoryModel"]:
+        """
+        The user's category model, loaded once per data_version (any write
+        can have changed it) and kept for CATEGORY_MODEL_CACHE_SIZE users.
+        """
+        version = self.data_version
+        cached = self._category_models.get(user_id)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        with self.pool.reader() as conn:
+            model = load_category_model(conn, user_id)
+        models = self._category_models
+        if user_id not in models and len(models) >= CATEGORY_MODEL_CACHE_SIZE:
+            models.pop(next(iter(models)), None)
+        self._category_models[user_id] = (version, model)
+        return model
+
+    def _category_names(self, user_id: int) -> Dict[int, str]:
+        return {c["id"]: c["name"] for c in self.get_categories(user_id)}
+
+    def suggest_category(
+        self,
+        user_id: int,
+        description: str,
+        min_confidence: float = SUGGEST_MIN_CONFIDENCE,
+    ) -> Optional[str]:
+        """
+        Category this user would most likely give a transaction with this
+        description, learned from their own categorized transactions
+        (see database/category_model.py). None when the model has too
+        little to go on or is less than min_confidence sure.
+        """
+        model = self._category_model(user_id)
+        prediction = model.predict(description) if model is not None else None
+        if prediction is None or prediction[1] < min_confidence:
+            return None
+        return self._category_names(user_id).get(prediction[0])
+
+    def retrain_category_model(self, user_id: int) -> int:
+        """
+        Rebuild the user's category model from scratch (it is normally kept
+        up to date by every write). Returns the number of examples.
+        """
+        with self.pool.writer() as conn:
+            count = retrain_categories(conn, self.pool.db_path, user_id)
+        self._mark_changed()
+        return count
+
+    def backfill_categories(
+        self,
+        user_id: int,
+        min_confidence: float = BACKFILL_MIN_CONFIDENCE,
+        dry_run: bool = False,
+    ) -> Dict[str, int]:
+        """
+        Categorize the user's uncategorized transactions (archived years
+        excepted) where the category model is at least min_confidence
+        sure. The model is scored once over the snapshot it starts from,
+        and the assignments then count as training data like any other.
+        With dry_run nothing is written. Returns {category name: count}.
+        """
+        model = self._category_model(user_id)
+        if model is None:
+            return {}
+        with self.pool.reader() as conn:
+            rows = conn.execute(
+                """
+                SELECT t.id, t.description
+                FROM transactions t
+                JOIN accounts a ON a.id = t.account_id
+                WHERE a.user_id = ? AND t.category_id IS NULL
+                """,
+                (user_id,),
+            ).fetchall()
+        predictions = model.predict_many(r["description"] for r in rows)
+        assignments = [
+            (p[0], r["id"], r["description"])
+            for r, p in zip(rows, predictions)
+            if p is not None and p[1] >= min_confidence
+        ]
+
+        if not dry_run and assignments:
+            with self.pool.writer() as conn:
+                # Rows categorized since the read above keep their category.
+                assignments = [
+                    (category_id, tx_id, description)
+                    for category_id, tx_id, description in assignments
+                    if conn.execute(
+                        "UPDATE transactions SET category_id = ? "
+                        "WHERE id = ? AND category_id IS NULL",
+                        (category_id, tx_id),
+                    ).rowcount
+                ]
+                learn_categories(conn, user_id, [(c, d) for c, _, d in assignments])
+            self._mark_changed()
+
+        names = self._category_names(user_id)
+        counts: Dict[str, int] = {}
+        for category_id, _, _ in assignments:
+            counts[names[category_id]] = counts.get(names[category_id], 0) + 1
+        return counts
 
     # ---------- Transaction management ----------
 
@@ -162,60 +530,480 @@ class DatabaseManager:
         category: str,
         transaction_date: str,
     ) -> int:
-        cur = self.conn.cursor()
-        cur.execute(
+        return self.add_transaction_async(
+            account_id, trans_type, amount, description, category, transaction_date
+        ).result()
+
+    def add_transaction_async(
+        self,
+        account_id: int,
+        trans_type: str,
+        amount: float,
+        description: str,
+        category: str,
+        transaction_date: str,
+    ) -> "Future[int]":
+        """
+        Like add_transaction, but returns a Future for the new transaction
+        id instead of waiting for the commit.
+        """
+        return self._submit_write(
+            partial(
+                self._insert_transaction,
+                account_id=account_id,
+                trans_type=trans_type,
+                amount=amount,
+                description=description,
+                category=category,
+                transaction_date=transaction_date,
+            )
+        )
+
+    def _insert_transaction(
+        self,
+        conn: sqlite3.Connection,
+        account_id: int,
+        trans_type: str,
+        amount: float,
+        description: str,
+        category: str,
+        transaction_date: str,
+    ) -> int:
+        user_id = self._account_user_id(conn, account_id)
+        category_id = self._category_id(conn, user_id, category)
+        cur = conn.execute(
             """
             INSERT INTO transactions (
-                account_id, type, amount, description, category, transaction_date
+                account_id, type, amount, description, category_id, transaction_date
             )
             VALUES (?, ?, ?, ?, ?, ?)
             """,
-            (account_id, trans_type, amount, description, category, transaction_date),
+            (account_id, trans_type, amount, description, category_id, transaction_date),
         )
-        self.conn.commit()
+        learn_categories(conn, user_id, [(category_id, description)])
         return cur.lastrowid
 
-    def get_transactions(
+    def add_transactions_bulk(
         self,
+        rows: Iterable[Tuple[int, str, float, str, str, str]],
+        batch_size: int = 50_000,
+    ) -> int:
+        """
+        Insert many transactions in a single DB transaction.
+
+        rows: iterable of
+            (account_id, trans_type, amount, description, category, transaction_date)
+        It is consumed lazily in chunks of `batch_size` and handed to
+        executemany, so a generator over a large file is never fully
+        materialised. Either every row is inserted or none is.
+        Category names are resolved to category ids once per distinct
+        (account, name) pair, and the category model learns each batch.
+        The per-row insert triggers are held back during a batch (see
+        migration 0010): running totals, rollups and the search index
+        are updated with one grouped statement each per batch.
+        Returns the number of rows inserted.
+        """
+        it = iter(rows)
+        inserted = 0
+        with self.pool.writer() as conn:
+            user_ids: Dict[int, int] = {}
+            category_ids: Dict[Tuple[int, str], Optional[int]] = {}
+
+            def resolve(row: Tuple[int, str, float, str, str, str]) -> Tuple[Any, ...]:
+                account_id, trans_type, amount, description, category, tx_date = row
+                key = (account_id, category)
+                if key not in category_ids:
+                    if account_id not in user_ids:
+                        user_ids[account_id] = self._account_user_id(conn, account_id)
+                    category_ids[key] = self._category_id(conn, user_ids[account_id], category)
+                return (account_id, trans_type, amount, description, category_ids[key], tx_date)
+
+            while True:
+                batch = [resolve(row) for row in islice(it, batch_size)]
+                if not batch:
+                    break
+                # New ids are above the current maximum, so the batch is
+                # exactly the rows with id > last_id.
+                last_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM transactions").fetchone()[0]
+                conn.execute("INSERT INTO bulk_load (id) VALUES (1)")
+                conn.executemany(
+                    """
+                    INSERT INTO transactions (
+                        account_id, type, amount, description, category_id, transaction_date
+                    )
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    """,
+                    batch,
+                )
+                for sql in (_BULK_BALANCES_SQL, _BULK_ROLLUPS_SQL, _BULK_SEARCH_SQL):
+                    conn.execute(sql, (last_id,))
+                conn.execute("DELETE FROM bulk_load")
+                examples: Dict[int, List[Tuple[Optional[int], str]]] = {}
+                for account_id, _, _, description, category_id, _ in batch:
+                    examples.setdefault(user_ids[account_id], []).append((category_id, description))
+                for user_id, user_examples in examples.items():
+                    learn_categories(conn, user_id, user_examples)
+                inserted += len(batch)
+        if inserted:
+            self._mark_changed()
+        return inserted
+
+    @staticmethod
+    def _transaction_filters(
         account_id: int,
         start_date: Optional[str] = None,
         end_date: Optional[str] = None,
         trans_type: Optional[str] = None,
         category: Optional[str] = None,
-    ) -> List[Dict[str, Any]]:
+    ) -> Tuple[List[str], List[Any]]:
         """
-        Fetch transactions for a given account with optional filters.
+        Build the WHERE conditions (and their parameters) shared by the
+        transaction listing queries (transactions aliased as `t`).
+
+        The category name is resolved to its id by a one-row lookup on
+        categories(user_id, name_key), so the filter itself is an integer
+        equality served by idx_transactions_account_category_date.
         """
-        query = [
-            "SELECT id, account_id, type, amount, description, category,",
-            "       transaction_date, created_at",
-            "FROM transactions",
-            "WHERE account_id = ?",
-        ]
+        conditions = ["t.account_id = ?"]
         params: List[Any] = [account_id]
 
         if start_date is not None:
-            query.append("AND transaction_date >= ?")
+            conditions.append("t.transaction_date >= ?")
             params.append(start_date)
 
         if end_date is not None:
-            query.append("AND transaction_date <= ?")
+            conditions.append("t.transaction_date <= ?")
             params.append(end_date)
 
         if trans_type is not None:
-            query.append("AND type = ?")
+            conditions.append("t.type = ?")
             params.append(trans_type)
 
         if category is not None:
-            query.append("AND LOWER(category) = LOWER(?)")
-            params.append(category)
+            conditions.append(
+                """t.category_id = (
+                    SELECT cf.id FROM categories cf
+                    WHERE cf.user_id = (SELECT user_id FROM accounts WHERE id = ?)
+                      AND cf.name_key = ?
+                )"""
+            )
+            params.extend([account_id, category.strip().casefold()])
 
-        query.append("ORDER BY transaction_date DESC, id DESC")
+        return conditions, params
 
-        sql = " ".join(query)
-        cur = self.conn.cursor()
-        cur.execute(sql, params)
-        rows = cur.fetchall()
+    def get_transactions(
+        self,
+        account_id: int,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        trans_type: Optional[str] = None,
+        category: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Fetch transactions for a given account with optional filters.
+        Archived years overlapping the date range are included (see
+        database/archive.py).
+        """
+        conditions, params = self._transaction_filters(
+            account_id, start_date, end_date, trans_type, category
+        )
+        with self.pool.reader() as conn:
+            partitions = list_partitions(conn, self.pool.db_path, start_date, end_date)
+            rows = []
+            for source_conn, source in union_sources(conn, partitions):
+                sql = f"""
+                    SELECT {TRANSACTION_COLUMNS}
+                    FROM {source} t LEFT JOIN categories c ON c.id = t.category_id
+                    WHERE {" AND ".join(conditions)}
+                    ORDER BY t.transaction_date DESC, t.id DESC
+                """
+                rows.extend(source_conn.execute(sql, params).fetchall())
+        if partitions:
+            # Results of several partition groups: restore the overall order.
+            rows.sort(key=lambda r: (r["transaction_date"], r["id"]), reverse=True)
+        return [dict(r) for r in rows]
+
+    def get_transactions_page(
+        self,
+        account_id: int,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        trans_type: Optional[str] = None,
+        category: Optional[str] = None,
+        limit: int = 50,
+        after: Optional[PageCursor] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[PageCursor]]:
+        """
+        Fetch one page of transactions, newest first (same order as
+        get_transactions).
+
+        Uses keyset pagination on (transaction_date, id): `after` is the
+        cursor returned for the previous page, and the query seeks straight
+        to it instead of skipping rows with OFFSET, so every page costs the
+        same no matter how deep it is.
+
+        Returns (rows, next_cursor); next_cursor is None on the last page.
+        Archived years between start_date and the cursor are included.
+        """
+        conditions, params = self._transaction_filters(
+            account_id, start_date, end_date, trans_type, category
+        )
+        last_date = end_date
+        if after is not None:
+            after_date, after_id = after
+            if isinstance(after_date, date):
+                after_date = after_date.isoformat()
+            conditions.append("(t.transaction_date, t.id) < (?, ?)")
+            params.extend([after_date, after_id])
+            # Later archived years cannot hold rows past the cursor.
+            last_date = after_date if end_date is None else min(str(end_date), after_date)
+        params.append(limit + 1)
+
+        with self.pool.reader() as conn:
+            partitions = list_partitions(conn, self.pool.db_path, start_date, last_date)
+            rows = []
+            for source_conn, source in union_sources(conn, partitions):
+                sql = f"""
+                    SELECT {TRANSACTION_COLUMNS}
+                    FROM {source} t LEFT JOIN categories c ON c.id = t.category_id
+                    WHERE {" AND ".join(conditions)}
+                    ORDER BY t.transaction_date DESC, t.id DESC
+                    LIMIT ?
+                """
+                rows.extend(source_conn.execute(sql, params).fetchall())
+        if partitions:
+            # Each partition group returned its own first rows: merge them.
+            rows.sort(key=lambda r: (r["transaction_date"], r["id"]), reverse=True)
+
+        page = [dict(r) for r in rows[:limit]]
+        next_cursor: Optional[PageCursor] = None
+        if len(rows) > limit:
+            last = page[-1]
+            last_date = last["transaction_date"]
+            if isinstance(last_date, date):
+                last_date = last_date.isoformat()
+            next_cursor = (last_date, last["id"])
+        return page, next_cursor
+
+    def iter_transactions(
+        self,
+        account_id: int,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        trans_type: Optional[str] = None,
+        category: Optional[str] = None,
+        chunk_size: int = 1000,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream transactions (newest first) in chunks of `chunk_size`.
+
+        Each chunk is a separate keyset-paginated query, so no connection
+        is held between chunks and memory stays bounded by the chunk size.
+        """
+        cursor: Optional[PageCursor] = None
+        while True:
+            page, cursor = self.get_transactions_page(
+                account_id,
+                start_date=start_date,
+                end_date=end_date,
+                trans_type=trans_type,
+                category=category,
+                limit=chunk_size,
+                after=cursor,
+            )
+            yield from page
+            if cursor is None:
+                return
+
+    def get_transactions_frame(
+        self,
+        account_id: int,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        trans_type: Optional[str] = None,
+        category: Optional[str] = None,
+        chunk_size: int = 65_536,
+    ) -> "pd.DataFrame":
+        """
+        Same rows and order as get_transactions, returned as a pandas
+        DataFrame built column by column instead of via one dict per row.
+
+        SQLite hands back dates as day numbers and type/category as integer
+        codes, and every fetchmany chunk is transposed straight into typed
+        NumPy arrays. The result has float64 amount, datetime64
+        transaction_date/created_at, and categorical type/category (missing
+        categories are "Uncategorized", as in transactions_to_dataframe).
+        """
+        import numpy as np
+        import pandas as pd
+
+        conditions, params = self._transaction_filters(
+            account_id, start_date, end_date, trans_type, category
+        )
+        dtypes = [np.int64, np.int64, np.int8, np.float64, object, np.int64, np.int64, np.float64]
+        chunks: List[List[Any]] = [[] for _ in dtypes]
+
+        with self.pool.reader() as conn:
+            partitions = list_partitions(conn, self.pool.db_path, start_date, end_date)
+            for source_conn, source in union_sources(conn, partitions):
+                sql = f"""
+                    SELECT
+                        t.id,
+                        t.account_id,
+                        t.type = 'expense',
+                        t.amount,
+                        t.description,
+                        COALESCE(t.category_id, 0),
+                        CAST(julianday(t.transaction_date) - 2440587.5 AS INTEGER),
+                        CAST(strftime('%s', t.created_at) AS REAL)
+                    FROM {source} t
+                    WHERE {" AND ".join(conditions)}
+                    ORDER BY t.transaction_date DESC, t.id DESC
+                """
+                cur = source_conn.cursor()
+                # Plain tuples: no sqlite3.Row objects and no date converters.
+                cur.row_factory = None
+                cur.execute(sql, params)
+                while True:
+                    rows = cur.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    for parts, dtype, values in zip(chunks, dtypes, zip(*rows)):
+                        parts.append(np.array(values, dtype=dtype))
+            category_rows = conn.execute(
+                """
+                SELECT id, name FROM categories
+                WHERE user_id = (SELECT user_id FROM accounts WHERE id = ?)
+                ORDER BY id
+                """,
+                (account_id,),
+            ).fetchall()
+
+        (
+            ids, account_ids, type_codes, amounts, descriptions,
+            category_ids, date_days, created_seconds,
+        ) = (
+            np.concatenate(parts) if parts else np.empty(0, dtype=dtype)
+            for parts, dtype in zip(chunks, dtypes)
+        )
+
+        if partitions:
+            # Results of several partition groups: restore the overall order.
+            order = np.lexsort((ids, date_days))[::-1]
+            ids, account_ids, type_codes, amounts, descriptions = (
+                ids[order], account_ids[order], type_codes[order], amounts[order], descriptions[order]
+            )
+            category_ids, date_days, created_seconds = (
+                category_ids[order], date_days[order], created_seconds[order]
+            )
+
+        # Category ids -> categorical codes; id 0 is "Uncategorized".
+        names = [r["name"] for r in category_rows]
+        known_ids = np.array([0] + [r["id"] for r in category_rows], dtype=np.int64)
+        if "Uncategorized" in names:
+            code_of_id = np.arange(len(names) + 1) - 1
+            code_of_id[0] = names.index("Uncategorized")
+        else:
+            names = ["Uncategorized"] + names
+            code_of_id = np.arange(len(names))
+        category_codes = code_of_id[np.searchsorted(known_ids, category_ids)]
+
+        return pd.DataFrame(
+            {
+                "id": ids,
+                "account_id": account_ids,
+                "type": pd.Categorical.from_codes(type_codes, categories=["income", "expense"]),
+                "amount": amounts,
+                "description": descriptions,
+                "category": pd.Categorical.from_codes(
+                    category_codes, categories=names
+                ).remove_unused_categories(),
+                "transaction_date": date_days.astype("datetime64[D]").astype("datetime64[ns]"),
+                "created_at": pd.to_datetime(created_seconds, unit="s"),
+            }
+        )
+
+    @staticmethod
+    def _fts_query(text: str) -> str:
+        """
+        Turn search box input into an FTS5 MATCH expression.
+
+        Supports "quoted phrases" and prefix terms (word*); every other
+        character is treated as plain text, so user input can never be a
+        malformed FTS5 query. All terms must match (implicit AND).
+        Returns "" when the input has no searchable words.
+        """
+        terms = []
+        for m in _SEARCH_TERM.finditer(text):
+            phrase, phrase_star, bare = m.groups()
+            if bare is not None:
+                words = re.findall(r"\w+", bare)
+                star = "*" if bare.endswith("*") else ""
+                terms.extend(f'"{w}"' for w in words[:-1])
+            else:
+                words = re.findall(r"\w+", phrase)
+                star = phrase_star
+                words = [" ".join(words)] if words else []
+            if words:
+                terms.append(f'"{words[-1]}"{star}')
+        return " ".join(terms)
+
+    def search_transactions(
+        self,
+        account_id: int,
+        query: str,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        trans_type: Optional[str] = None,
+        category: Optional[str] = None,
+        limit: int = 50,
+    ) -> List[Dict[str, Any]]:
+        """
+        Full-text search over transaction descriptions of one account,
+        best matches first (BM25), with the same optional filters as
+        get_transactions.
+
+        query: words to match (all of them), "exact phrases" and prefixes
+        such as "gro*". Matching ignores case and accents.
+
+        Ranking covers the SEARCH_RANK_WINDOW most recently added matches
+        that pass the filters; older matches only show up when the search
+        is narrower than that. Archived years are not searched: archiving
+        removes their rows from the search index.
+        """
+        match = self._fts_query(query)
+        if not match:
+            return []
+
+        conditions, params = self._transaction_filters(
+            account_id, start_date, end_date, trans_type, category
+        )
+        # The account is matched as a token inside the FTS index. CROSS JOIN
+        # keeps the FTS index as the driving table, and the window is read
+        # in rowid order, which FTS5 serves without sorting.
+        sql = f"""
+            SELECT {TRANSACTION_COLUMNS}
+            FROM (
+                SELECT f.rowid AS id, f.rank AS rank
+                FROM transactions_fts f
+                CROSS JOIN transactions t ON t.id = f.rowid
+                WHERE transactions_fts MATCH ? AND {" AND ".join(conditions)}
+                ORDER BY f.rowid DESC
+                LIMIT ?
+            ) w
+            JOIN transactions t ON t.id = w.id
+            LEFT JOIN categories c ON c.id = t.category_id
+            ORDER BY w.rank, t.transaction_date DESC, t.id DESC
+            LIMIT ?
+        """
+        params = (
+            [f"account : a{int(account_id)} AND ({match})"]
+            + params
+            + [SEARCH_RANK_WINDOW, limit]
+        )
+
+        with self.pool.reader() as conn:
+            rows = conn.execute(sql, params).fetchall()
         return [dict(r) for r in rows]
 
     def update_transaction(
@@ -227,28 +1015,107 @@ class DatabaseManager:
         category: str,
         transaction_date: str,
     ) -> None:
-        cur = self.conn.cursor()
-        cur.execute(
+        self.update_transaction_async(
+            transaction_id, trans_type, amount, description, category, transaction_date
+        ).result()
+
+    def update_transaction_async(
+        self,
+        transaction_id: int,
+        trans_type: str,
+        amount: float,
+        description: str,
+        category: str,
+        transaction_date: str,
+    ) -> "Future[None]":
+        """Like update_transaction, but returns a Future instead of waiting."""
+        return self._submit_write(
+            partial(
+                self._update_transaction,
+                transaction_id=transaction_id,
+                trans_type=trans_type,
+                amount=amount,
+                description=description,
+                category=category,
+                transaction_date=transaction_date,
+            )
+        )
+
+    def _update_transaction(
+        self,
+        conn: sqlite3.Connection,
+        transaction_id: int,
+        trans_type: str,
+        amount: float,
+        description: str,
+        category: str,
+        transaction_date: str,
+    ) -> None:
+        row = conn.execute(
+            """
+            SELECT a.user_id, t.category_id, t.description
+            FROM transactions t
+            JOIN accounts a ON a.id = t.account_id
+            WHERE t.id = ?
+            """,
+            (transaction_id,),
+        ).fetchone()
+        if row is None:
+            self._check_not_archived(conn, transaction_id)
+            return
+        category_id = self._category_id(conn, row["user_id"], category)
+        if (row["category_id"], row["description"]) != (category_id, description):
+            # A corrected category or description moves the example.
+            learn_categories(conn, row["user_id"], [(row["category_id"], row["description"])], -1)
+            learn_categories(conn, row["user_id"], [(category_id, description)])
+        conn.execute(
             """
             UPDATE transactions
             SET type = ?,
                 amount = ?,
                 description = ?,
-                category = ?,
+                category_id = ?,
                 transaction_date = ?
             WHERE id = ?
             """,
-            (trans_type, amount, description, category, transaction_date, transaction_id),
+            (trans_type, amount, description, category_id, transaction_date, transaction_id),
         )
-        self.conn.commit()
+
+    def _check_not_archived(self, conn: sqlite3.Connection, transaction_id: int) -> None:
+        """Archived rows are read-only (see database/archive.py)."""
+        year = archived_year(conn, self.pool.db_path, transaction_id)
+        if year is not None:
+            raise ValueError(
+                f"Transaction {transaction_id} is archived ({year}) and cannot be changed"
+            )
 
     def delete_transaction(self, transaction_id: int) -> None:
-        cur = self.conn.cursor()
-        cur.execute(
+        self.delete_transaction_async(transaction_id).result()
+
+    def delete_transaction_async(self, transaction_id: int) -> "Future[None]":
+        """Like delete_transaction, but returns a Future instead of waiting."""
+        return self._submit_write(
+            partial(self._delete_transaction, transaction_id=transaction_id)
+        )
+
+    def _delete_transaction(self, conn: sqlite3.Connection, transaction_id: int) -> None:
+        row = conn.execute(
+            """
+            SELECT a.user_id, t.category_id, t.description
+            FROM transactions t
+            JOIN accounts a ON a.id = t.account_id
+            WHERE t.id = ?
+            """,
+            (transaction_id,),
+        ).fetchone()
+        if row is None:
+            self._check_not_archived(conn, transaction_id)
+            return
+        conn.execute(
             "DELETE FROM transactions WHERE id = ?",
             (transaction_id,),
         )
-        self.conn.commit()
+        learn_categories(conn, row["user_id"], [(row["category_id"], row["description"])], -1)
 
     # ---------- Summary / analytics ----------
 
@@ -259,42 +1126,594 @@ class DatabaseManager:
         end_date: Optional[str] = None,
     ) -> Dict[str, float]:
         """
-        Calculate total income, total expense, and balance for an account.
-        Optional date range filter.
+        Calculate total income, total expense, balance and transaction count
+        for an account. Optional date range filter.
+
+        Without a date range the totals come from the trigger-maintained
+        account_balances row (a single-row lookup); with one, the matching
+        transactions are aggregated, including archived years in the range.
         """
-        conditions = ["account_id = ?"]
-        params: List[Any] = [account_id]
+        total_income = total_expense = 0.0
+        transaction_count = 0
 
-        if start_date is not None:
-            conditions.append("transaction_date >= ?")
-            params.append(start_date)
+        if start_date is None and end_date is None:
+            with self.pool.reader() as conn:
+                row = conn.execute(
+                    """
+                    SELECT total_income, total_expense, transaction_count
+                    FROM account_balances
+                    WHERE account_id = ?
+                    """,
+                    (account_id,),
+                ).fetchone()
+            rows = [row] if row else []
+        else:
+            conditions = ["account_id = ?"]
+            params: List[Any] = [account_id]
 
-        if end_date is not None:
-            conditions.append("transaction_date <= ?")
-            params.append(end_date)
+            if start_date is not None:
+                conditions.append("transaction_date >= ?")
+                params.append(start_date)
 
-        where_clause = " AND ".join(conditions)
+            if end_date is not None:
+                conditions.append("transaction_date <= ?")
+                params.append(end_date)
 
-        sql = f"""
-            SELECT
-                SUM(CASE WHEN type = 'income' THEN amount ELSE 0 END) AS total_income,
-                SUM(CASE WHEN type = 'expense' THEN amount ELSE 0 END) AS total_expense
-            FROM transactions
-            WHERE {where_clause}
-        """
+            where_clause = " AND ".join(conditions)
 
-        cur = self.conn.cursor()
-        cur.execute(sql, params)
-        row = cur.fetchone()
+            # Only archived years inside the range are attached.
+            rows = []
+            with self.pool.reader() as conn:
+                partitions = list_partitions(conn, self.pool.db_path, start_date, end_date)
+                for source_conn, source in union_sources(conn, partitions):
+                    sql = f"""
+                        SELECT
+                            SUM(CASE WHEN type = 'income' THEN amount ELSE 0 END) AS total_income,
+                            SUM(CASE WHEN type = 'expense' THEN amount ELSE 0 END) AS total_expense,
+                            COUNT(*) AS transaction_count
+                        FROM {source}
+                        WHERE {where_clause}
+                    """
+                    rows.append(source_conn.execute(sql, params).fetchone())
 
-        total_income = row["total_income"] if row["total_income"] is not None else 0.0
-        total_expense = row["total_expense"] if row["total_expense"] is not None else 0.0
+        for row in rows:
+            total_income += row["total_income"] or 0.0
+            total_expense += row["total_expense"] or 0.0
+            transaction_count += row["transaction_count"] or 0
 
         return {
             "total_income": float(total_income),
             "total_expense": float(total_expense),
             "balance": float(total_income - total_expense),
+            "transaction_count": int(transaction_count),
         }
 
+    def get_category_totals(
+        self,
+        account_id: int,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        trans_type: Optional[str] = None,
+        category: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Income, expense and transaction count per category for an account,
+        with the same optional filters as get_transactions. Uncategorized
+        transactions are reported under category None.
+
+        Grouping is on the integer category_id along
+        idx_transactions_account_category_date, which also covers the
+        summed columns. Archived years in the range are included.
+        """
+        conditions, params = self._transaction_filters(
+            account_id, start_date, end_date, trans_type, category
+        )
+        totals: Dict[Optional[int], Dict[str, Any]] = {}
+        with self.pool.reader() as conn:
+            partitions = list_partitions(conn, self.pool.db_path, start_date, end_date)
+            for source_conn, source in union_sources(conn, partitions):
+                sql = f"""
+                    SELECT
+                        t.category_id,
+                        c.name AS category,
+                        SUM(CASE WHEN t.type = 'income' THEN t.amount ELSE 0 END) AS total_income,
+                        SUM(CASE WHEN t.type = 'expense' THEN t.amount ELSE 0 END) AS total_expense,
+                        COUNT(*) AS transaction_count
+                    FROM {source} t LEFT JOIN categories c ON c.id = t.category_id
+                    WHERE {" AND ".join(conditions)}
+                    GROUP BY t.category_id
+                """
+                for r in source_conn.execute(sql, params):
+                    current = totals.get(r["category_id"])
+                    if current is None:
+                        totals[r["category_id"]] = dict(r)
+                        continue
+                    for key in ("total_income", "total_expense", "transaction_count"):
+                        current[key] += r[key]
+        return list(totals.values())
+
+    def get_period_totals(
+        self,
+        account_id: int,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        trans_type: Optional[str] = None,
+        category: Optional[str] = None,
+        granularity: str = "month",
+    ) -> List[Dict[str, Any]]:
+        """
+        Dashboard aggregates: total amount and transaction count per
+        (period, category, type), with the same optional filters as
+        get_transactions. period is 'YYYY-MM' for granularity="month" and
+        'YYYY-MM-DD' for granularity="day". Rows are ordered by period.
+
+        Monthly totals for whole months inside the range are read from the
+        trigger-maintained monthly_rollups table, so a multi-year view costs
+        a few rows per month. Only the partial months at either end of the
+        range are aggregated from raw transactions. Daily totals always come
+        from transactions and are meant for short ranges.
+        """
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"granularity must be one of {GRANULARITIES}")
+
+        # (start, end, period length) of the stretches aggregated from
+        # transactions, and the whole months read from monthly_rollups.
+        raw_ranges: List[Tuple[Optional[str], Optional[str], int]] = []
+        rollup_months: Optional[Tuple[Optional[str], Optional[str]]] = None
+        if granularity == "day":
+            raw_ranges.append((start_date, end_date, 10))
+        else:
+            first_full, last_full = self._full_months(start_date, end_date)
+            if first_full is None or last_full is None or first_full <= last_full:
+                if first_full is not None:
+                    head_end = (date.fromisoformat(first_full + "-01") - timedelta(days=1)).isoformat()
+                    if start_date <= head_end:
+                        raw_ranges.append((start_date, head_end, 7))
+                rollup_months = (first_full, last_full)
+                if last_full is not None:
+                    tail_start = self._next_month(last_full) + "-01"
+                    if tail_start <= end_date:
+                        raw_ranges.append((tail_start, end_date, 7))
+            else:
+                # No whole month in the range: aggregate it all from transactions.
+                raw_ranges.append((start_date, end_date, 7))
+
+        rows = []
+        with self.pool.reader() as conn:
+            # monthly_rollups keeps archived rows, so only the raw stretches
+            # need the archived years they overlap.
+            partitions = sorted(
+                {
+                    p
+                    for first, last, _ in raw_ranges
+                    for p in list_partitions(conn, self.pool.db_path, first, last)
+                },
+                key=lambda p: p.year,
+            )
+            for i, (source_conn, source) in enumerate(union_sources(conn, partitions)):
+                parts = [
+                    self._raw_period_totals_sql(
+                        account_id, first, last, trans_type, category, length, source
+                    )
+                    for first, last, length in raw_ranges
+                ]
+                if rollup_months is not None and i == 0:
+                    parts.append(
+                        self._rollup_period_totals_sql(
+                            account_id, *rollup_months, trans_type, category
+                        )
+                    )
+                sql = f"""
+                    SELECT p.period, p.category_id, c.name AS category, p.type,
+                           p.total_amount, p.transaction_count
+                    FROM ({" UNION ALL ".join(part_sql for part_sql, _ in parts)}) p
+                    LEFT JOIN categories c ON c.id = p.category_id
+                    ORDER BY p.period
+                """
+                params = [param for _, part_params in parts for param in part_params]
+                rows.extend(source_conn.execute(sql, params).fetchall())
+
+        totals: Dict[Tuple[Any, ...], Dict[str, Any]] = {}
+        for r in rows:
+            key = (r["period"], r["category_id"], r["type"])
+            current = totals.get(key)
+            if current is not None:
+                # The same period from another partition group
+                current["total_amount"] += r["total_amount"]
+                current["transaction_count"] += r["transaction_count"]
+                continue
+            item = dict(r)
+            if item["category_id"] == 0:
+                item["category_id"] = None
+            item["total_amount"] = float(item["total_amount"])
+            totals[key] = item
+        result = list(totals.values())
+        if partitions:
+            result.sort(key=lambda item: item["period"])
+        return result
+
+    @staticmethod
+    def _next_month(month: str) -> str:
+        year, mon = int(month[:4]), int(month[5:7])
+        return f"{year + mon // 12:04d}-{mon % 12 + 1:02d}"
+
+    @classmethod
+    def _full_months(
+        cls, start_date: Optional[str], end_date: Optional[str]
+    ) -> Tuple[Optional[str], Optional[str]]:
+        """
+        First and last whole month ('YYYY-MM') inside [start_date, end_date];
+        None for an open end.
+        """
+        first_full = None
+        if start_date is not None:
+            first_full = start_date[:7]
+            if start_date[8:10] != "01":
+                first_full = cls._next_month(first_full)
+
+        last_full = None
+        if end_date is not None:
+            last_full = end_date[:7]
+            if (date.fromisoformat(end_date) + timedelta(days=1)).day != 1:
+                year, mon = int(last_full[:4]), int(last_full[5:7])
+                last_full = f"{year - (mon == 1):04d}-{(mon - 2) % 12 + 1:02d}"
+        return first_full, last_full
+
+    def _raw_period_totals_sql(
+        self,
+        account_id: int,
+        start_date: Optional[str],
+        end_date: Optional[str],
+        trans_type: Optional[str],
+        category: Optional[str],
+        length: int,
+        source: str = "transactions",
+    ) -> Tuple[str, List[Any]]:
+        conditions, params = self._transaction_filters(
+            account_id, start_date, end_date, trans_type, category
+        )
+        sql = f"""
+            SELECT
+                substr(t.transaction_date, 1, {length}) AS period,
+                COALESCE(t.category_id, 0) AS category_id,
+                t.type AS type,
+                SUM(t.amount) AS total_amount,
+                COUNT(*) AS transaction_count
+            FROM {source} t
+            WHERE {" AND ".join(conditions)}
+            GROUP BY 1, 2, 3
+        """
+        return sql, params
+
+    @staticmethod
+    def _rollup_period_totals_sql(
+        account_id: int,
+        first_month: Optional[str],
+        last_month: Optional[str],
+        trans_type: Optional[str],
+        category: Optional[str],
+    ) -> Tuple[str, List[Any]]:
+        conditions = ["r.account_id = ?"]
+        params: List[Any] = [account_id]
+
+        if first_month is not None:
+            conditions.append("r.month >= ?")
+            params.append(first_month)
+
+        if last_month is not None:
+            conditions.append("r.month <= ?")
+            params.append(last_month)
+
+        if trans_type is not None:
+            conditions.append("r.type = ?")
+            params.append(trans_type)
+
+        if category is not None:
+            conditions.append(
+                """r.category_id = (
+                    SELECT cf.id FROM categories cf
+                    WHERE cf.user_id = (SELECT user_id FROM accounts WHERE id = ?)
+                      AND cf.name_key = ?
+                )"""
+            )
+            params.extend([account_id, category.strip().casefold()])
+
+        sql = f"""
+            SELECT
+                r.month AS period,
+                r.category_id AS category_id,
+                r.type AS type,
+                r.total_amount AS total_amount,
+                r.transaction_count AS transaction_count
+            FROM monthly_rollups r
+            WHERE {" AND ".join(conditions)}
+        """
+        return sql, params
+
+    def get_accounts_overview(
+        self,
+        user_id: int,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Income, expense, balance, transaction count and last activity date
+        for every account of a user, in one query.
+
+        Without a date range the totals come from account_balances, and
+        archive partitions are only read for last_activity, from the years
+        that could hold a later date than the main table. With one, the
+        user's transactions in that range, archived years included, are
+        aggregated per account. Accounts without matching transactions are
+        included with zeros.
+        """
+        if start_date is None and end_date is None:
+            sql = """
+                SELECT
+                    a.id AS account_id,
+                    a.name,
+                    COALESCE(b.total_income, 0) AS total_income,
+                    COALESCE(b.total_expense, 0) AS total_expense,
+                    COALESCE(b.transaction_count, 0) AS transaction_count,
+                    (
+                        SELECT MAX(t.transaction_date)
+                        FROM transactions t
+                        WHERE t.account_id = a.id
+                    ) AS last_activity
+                FROM accounts a
+                LEFT JOIN account_balances b ON b.account_id = a.id
+                WHERE a.user_id = ?
+                ORDER BY a.created_at, a.id
+            """
+            params: List[Any] = [user_id]
+        else:
+            join_conditions = ["t.account_id = a.id"]
+            params = []
+
+            if start_date is not None:
+                join_conditions.append("t.transaction_date >= ?")
+                params.append(start_date)
+
+            if end_date is not None:
+                join_conditions.append("t.transaction_date <= ?")
+                params.append(end_date)
+
+            params.append(user_id)
+            # Grouping/ordering by (created_at, id) follows the accounts
+            # index, so no temp B-tree is needed for either.
+            sql = f"""
+                SELECT
+                    a.id AS account_id,
+                    a.name,
+                    COALESCE(SUM(CASE WHEN t.type = 'income' THEN t.amount END), 0) AS total_income,
+                    COALESCE(SUM(CASE WHEN t.type = 'expense' THEN t.amount END), 0) AS total_expense,
+                    COUNT(t.id) AS transaction_count,
+                    MAX(t.transaction_date) AS last_activity
+                FROM accounts a
+                LEFT JOIN {{source}} t ON {" AND ".join(join_conditions)}
+                WHERE a.user_id = ?
+                GROUP BY a.created_at, a.id
+                ORDER BY a.created_at, a.id
+            """
+
+        overview: Dict[int, Dict[str, Any]] = {}
+        with self.pool.reader() as conn:
+            partitions = []
+            if start_date is not None or end_date is not None:
+                partitions = list_partitions(conn, self.pool.db_path, start_date, end_date)
+            for source_conn, source in union_sources(conn, partitions):
+                for r in source_conn.execute(sql.format(source=source), params):
+                    current = overview.get(r["account_id"])
+                    if current is None:
+                        overview[r["account_id"]] = dict(r)
+                        continue
+                    # Another partition group: add up, keep the latest date.
+                    current["total_income"] += r["total_income"]
+                    current["total_expense"] += r["total_expense"]
+                    current["transaction_count"] += r["transaction_count"]
+                    if r["last_activity"] is not None and (
+                        current["last_activity"] is None
+                        or str(r["last_activity"]) > str(current["last_activity"])
+                    ):
+                        current["last_activity"] = r["last_activity"]
+
+            if start_date is None and end_date is None:
+                # last_activity above only saw the main table. A later date
+                # can only be in a partition of the same year or after it.
+                active = [r for r in overview.values() if r["transaction_count"]]
+                latest = [r["last_activity"] for r in active]
+                partitions = []
+                if active:
+                    first = None if None in latest else min(str(d) for d in latest)
+                    partitions = list_partitions(conn, self.pool.db_path, first, None)
+                if partitions:
+                    ids = [r["account_id"] for r in active]
+                    for source_conn, source in union_sources(conn, partitions):
+                        rows = source_conn.execute(
+                            f"""
+                            SELECT account_id, MAX(transaction_date) FROM {source}
+                            WHERE account_id IN ({",".join("?" * len(ids))})
+                            GROUP BY account_id
+                            """,
+                            ids,
+                        )
+                        for account_id, last_activity in rows:
+                            current = overview[account_id]
+                            if current["last_activity"] is None or (
+                                str(last_activity) > str(current["last_activity"])
+                            ):
+                                current["last_activity"] = last_activity
+
+        for item in overview.values():
+            item["total_income"] = float(item["total_income"])
+            item["total_expense"] = float(item["total_expense"])
+            item["balance"] = item["total_income"] - item["total_expense"]
+        return list(overview.values())
+
+    # ---------- Maintenance ----------
+
+    def _grouped_totals(
+        self, conn: sqlite3.Connection, sql: str, key_len: int
+    ) -> Dict[Tuple[Any, ...], List[Any]]:
+        """
+        Run an aggregate query over transactions and every archive
+        partition (`sql` selects FROM {source} and groups by its first
+        key_len columns); returns the summed columns per key.
+        """
+        totals: Dict[Tuple[Any, ...], List[Any]] = {}
+        for source_conn, source in union_sources(conn, list_partitions(conn, self.pool.db_path)):
+            for row in source_conn.execute(sql.format(source=source)):
+                key, values = tuple(row[:key_len]), row[key_len:]
+                current = totals.get(key)
+                if current is None:
+                    totals[key] = list(values)
+                else:
+                    for i, value in enumerate(values):
+                        current[i] += value
+        return totals
+
+    def rebuild_account_balances(self) -> int:
+        """
+        Recompute the account_balances table from scratch (archived
+        transactions included).
+        Returns the number of accounts with transactions.
+        """
+        with self.pool.writer(transaction=False) as conn:
+            # Archives are attached outside the rebuild transaction; holding
+            # the writer keeps the totals current until they are written.
+            totals = self._grouped_totals(conn, _BALANCE_TOTALS_SQL, key_len=1)
+            with self.pool.writer():
+                conn.execute("DELETE FROM account_balances")
+                conn.executemany(
+                    """
+                    INSERT INTO account_balances (
+                        account_id, total_income, total_expense, transaction_count
+                    )
+                    VALUES (?, ?, ?, ?)
+                    """,
+                    [key + tuple(values) for key, values in totals.items()],
+                )
+        self._mark_changed()
+        return len(totals)
+
+    def verify_account_balances(self, tolerance: float = 0.005) -> List[Dict[str, Any]]:
+        """
+        Compare account_balances with a full aggregation of transactions
+        (archived transactions included).
+        Returns one dict per account whose stored totals are off
+        (empty list if everything matches).
+        """
+        with self.pool.reader() as conn:
+            stored = conn.execute(
+                """
+                SELECT
+                    a.id AS account_id,
+                    COALESCE(b.total_income, 0) AS stored_income,
+                    COALESCE(b.total_expense, 0) AS stored_expense,
+                    COALESCE(b.transaction_count, 0) AS stored_count
+                FROM accounts a
+                LEFT JOIN account_balances b ON b.account_id = a.id
+                """
+            ).fetchall()
+            actual = self._grouped_totals(conn, _BALANCE_TOTALS_SQL, key_len=1)
+
+        mismatches = []
+        for r in stored:
+            income, expense, count = actual.get((r["account_id"],), (0.0, 0.0, 0))
+            if (
+                r["stored_count"] != count
+                or abs(r["stored_income"] - income) > tolerance
+                or abs(r["stored_expense"] - expense) > tolerance
+            ):
+                mismatches.append(
+                    dict(r, actual_income=income, actual_expense=expense, actual_count=count)
+                )
+        return mismatches
+
+    def rebuild_monthly_rollups(self) -> int:
+        """
+        Recompute the monthly_rollups table from scratch (archived
+        transactions included).
+        Returns the number of rollup rows written.
+        """
+        with self.pool.writer(transaction=False) as conn:
+            totals = self._grouped_totals(conn, _ROLLUP_TOTALS_SQL, key_len=4)
+            with self.pool.writer():
+                conn.execute("DELETE FROM monthly_rollups")
+                conn.executemany(
+                    """
+                    INSERT INTO monthly_rollups (
+                        account_id, month, category_id, type, total_amount, transaction_count
+                    )
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    """,
+                    [key + tuple(values) for key, values in totals.items()],
+                )
+        self._mark_changed()
+        return len(totals)
+
+    def verify_monthly_rollups(self, tolerance: float = 0.005) -> List[Dict[str, Any]]:
+        """
+        Compare monthly_rollups with a full aggregation of transactions
+        (archived transactions included).
+        Returns one dict per (account, month, category, type) whose stored
+        totals are off or missing on either side (empty list if everything
+        matches).
+        """
+        with self.pool.reader() as conn:
+            stored = {
+                tuple(r[:4]): (r[4], r[5])
+                for r in conn.execute(
+                    """
+                    SELECT account_id, month, category_id, type, total_amount, transaction_count
+                    FROM monthly_rollups
+                    """
+                )
+            }
+            actual = self._grouped_totals(conn, _ROLLUP_TOTALS_SQL, key_len=4)
+
+        mismatches = []
+        for key in sorted(stored.keys() | actual.keys()):
+            stored_amount, stored_count = stored.get(key, (0.0, 0))
+            actual_amount, actual_count = actual.get(key, (0.0, 0))
+            if stored_count != actual_count or abs(stored_amount - actual_amount) > tolerance:
+                account_id, month, category_id, trans_type = key
+                mismatches.append(
+                    {
+                        "account_id": account_id,
+                        "month": month,
+                        "category_id": category_id,
+                        "type": trans_type,
+                        "stored_amount": stored_amount,
+                        "stored_count": stored_count,
+                        "actual_amount": actual_amount,
+                        "actual_count": actual_count,
+                    }
+                )
+        return mismatches
+
+    def rebuild_search_index(self) -> int:
+        """
+        Recreate the full-text index over transaction descriptions.
+        Returns the number of transactions indexed.
+        """
+        with self.pool.writer() as conn:
+            conn.execute("INSERT INTO transactions_fts (transactions_fts) VALUES ('delete-all')")
+            cur = conn.execute(
+                """
+                INSERT INTO transactions_fts (rowid, description, account)
+                SELECT id, COALESCE(description, ''), 'a' || account_id
+                FROM transactions
+                """
+            )
+        return cur.rowcount
+
+    def flush_writes(self) -> None:
+        """Wait until every queued write has been committed (no-op without group_commit)."""
+        if self._write_queue is not None:
+            self._write_queue.flush()
+
     def close(self) -> None:
-        self.conn.close()
+        if self._write_queue is not None:
+            self._write_queue.close()
+        self.pool.close()
@@ -0,0 +1,285 @@
+"""
+Database maintenance commands.
+
+Usage (from the project root):
+    python -m database.maintenance schema-version
+    python -m database.maintenance migrate --dry-run
+    python -m database.maintenance migrate
+    python -m database.maintenance verify-balances
+    python -m database.maintenance rebuild-balances
+    python -m database.maintenance verify-rollups
+    python -m database.maintenance rebuild-rollups
+    python -m database.maintenance rebuild-search
+    python -m database.maintenance archive --before 2024 --vacuum
+    python -m database.maintenance list-archives
+    python -m database.maintenance split-shards --mode bucket --buckets 16
+    python -m database.maintenance retrain-categories
+    python -m database.maintenance backfill-categories --dry-run
+    python -m database.maintenance --db path/to/expenses.db verify-balances
+"""
+
+import argparse
+import sys
+from datetime import date
+from typing import List, Optional
+
+from config import DB_SHARD_BUCKETS, DB_SHARD_DIR
+from .archive import archivable_years, archive_year, list_partitions, partition_path
+from .db_manager import BACKFILL_MIN_CONFIDENCE, DatabaseManager, DB_PATH
+from .migrate import current_version, discover, migrate
+from .sharding import SHARD_MODES, split_database
+
+
+def cmd_verify_balances(db: DatabaseManager, args: argparse.Namespace) -> int:
+    mismatches = db.verify_account_balances()
+    if not mismatches:
+        print("account_balances is consistent with transactions.")
+        return 0
+
+    print(f"{len(mismatches)} account(s) out of sync:")
+    for m in mismatches:
+        print(
+            f"- account {m['account_id']}: "
+            f"income {m['stored_income']:.2f} vs {m['actual_income']:.2f}, "
+            f"expense {m['stored_expense']:.2f} vs {m['actual_expense']:.2f}, "
+            f"count {m['stored_count']} vs {m['actual_count']}"
+        )
+    print("Run 'rebuild-balances' to fix.")
+    return 1
+
+
+def cmd_rebuild_balances(db: DatabaseManager, args: argparse.Namespace) -> int:
+    count = db.rebuild_account_balances()
+    print(f"Rebuilt account_balances for {count} account(s).")
+    return 0
+
+
+def cmd_verify_rollups(db: DatabaseManager, args: argparse.Namespace) -> int:
+    mismatches = db.verify_monthly_rollups()
+    if not mismatches:
+        print("monthly_rollups is consistent with transactions.")
+        return 0
+
+    print(f"{len(mismatches)} rollup row(s) out of sync:")
+    for m in mismatches:
+        print(
+            f"- account {m['account_id']} {m['month']} category {m['category_id']} {m['type']}: "
+            f"amount {m['stored_amount']:.2f} vs {m['actual_amount']:.2f}, "
+            f"count {m['stored_count']} vs {m['actual_count']}"
+        )
+    print("Run 'rebuild-rollups' to fix.")
+    return 1
+
+
+def cmd_rebuild_rollups(db: DatabaseManager, args: argparse.Namespace) -> int:
+    count = db.rebuild_monthly_rollups()
+    print(f"Rebuilt monthly_rollups ({count} row(s)).")
+    return 0
+
+
+def cmd_rebuild_search(db: DatabaseManager, args: argparse.Namespace) -> int:
+    count = db.rebuild_search_index()
+    print(f"Rebuilt the search index ({count} transaction(s)).")
+    return 0
+
+
+def cmd_archive(db: DatabaseManager, args: argparse.Namespace) -> int:
+    this_year = date.today().year
+    before = min(args.before, this_year) if args.before is not None else this_year
+    years = archivable_years(db.pool, before)
+    if not years:
+        print(f"No transactions before {before} left to archive.")
+        return 0
+
+    for year in years:
+        moved = archive_year(db.pool, year)
+        print(f"Archived {moved} transaction(s) from {year} to {partition_path(db.pool.db_path, year)}")
+    if args.vacuum:
+        with db.pool.writer(transaction=False) as conn:
+            conn.execute("VACUUM")
+        print("Vacuumed the main database.")
+    return 0
+
+
+def add_archive_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--before",
+        type=int,
+        default=None,
+        help="Archive years before this one (default: every closed year)",
+    )
+    parser.add_argument(
+        "--vacuum",
+        action="store_true",
+        help="Shrink the main database file afterwards (rewrites it; takes the write lock)",
+    )
+
+
+def cmd_list_archives(db: DatabaseManager, args: argparse.Namespace) -> int:
+    with db.pool.reader() as conn:
+        partitions = list_partitions(conn, db.pool.db_path)
+        counts = dict(conn.execute("SELECT year, row_count FROM archive_partitions").fetchall())
+    if not partitions:
+        print("No archived years.")
+        return 0
+    for p in partitions:
+        print(f"{p.year}: {counts[p.year]} transaction(s) in {p.path}")
+    return 0
+
+
+def cmd_split_shards(db: DatabaseManager, args: argparse.Namespace) -> int:
+    counts = split_database(db, args.shard_dir, mode=args.mode, buckets=args.buckets)
+    print(f"Split {sum(counts.values())} user(s) into {len(counts)} shard(s) in {args.shard_dir}:")
+    for shard, users in counts.items():
+        print(f"  shard {shard}: {users} user(s)")
+    print("Set DB_SHARDING in config.py to use them.")
+    return 0
+
+
+def add_split_shards_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--shard-dir",
+        default=DB_SHARD_DIR,
+        help=f"Empty directory for the catalog and shards (default: {DB_SHARD_DIR})",
+    )
+    parser.add_argument("--mode", choices=SHARD_MODES, default="bucket")
+    parser.add_argument(
+        "--buckets",
+        type=int,
+        default=DB_SHARD_BUCKETS,
+        help=f"Number of shards in bucket mode (default: {DB_SHARD_BUCKETS})",
+    )
+
+
+def _user_ids(db: DatabaseManager, args: argparse.Namespace) -> List[int]:
+    if args.user is not None:
+        return [args.user]
+    with db.pool.reader() as conn:
+        return [r["id"] for r in conn.execute("SELECT id FROM users ORDER BY id")]
+
+
+def cmd_retrain_categories(db: DatabaseManager, args: argparse.Namespace) -> int:
+    for user_id in _user_ids(db, args):
+        count = db.retrain_category_model(user_id)
+        print(f"User {user_id}: trained on {count} categorized transaction(s).")
+    return 0
+
+
+def cmd_backfill_categories(db: DatabaseManager, args: argparse.Namespace) -> int:
+    verb = "would categorize" if args.dry_run else "categorized"
+    for user_id in _user_ids(db, args):
+        counts = db.backfill_categories(
+            user_id, min_confidence=args.min_confidence, dry_run=args.dry_run
+        )
+        print(f"User {user_id}: {verb} {sum(counts.values())} transaction(s).")
+        for name, count in sorted(counts.items()):
+            print(f"  {name}: {count}")
+    return 0
+
+
+def add_user_argument(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--user", type=int, default=None, help="Only this user id (default: all)")
+
+
+def add_backfill_arguments(parser: argparse.ArgumentParser) -> None:
+    add_user_argument(parser)
+    parser.add_argument(
+        "--min-confidence",
+        type=float,
+        default=BACKFILL_MIN_CONFIDENCE,
+        help=f"Only assign categories at least this likely (default: {BACKFILL_MIN_CONFIDENCE})",
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Only report what would be categorized"
+    )
+
+
+def cmd_schema_version(db: DatabaseManager, args: argparse.Namespace) -> int:
+    with db.pool.reader() as conn:
+        version = current_version(conn)
+    migrations = discover()
+    latest = migrations[-1].version if migrations else 0
+    print(f"Schema version {version} (latest migration: {latest}).")
+    for m in migrations[version:]:
+        print(f"  pending: {m.version:04d} {m.name} ({m.kind})")
+    return 0
+
+
+def cmd_migrate(db: DatabaseManager, args: argparse.Namespace) -> int:
+    migrations = migrate(db.pool, target=args.target, dry_run=args.dry_run)
+    if not migrations:
+        print("Schema is up to date.")
+        return 0
+
+    verb = "Would apply" if args.dry_run else "Applied"
+    for m in migrations:
+        print(f"{verb} {m.version:04d} {m.name} ({m.kind})")
+    return 0
+
+
+def add_migrate_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Only list the migrations that would run"
+    )
+    parser.add_argument(
+        "--target", type=int, default=None, help="Stop at this version (default: latest)"
+    )
+
+
+COMMANDS = {
+    "schema-version": (cmd_schema_version, "Show the schema version and pending migrations"),
+    "migrate": (cmd_migrate, "Apply pending schema migrations"),
+    "verify-balances": (cmd_verify_balances, "Check running totals against transactions"),
+    "rebuild-balances": (cmd_rebuild_balances, "Recompute running totals from transactions"),
+    "verify-rollups": (cmd_verify_rollups, "Check monthly rollups against transactions"),
+    "rebuild-rollups": (cmd_rebuild_rollups, "Recompute monthly rollups from transactions"),
+    "rebuild-search": (cmd_rebuild_search, "Recreate the full-text index over descriptions"),
+    "archive": (cmd_archive, "Move closed years into per-year archive files"),
+    "list-archives": (cmd_list_archives, "List archived years"),
+    "split-shards": (cmd_split_shards, "Copy this database into a per-user sharded layout"),
+    "retrain-categories": (
+        cmd_retrain_categories,
+        "Rebuild the per-user category models from categorized transactions",
+    ),
+    "backfill-categories": (
+        cmd_backfill_categories,
+        "Categorize uncategorized transactions the category model is sure about",
+    ),
+}
+
+
+# Extra command-line arguments per command.
+COMMAND_ARGUMENTS = {
+    "migrate": add_migrate_arguments,
+    "archive": add_archive_arguments,
+    "split-shards": add_split_shards_arguments,
+    "retrain-categories": add_user_argument,
+    "backfill-categories": add_backfill_arguments,
+}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Smart Expense Tracker DB maintenance")
+    parser.add_argument("--db", default=DB_PATH, help=f"SQLite file (default: {DB_PATH})")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name, (_, help_text) in COMMANDS.items():
+        command_parser = sub.add_parser(name, help=help_text)
+        if name in COMMAND_ARGUMENTS:
+            COMMAND_ARGUMENTS[name](command_parser)
+    args = parser.parse_args(argv)
+
+    # The schema commands inspect/migrate the database themselves; every
+    # other command needs the schema to be current.
+    db = DatabaseManager(
+        db_path=args.db,
+        auto_migrate=args.command not in ("schema-version", "migrate"),
+    )
+    try:
+        handler, _ = COMMANDS[args.command]
+        return handler(db, args)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
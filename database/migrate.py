@@ -0,0 +1,177 @@
+"""
+Versioned schema migrations.
+
+The schema is built by the ordered files in database/migrations/, named
+NNNN_description.sql or NNNN_description.py and numbered 1, 2, 3, ...
+without gaps. A .sql file is a script of statements; a .py file defines
+upgrade(conn). PRAGMA user_version records the last migration applied.
+
+- Opening an up-to-date database costs one PRAGMA user_version read.
+- Each migration runs in its own BEGIN IMMEDIATE transaction together with
+  the user_version bump, so it is applied completely or not at all.
+- The version is re-read after the write lock is taken, so processes that
+  start at the same time never apply a migration twice.
+- A database with a newer version than the code knows is refused.
+- migrate(..., dry_run=True) only reports what would run.
+
+Migrations are written to be idempotent (IF NOT EXISTS, column checks),
+which lets them adopt databases created before versioning existed.
+
+On a large live database, run `migrate --dry-run` first and apply during
+quiet hours: readers keep working (WAL), but a migration that backfills
+data holds the write lock until it commits, and other writers wait up to
+busy_timeout for it.
+
+Usage (from the project root):
+    python -m database.maintenance migrate --dry-run
+    python -m database.maintenance migrate
+"""
+
+import importlib.util
+import os
+import re
+import sqlite3
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+from .pool import ConnectionPool
+
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+
+_FILENAME = re.compile(r"^(\d{4})_(\w+)\.(sql|py)$")
+
+
+class MigrationError(RuntimeError):
+    """The database or the migration files are in an unexpected state."""
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    path: str
+
+    @property
+    def kind(self) -> str:
+        return os.path.splitext(self.path)[1].lstrip(".")
+
+    def apply(self, conn: sqlite3.Connection) -> None:
+        """Run this migration on `conn` inside the caller's transaction."""
+        if self.kind == "sql":
+            with open(self.path, "r", encoding="utf-8") as f:
+                script = f.read()
+            for statement in split_statements(script):
+                conn.execute(statement)
+        else:
+            spec = importlib.util.spec_from_file_location(
+                f"_migration_{self.version:04d}", self.path
+            )
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            module.upgrade(conn)
+
+
+def split_statements(script: str) -> List[str]:
+    """
+    Split an SQL script into single statements (trigger bodies included).
+
+    Needed because Connection.executescript commits any open transaction
+    first, which would break the one-transaction-per-migration guarantee.
+    """
+    statements = []
+    current = ""
+    for line in script.splitlines(keepends=True):
+        current += line
+        if sqlite3.complete_statement(current):
+            if current.strip():
+                statements.append(current.strip())
+            current = ""
+    leftover = "\n".join(
+        line for line in current.splitlines() if not line.strip().startswith("--")
+    ).strip()
+    if leftover:
+        raise MigrationError(f"Incomplete SQL statement at end of script: {leftover[:80]}")
+    return statements
+
+
+@lru_cache(maxsize=None)
+def _discover(directory: str) -> Tuple[Migration, ...]:
+    migrations = []
+    for filename in sorted(os.listdir(directory)):
+        m = _FILENAME.match(filename)
+        if m is None:
+            continue
+        version, name, _ = m.groups()
+        migrations.append(Migration(int(version), name, os.path.join(directory, filename)))
+
+    for expected, migration in enumerate(migrations, start=1):
+        if migration.version != expected:
+            raise MigrationError(
+                f"Migrations must be numbered 1, 2, 3, ... without gaps or duplicates; "
+                f"found {os.path.basename(migration.path)} where version {expected} was expected"
+            )
+    return tuple(migrations)
+
+
+def discover(directory: str = MIGRATIONS_DIR) -> List[Migration]:
+    """All migrations in `directory`, in version order."""
+    return list(_discover(os.path.abspath(directory)))
+
+
+def current_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(
+    pool: ConnectionPool,
+    directory: str = MIGRATIONS_DIR,
+    target: Optional[int] = None,
+    dry_run: bool = False,
+) -> List[Migration]:
+    """
+    Bring the database up to `target` (default: the latest migration).
+
+    Returns the migrations applied, or with dry_run=True the ones that
+    would be applied (nothing is written). Downgrades are not supported.
+    """
+    migrations = discover(directory)
+    latest = migrations[-1].version if migrations else 0
+    if target is None:
+        target = latest
+    if not 0 <= target <= latest:
+        raise MigrationError(f"Unknown target version {target} (latest is {latest})")
+
+    with pool.writer(transaction=False) as conn:
+        version = current_version(conn)
+    if version > latest:
+        raise MigrationError(
+            f"Database schema version {version} is newer than this code "
+            f"(latest migration is {latest}); refusing to touch it"
+        )
+    if version > target:
+        raise MigrationError(f"Database is at version {version}; downgrading to {target} is not supported")
+    if version == target:
+        return []
+
+    pending = [m for m in migrations if version < m.version <= target]
+    if dry_run:
+        return pending
+
+    applied = []
+    for migration in pending:
+        with pool.writer() as conn:
+            # Another process may have migrated while we waited for the lock.
+            version = current_version(conn)
+            if version >= migration.version:
+                continue
+            if version != migration.version - 1:
+                raise MigrationError(
+                    f"Database moved to version {version} while migrating; expected "
+                    f"{migration.version - 1}"
+                )
+            migration.apply(conn)
+            conn.execute(f"PRAGMA user_version = {migration.version:d}")
+        applied.append(migration)
+    return applied
@@ -1,4 +1,4 @@
-PRAGMA foreign_keys = ON;
+-- Original schema: users, accounts and transactions (category as text).
 
 -- =========================
 -- Users table
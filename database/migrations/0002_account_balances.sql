@@ -0,0 +1,73 @@
+-- =========================
+-- Running totals per account
+-- =========================
+-- One row per account with lifetime income/expense/count, kept in sync by
+-- the triggers below so the unbounded account summary is a single-row
+-- lookup. Rebuild/verify with: python -m database.maintenance --help
+CREATE TABLE IF NOT EXISTS account_balances (
+    account_id INTEGER PRIMARY KEY,
+    total_income REAL NOT NULL DEFAULT 0,
+    total_expense REAL NOT NULL DEFAULT 0,
+    transaction_count INTEGER NOT NULL DEFAULT 0,
+    FOREIGN KEY (account_id) REFERENCES accounts(id) ON DELETE CASCADE
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_transactions_balance_insert
+AFTER INSERT ON transactions
+BEGIN
+    INSERT INTO account_balances (account_id, total_income, total_expense, transaction_count)
+    VALUES (
+        NEW.account_id,
+        CASE WHEN NEW.type = 'income' THEN NEW.amount ELSE 0 END,
+        CASE WHEN NEW.type = 'expense' THEN NEW.amount ELSE 0 END,
+        1
+    )
+    ON CONFLICT (account_id) DO UPDATE SET
+        total_income = total_income + excluded.total_income,
+        total_expense = total_expense + excluded.total_expense,
+        transaction_count = transaction_count + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_transactions_balance_delete
+AFTER DELETE ON transactions
+BEGIN
+    UPDATE account_balances
+    SET total_income = total_income - CASE WHEN OLD.type = 'income' THEN OLD.amount ELSE 0 END,
+        total_expense = total_expense - CASE WHEN OLD.type = 'expense' THEN OLD.amount ELSE 0 END,
+        transaction_count = transaction_count - 1
+    WHERE account_id = OLD.account_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_transactions_balance_update
+AFTER UPDATE OF account_id, type, amount ON transactions
+BEGIN
+    UPDATE account_balances
+    SET total_income = total_income - CASE WHEN OLD.type = 'income' THEN OLD.amount ELSE 0 END,
+        total_expense = total_expense - CASE WHEN OLD.type = 'expense' THEN OLD.amount ELSE 0 END,
+        transaction_count = transaction_count - 1
+    WHERE account_id = OLD.account_id;
+
+    INSERT INTO account_balances (account_id, total_income, total_expense, transaction_count)
+    VALUES (
+        NEW.account_id,
+        CASE WHEN NEW.type = 'income' THEN NEW.amount ELSE 0 END,
+        CASE WHEN NEW.type = 'expense' THEN NEW.amount ELSE 0 END,
+        1
+    )
+    ON CONFLICT (account_id) DO UPDATE SET
+        total_income = total_income + excluded.total_income,
+        total_expense = total_expense + excluded.total_expense,
+        transaction_count = transaction_count + 1;
+END;
+
+-- Fill the totals from the existing transaction history.
+DELETE FROM account_balances;
+
+INSERT INTO account_balances (account_id, total_income, total_expense, transaction_count)
+SELECT
+    account_id,
+    SUM(CASE WHEN type = 'income' THEN amount ELSE 0 END),
+    SUM(CASE WHEN type = 'expense' THEN amount ELSE 0 END),
+    COUNT(*)
+FROM transactions
+GROUP BY account_id;
@@ -0,0 +1,22 @@
+-- Replace the single-column indexes with composite indexes shaped for the
+-- queries in db_manager.py.
+
+-- Transaction listing, paging, summaries and last-activity lookups all
+-- filter on account_id plus a transaction_date range and sort by
+-- (transaction_date, id). Keying on (account_id, transaction_date, id)
+-- serves the range and the sort order straight from the index, and
+-- carrying type/amount makes it covering for the SUM/COUNT aggregates.
+CREATE INDEX IF NOT EXISTS idx_transactions_account_date_id
+    ON transactions(account_id, transaction_date, id, type, amount);
+
+-- Accounts of a user in creation order. UNIQUE (user_id, name) already
+-- has its own automatic index for name lookups.
+CREATE INDEX IF NOT EXISTS idx_accounts_user_id_created_at
+    ON accounts(user_id, created_at);
+
+-- Superseded by the composite indexes above.
+DROP INDEX IF EXISTS idx_transactions_date;
+DROP INDEX IF EXISTS idx_transactions_account_id;
+DROP INDEX IF EXISTS idx_transactions_type;
+DROP INDEX IF EXISTS idx_accounts_user_id;
+DROP INDEX IF EXISTS idx_accounts_user_id_name;
@@ -0,0 +1,112 @@
+"""
+Move categories into a per-user categories table.
+
+Transactions used to store the category as free text on every row. This
+creates the categories table (unique per user and case-folded name),
+points each transaction at its category through category_id and drops
+the text column. Databases that already have category_id only get the
+table and index created.
+"""
+
+import sqlite3
+
+
+CREATE_CATEGORIES = """
+-- One row per distinct category of a user. name keeps the spelling it was
+-- first entered with; name_key is its case-folded form, so "Groceries" and
+-- "groceries" resolve to the same row.
+CREATE TABLE IF NOT EXISTS categories (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    name_key TEXT NOT NULL,
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+    UNIQUE (user_id, name_key)
+)
+"""
+
+# Category filters and per-category totals: equality on
+# (account_id, category_id), then the date range. type/amount make it
+# covering for the totals; the implicit rowid keeps (date, id) ordering.
+CREATE_CATEGORY_INDEX = """
+CREATE INDEX IF NOT EXISTS idx_transactions_account_category_date
+    ON transactions(account_id, category_id, transaction_date, type, amount)
+"""
+
+
+def _columns(conn: sqlite3.Connection, table: str) -> set:
+    return {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+
+
+def upgrade(conn: sqlite3.Connection) -> None:
+    conn.execute(CREATE_CATEGORIES)
+
+    columns = _columns(conn, "transactions")
+    if "category_id" not in columns:
+        conn.execute(
+            "ALTER TABLE transactions ADD COLUMN category_id INTEGER "
+            "REFERENCES categories(id) ON DELETE SET NULL"
+        )
+
+    if "category" in columns:
+        # One category per (user, case-folded name); the first spelling seen
+        # becomes the display name.
+        category_ids = {}
+        mapping = []
+        rows = conn.execute(
+            """
+            SELECT DISTINCT a.user_id, t.category
+            FROM transactions t
+            JOIN accounts a ON a.id = t.account_id
+            WHERE t.category IS NOT NULL AND TRIM(t.category) != ''
+            ORDER BY a.user_id, t.category
+            """
+        ).fetchall()
+        for user_id, raw in rows:
+            name = raw.strip()
+            key = (user_id, name.casefold())
+            if key not in category_ids:
+                cur = conn.execute(
+                    """
+                    INSERT INTO categories (user_id, name, name_key) VALUES (?, ?, ?)
+                    ON CONFLICT (user_id, name_key) DO UPDATE SET name = name
+                    RETURNING id
+                    """,
+                    (user_id, name, key[1]),
+                )
+                category_ids[key] = cur.fetchone()[0]
+            mapping.append((user_id, raw, category_ids[key]))
+
+        # Resolve every row in one pass through a keyed temp table.
+        conn.execute(
+            """
+            CREATE TEMP TABLE category_map (
+                user_id INTEGER NOT NULL,
+                raw TEXT NOT NULL,
+                category_id INTEGER NOT NULL,
+                PRIMARY KEY (user_id, raw)
+            )
+            """
+        )
+        conn.executemany(
+            "INSERT INTO temp.category_map (user_id, raw, category_id) VALUES (?, ?, ?)",
+            mapping,
+        )
+        conn.execute(
+            """
+            UPDATE transactions
+            SET category_id = (
+                SELECT m.category_id
+                FROM temp.category_map m
+                WHERE m.raw = transactions.category
+                  AND m.user_id = (
+                      SELECT user_id FROM accounts WHERE id = transactions.account_id
+                  )
+            )
+            WHERE category IS NOT NULL AND TRIM(category) != ''
+            """
+        )
+        conn.execute("DROP TABLE temp.category_map")
+        conn.execute("ALTER TABLE transactions DROP COLUMN category")
+
+    conn.execute(CREATE_CATEGORY_INDEX)
@@ -0,0 +1,99 @@
+-- =========================
+-- Monthly rollups for the dashboard
+-- =========================
+-- Sum and count of transactions per (account, month, category, type), kept
+-- in sync by the triggers below so dashboard charts over long ranges read
+-- a few rows per month instead of every transaction. month is 'YYYY-MM';
+-- category_id 0 stands for "uncategorized" (NULL cannot be part of the key).
+CREATE TABLE IF NOT EXISTS monthly_rollups (
+    account_id INTEGER NOT NULL,
+    month TEXT NOT NULL,
+    category_id INTEGER NOT NULL DEFAULT 0,
+    type TEXT NOT NULL,
+    total_amount REAL NOT NULL DEFAULT 0,
+    transaction_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (account_id, month, category_id, type),
+    FOREIGN KEY (account_id) REFERENCES accounts(id) ON DELETE CASCADE
+) WITHOUT ROWID;
+
+CREATE TRIGGER IF NOT EXISTS trg_transactions_rollup_insert
+AFTER INSERT ON transactions
+BEGIN
+    INSERT INTO monthly_rollups (account_id, month, category_id, type, total_amount, transaction_count)
+    VALUES (
+        NEW.account_id,
+        substr(NEW.transaction_date, 1, 7),
+        COALESCE(NEW.category_id, 0),
+        NEW.type,
+        NEW.amount,
+        1
+    )
+    ON CONFLICT (account_id, month, category_id, type) DO UPDATE SET
+        total_amount = total_amount + excluded.total_amount,
+        transaction_count = transaction_count + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_transactions_rollup_delete
+AFTER DELETE ON transactions
+BEGIN
+    UPDATE monthly_rollups
+    SET total_amount = total_amount - OLD.amount,
+        transaction_count = transaction_count - 1
+    WHERE account_id = OLD.account_id
+      AND month = substr(OLD.transaction_date, 1, 7)
+      AND category_id = COALESCE(OLD.category_id, 0)
+      AND type = OLD.type;
+
+    DELETE FROM monthly_rollups
+    WHERE account_id = OLD.account_id
+      AND month = substr(OLD.transaction_date, 1, 7)
+      AND category_id = COALESCE(OLD.category_id, 0)
+      AND type = OLD.type
+      AND transaction_count <= 0;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_transactions_rollup_update
+AFTER UPDATE OF account_id, type, amount, category_id, transaction_date ON transactions
+BEGIN
+    UPDATE monthly_rollups
+    SET total_amount = total_amount - OLD.amount,
+        transaction_count = transaction_count - 1
+    WHERE account_id = OLD.account_id
+      AND month = substr(OLD.transaction_date, 1, 7)
+      AND category_id = COALESCE(OLD.category_id, 0)
+      AND type = OLD.type;
+
+    DELETE FROM monthly_rollups
+    WHERE account_id = OLD.account_id
+      AND month = substr(OLD.transaction_date, 1, 7)
+      AND category_id = COALESCE(OLD.category_id, 0)
+      AND type = OLD.type
+      AND transaction_count <= 0;
+
+    INSERT INTO monthly_rollups (account_id, month, category_id, type, total_amount, transaction_count)
+    VALUES (
+        NEW.account_id,
+        substr(NEW.transaction_date, 1, 7),
+        COALESCE(NEW.category_id, 0),
+        NEW.type,
+        NEW.amount,
+        1
+    )
+    ON CONFLICT (account_id, month, category_id, type) DO UPDATE SET
+        total_amount = total_amount + excluded.total_amount,
+        transaction_count = transaction_count + 1;
+END;
+
+-- Fill the rollups from the existing transaction history.
+DELETE FROM monthly_rollups;
+
+INSERT INTO monthly_rollups (account_id, month, category_id, type, total_amount, transaction_count)
+SELECT
+    account_id,
+    substr(transaction_date, 1, 7),
+    COALESCE(category_id, 0),
+    type,
+    SUM(amount),
+    COUNT(*)
+FROM transactions
+GROUP BY 1, 2, 3, 4;
@@ -0,0 +1,46 @@
+-- =========================
+-- Full-text search over descriptions
+-- =========================
+-- Contentless FTS5 index (the text stays in transactions, rowid = id).
+-- Besides the description it indexes one token per row naming the account
+-- ('a' || account_id), so a search restricted to an account is an
+-- intersection inside the FTS index instead of a filter over every match.
+-- prefix='2 3' keeps short prefix queries ("gro*") fast.
+CREATE VIRTUAL TABLE IF NOT EXISTS transactions_fts USING fts5(
+    description,
+    account,
+    content = '',
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_transactions_fts_insert
+AFTER INSERT ON transactions
+BEGIN
+    INSERT INTO transactions_fts (rowid, description, account)
+    VALUES (NEW.id, COALESCE(NEW.description, ''), 'a' || NEW.account_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_transactions_fts_delete
+AFTER DELETE ON transactions
+BEGIN
+    INSERT INTO transactions_fts (transactions_fts, rowid, description, account)
+    VALUES ('delete', OLD.id, COALESCE(OLD.description, ''), 'a' || OLD.account_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_transactions_fts_update
+AFTER UPDATE OF description, account_id ON transactions
+BEGIN
+    INSERT INTO transactions_fts (transactions_fts, rowid, description, account)
+    VALUES ('delete', OLD.id, COALESCE(OLD.description, ''), 'a' || OLD.account_id);
+
+    INSERT INTO transactions_fts (rowid, description, account)
+    VALUES (NEW.id, COALESCE(NEW.description, ''), 'a' || NEW.account_id);
+END;
+
+-- Index the existing transactions.
+INSERT INTO transactions_fts (transactions_fts) VALUES ('delete-all');
+
+INSERT INTO transactions_fts (rowid, description, account)
+SELECT id, COALESCE(description, ''), 'a' || account_id
+FROM transactions;
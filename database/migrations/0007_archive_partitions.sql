@@ -0,0 +1,14 @@
+-- =========================
+-- Archived years
+-- =========================
+-- Closed years can be moved out of transactions into one SQLite file per
+-- year (see database/archive.py). One row per archived year; file is the
+-- partition's file name inside the archive/ directory next to the main
+-- database. Rows of an archived year that are added later stay in
+-- transactions until the year is archived again.
+CREATE TABLE IF NOT EXISTS archive_partitions (
+    year INTEGER PRIMARY KEY,
+    file TEXT NOT NULL,
+    row_count INTEGER NOT NULL DEFAULT 0,
+    archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
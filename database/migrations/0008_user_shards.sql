@@ -0,0 +1,11 @@
+-- =========================
+-- Shard assignments
+-- =========================
+-- Only used by the catalog database of a sharded layout (see
+-- database/sharding.py): the shard file that holds each user's accounts,
+-- categories and transactions. Empty in a single-file database.
+CREATE TABLE IF NOT EXISTS user_shards (
+    user_id INTEGER PRIMARY KEY,
+    shard INTEGER NOT NULL,
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+);
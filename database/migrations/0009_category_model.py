@@ -0,0 +1,109 @@
+"""
+Add the per-user category classifier table and train it from the
+existing categorized transactions (see database/category_model.py).
+
+The training below is a frozen copy of retrain_categories, the word
+hashing of nlp/classifier.py and its blob encoding as of this migration,
+so later changes to those modules cannot change what it writes.
+Archived years are read from their partition files directly.
+"""
+
+import os
+import re
+import sqlite3
+import struct
+import zlib
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+CREATE_CATEGORY_MODEL = """
+-- Word statistics of each user's categorized transactions, used to
+-- suggest categories (see nlp/classifier.py). doc_count is the number of
+-- transactions in the category; term_counts holds, for every hashed word
+-- bucket, how many of them contain it, sparsely encoded (uint16 bucket
+-- ids followed by uint32 counts).
+CREATE TABLE IF NOT EXISTS category_model (
+    user_id INTEGER NOT NULL,
+    category_id INTEGER NOT NULL,
+    doc_count INTEGER NOT NULL,
+    term_counts BLOB NOT NULL,
+    PRIMARY KEY (user_id, category_id),
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+    FOREIGN KEY (category_id) REFERENCES categories(id) ON DELETE CASCADE
+) WITHOUT ROWID
+"""
+
+N_BUCKETS = 1 << 12
+_WORD = re.compile(r"[^\W\d_]{2,}")
+
+# Archive partition files, as laid out by database/archive.py.
+ARCHIVE_DIR = "archive"
+
+
+def _token_buckets(text: Optional[str]) -> List[int]:
+    words = set(_WORD.findall((text or "").lower()))
+    return [zlib.crc32(w.encode("utf-8")) % N_BUCKETS for w in words]
+
+
+def _encode_counts(counts: Dict[int, int]) -> bytes:
+    buckets = sorted(b for b, n in counts.items() if n > 0)
+    return struct.pack(
+        f"<{len(buckets)}H{len(buckets)}I", *buckets, *(counts[b] for b in buckets)
+    )
+
+
+def _archived_rows(conn: sqlite3.Connection, db_path: str) -> Iterator[Tuple[int, int, str]]:
+    """(account_id, category_id, description) of categorized archived rows."""
+    directory = os.path.join(os.path.dirname(db_path), ARCHIVE_DIR)
+    for (file,) in conn.execute("SELECT file FROM archive_partitions ORDER BY year").fetchall():
+        path = os.path.join(directory, file)
+        if not os.path.exists(path):
+            continue
+        part = sqlite3.connect(path)
+        try:
+            yield from part.execute(
+                """
+                SELECT account_id, category_id, description FROM transactions
+                WHERE category_id IS NOT NULL
+                """
+            ).fetchall()
+        finally:
+            part.close()
+
+
+def upgrade(conn: sqlite3.Connection) -> None:
+    conn.execute(CREATE_CATEGORY_MODEL)
+
+    db_path = next(row[2] for row in conn.execute("PRAGMA database_list") if row[1] == "main")
+    account_users = dict(conn.execute("SELECT id, user_id FROM accounts").fetchall())
+    rows = conn.execute(
+        """
+        SELECT account_id, category_id, description FROM transactions
+        WHERE category_id IS NOT NULL
+        """
+    ).fetchall()
+
+    # (user_id, category_id) -> [doc_count, {bucket: count}]
+    models: Dict[Tuple[int, int], list] = {}
+    for account_id, category_id, description in [tuple(r) for r in rows] + list(
+        _archived_rows(conn, db_path)
+    ):
+        user_id = account_users.get(account_id)
+        if user_id is None:
+            continue
+        model = models.setdefault((user_id, category_id), [0, {}])
+        model[0] += 1
+        for bucket in _token_buckets(description):
+            model[1][bucket] = model[1].get(bucket, 0) + 1
+
+    conn.execute("DELETE FROM category_model")
+    conn.executemany(
+        """
+        INSERT INTO category_model (user_id, category_id, doc_count, term_counts)
+        VALUES (?, ?, ?, ?)
+        """,
+        [
+            (user_id, category_id, doc_count, _encode_counts(counts))
+            for (user_id, category_id), (doc_count, counts) in sorted(models.items())
+        ],
+    )
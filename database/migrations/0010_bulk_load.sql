@@ -0,0 +1,61 @@
+-- =========================
+-- Set-based upkeep for bulk loads
+-- =========================
+-- add_transactions_bulk puts a row in bulk_load for the duration of each
+-- batch, inside its own write transaction, so no other connection ever
+-- sees it. While it is there the per-row insert triggers stand aside and
+-- the batch updates account_balances, monthly_rollups and the search
+-- index with one grouped INSERT ... SELECT each over the ids it inserted.
+-- Single-row writes keep going through the triggers.
+CREATE TABLE IF NOT EXISTS bulk_load (
+    id INTEGER PRIMARY KEY
+);
+
+DROP TRIGGER IF EXISTS trg_transactions_balance_insert;
+
+CREATE TRIGGER trg_transactions_balance_insert
+AFTER INSERT ON transactions
+WHEN NOT EXISTS (SELECT 1 FROM bulk_load)
+BEGIN
+    INSERT INTO account_balances (account_id, total_income, total_expense, transaction_count)
+    VALUES (
+        NEW.account_id,
+        CASE WHEN NEW.type = 'income' THEN NEW.amount ELSE 0 END,
+        CASE WHEN NEW.type = 'expense' THEN NEW.amount ELSE 0 END,
+        1
+    )
+    ON CONFLICT (account_id) DO UPDATE SET
+        total_income = total_income + excluded.total_income,
+        total_expense = total_expense + excluded.total_expense,
+        transaction_count = transaction_count + 1;
+END;
+
+DROP TRIGGER IF EXISTS trg_transactions_rollup_insert;
+
+CREATE TRIGGER trg_transactions_rollup_insert
+AFTER INSERT ON transactions
+WHEN NOT EXISTS (SELECT 1 FROM bulk_load)
+BEGIN
+    INSERT INTO monthly_rollups (account_id, month, category_id, type, total_amount, transaction_count)
+    VALUES (
+        NEW.account_id,
+        substr(NEW.transaction_date, 1, 7),
+        COALESCE(NEW.category_id, 0),
+        NEW.type,
+        NEW.amount,
+        1
+    )
+    ON CONFLICT (account_id, month, category_id, type) DO UPDATE SET
+        total_amount = total_amount + excluded.total_amount,
+        transaction_count = transaction_count + 1;
+END;
+
+DROP TRIGGER IF EXISTS trg_transactions_fts_insert;
+
+CREATE TRIGGER trg_transactions_fts_insert
+AFTER INSERT ON transactions
+WHEN NOT EXISTS (SELECT 1 FROM bulk_load)
+BEGIN
+    INSERT INTO transactions_fts (rowid, description, account)
+    VALUES (NEW.id, COALESCE(NEW.description, ''), 'a' || NEW.account_id);
+END;
@@ -0,0 +1,239 @@
+"""
+SQLite connection pool for concurrent sessions.
+
+- The database runs in WAL mode, so readers never block the writer and
+  the writer never blocks readers.
+- Readers check out their own connection for the duration of a read
+  (up to `pool_size` connections are kept open and reused).
+- All writes go through a single writer connection, serialized by a lock
+  and wrapped in BEGIN IMMEDIATE ... COMMIT.
+- busy_timeout makes SQLite wait instead of failing with
+  "database is locked" when another process holds the write lock.
+- `durability` picks when commits are fsynced (see DURABILITY).
+- snapshot() gives long reports one consistent point in time on a
+  dedicated connection.
+"""
+
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
+
+from config import DB_POOL_SIZE, DB_BUSY_TIMEOUT_MS, DB_DURABILITY
+
+
+# durability setting -> PRAGMA synchronous of the writer connection.
+# In WAL mode, FULL fsyncs the WAL on every commit; NORMAL only fsyncs at
+# checkpoints, so a commit survives an application crash but the most
+# recent ones can be lost if the machine loses power.
+DURABILITY = {
+    "strict": "FULL",
+    "batched": "NORMAL",
+}
+
+# Page cache of the writer connection, in KiB. SQLite's default (2 MiB)
+# is too small to hold the pages that large batches touch in the wide
+# transactions indexes, and a bulk import then spends most of its time
+# re-reading them.
+WRITER_CACHE_KIB = 64 * 1024
+
+
+class ConnectionPool:
+    """
+    Hands out reader connections and the single writer connection
+    for one SQLite database file.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        pool_size: int = DB_POOL_SIZE,
+        busy_timeout_ms: int = DB_BUSY_TIMEOUT_MS,
+        durability: str = DB_DURABILITY,
+    ) -> None:
+        if pool_size < 1:
+            raise ValueError("pool_size must be at least 1")
+        if durability not in DURABILITY:
+            raise ValueError(f"durability must be one of {tuple(DURABILITY)}")
+
+        self.db_path = db_path
+        self.pool_size = pool_size
+        self.busy_timeout_ms = busy_timeout_ms
+        self.durability = durability
+
+        self._write_lock = threading.RLock()
+        self._writer = self._connect()
+        self._writer.execute("PRAGMA journal_mode = WAL;")
+        self._writer.execute(f"PRAGMA synchronous = {DURABILITY[durability]};")
+        self._writer.execute(f"PRAGMA cache_size = -{WRITER_CACHE_KIB};")
+
+        # Only ever asked for PRAGMA data_version (see data_version()).
+        self._version_lock = threading.Lock()
+        self._version_conn = self._connect()
+
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._all_readers: List[sqlite3.Connection] = []
+        self._readers_lock = threading.Lock()
+        self._local = threading.local()
+        self._closed = False
+
+    # ---------- Connections ----------
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.db_path,
+            detect_types=sqlite3.PARSE_DECLTYPES,
+            check_same_thread=False,
+            timeout=self.busy_timeout_ms / 1000.0,
+            # Autocommit mode: transactions are opened explicitly below.
+            isolation_level=None,
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA foreign_keys = ON;")
+        conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout_ms)};")
+        return conn
+
+    def _checkout_reader(self) -> sqlite3.Connection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._readers_lock:
+            if self._closed:
+                raise sqlite3.ProgrammingError("Connection pool is closed")
+            if len(self._all_readers) < self.pool_size:
+                conn = self._connect()
+                self._all_readers.append(conn)
+                return conn
+
+        # Pool exhausted: wait for another thread to hand one back.
+        try:
+            return self._idle.get(timeout=self.busy_timeout_ms / 1000.0)
+        except queue.Empty:
+            raise sqlite3.OperationalError(
+                f"No reader connection became free within {self.busy_timeout_ms} ms "
+                f"(pool_size={self.pool_size})"
+            ) from None
+
+    # ---------- Public API ----------
+
+    @contextmanager
+    def reader(self) -> Iterator[sqlite3.Connection]:
+        """
+        Borrow a read connection for the current thread.
+
+        Nested calls on the same thread reuse the same connection, and a
+        thread that currently holds the writer reads through the writer so
+        it sees its own uncommitted changes.
+        """
+        if self.holds_writer():
+            yield self._writer
+            return
+
+        conn: Optional[sqlite3.Connection] = getattr(self._local, "reader", None)
+        if conn is not None:
+            yield conn
+            return
+
+        conn = self._checkout_reader()
+        self._local.reader = conn
+        try:
+            yield conn
+        finally:
+            self._local.reader = None
+            if conn.in_transaction:
+                conn.rollback()
+            self._idle.put(conn)
+
+    @contextmanager
+    def snapshot(self) -> Iterator[sqlite3.Connection]:
+        """
+        Pin one consistent point in time for every read this thread makes
+        inside the block (reader() returns the snapshot connection).
+
+        Uses a dedicated read-only connection, not one from the pool, and
+        holds a single WAL read transaction on it: writers keep committing
+        while the snapshot is open, and its reads never see them. A
+        long-open snapshot only delays WAL checkpoints past its start.
+        Nested snapshots on the same thread share the outer one.
+        """
+        current: Optional[sqlite3.Connection] = getattr(self._local, "reader", None)
+        if getattr(self._local, "snapshot", False):
+            yield current
+            return
+        if current is not None or self.holds_writer():
+            raise sqlite3.ProgrammingError("snapshot() cannot start inside reader() or writer()")
+
+        with self._readers_lock:
+            if self._closed:
+                raise sqlite3.ProgrammingError("Connection pool is closed")
+        conn = self._connect()
+        try:
+            conn.execute("PRAGMA query_only = ON;")
+            conn.execute("BEGIN")
+            # The first read fixes the snapshot; BEGIN alone does not.
+            conn.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+            self._local.reader = conn
+            self._local.snapshot = True
+            try:
+                yield conn
+            finally:
+                self._local.reader = None
+                self._local.snapshot = False
+        finally:
+            conn.close()
+
+    @contextmanager
+    def writer(self, transaction: bool = True) -> Iterator[sqlite3.Connection]:
+        """
+        Take the (only) writer connection.
+
+        With transaction=True the block runs inside BEGIN IMMEDIATE and is
+        committed on success or rolled back on error. Nested calls on the
+        same thread join the outer transaction; inside an outer
+        transaction=False block they start their own, so a caller can keep
+        the writer across several transactions.
+        """
+        with self._write_lock:
+            depth = getattr(self._local, "write_depth", 0)
+            self._local.write_depth = depth + 1
+            try:
+                if not transaction or self._writer.in_transaction:
+                    yield self._writer
+                    return
+
+                self._writer.execute("BEGIN IMMEDIATE")
+                try:
+                    yield self._writer
+                except BaseException:
+                    self._writer.rollback()
+                    raise
+                else:
+                    self._writer.commit()
+            finally:
+                self._local.write_depth = depth
+
+    def data_version(self) -> int:
+        """
+        PRAGMA data_version of a connection set aside for it. The value
+        changes whenever any other connection commits to the file, the
+        writer of this pool and connections of other processes alike.
+        """
+        with self._version_lock:
+            return self._version_conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def holds_writer(self) -> bool:
+        """True while the current thread is inside writer()."""
+        return bool(getattr(self._local, "write_depth", 0))
+
+    def close(self) -> None:
+        with self._write_lock, self._readers_lock:
+            self._closed = True
+            for conn in self._all_readers:
+                conn.close()
+            self._all_readers.clear()
+            self._writer.close()
+            with self._version_lock:
+                self._version_conn.close()
@@ -0,0 +1,467 @@
+"""
+Sharded layout: one SQLite file per user or per bucket of users.
+
+In a single file, one user's big import or report holds the only write
+lock (and page cache) that every other user needs. In the sharded
+layout each shard is an ordinary database, created by the same
+migrations, with its own pool and writer:
+
+- catalog.db is a small routing database holding users (logins) and
+  user_shards (user id -> shard number).
+- shard_<n>.db holds the accounts, categories and transactions of its
+  users, plus a bare copy of their user rows for the foreign keys.
+- "user" mode gives user N shard N. "bucket" mode spreads users over
+  `buckets` shards by user id.
+- Account, category and transaction ids carry their shard number in the
+  bits above SHARD_ID_BITS, so calls that only get an id
+  (get_transactions(account_id), delete_transaction(id), ...) are routed
+  without a lookup. Shard 0 does not exist, so ids from an unsharded
+  database can never be mistaken for sharded ones.
+
+ShardedDatabaseManager has the same methods as DatabaseManager and can
+be used in its place. What it cannot give is cross-shard atomicity:
+add_transactions_bulk over several users' accounts is atomic per shard
+only.
+
+An existing single-file database is split with (from the project root):
+    python -m database.maintenance split-shards --mode bucket --buckets 16
+"""
+
+import os
+import sqlite3
+import threading
+from contextlib import ExitStack, contextmanager
+from itertools import groupby
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from config import DB_SHARD_BUCKETS, DB_SHARD_DIR
+from .db_manager import DatabaseManager
+
+
+# Ids of shard n are n << SHARD_ID_BITS + 1, + 2, ...: about 10^12 rows
+# per table per shard, and room for 2^23 shards.
+SHARD_ID_BITS = 40
+
+SHARD_MODES = ("bucket", "user")
+
+CATALOG_NAME = "catalog.db"
+
+# Tables whose AUTOINCREMENT ids are moved into the shard's id range.
+_SHARDED_ID_TABLES = ("accounts", "categories", "transactions")
+
+
+def shard_of_id(row_id: int) -> int:
+    """Shard number encoded in an account, category or transaction id."""
+    return int(row_id) >> SHARD_ID_BITS
+
+
+def shard_id_base(shard: int) -> int:
+    return shard << SHARD_ID_BITS
+
+
+def shard_path(shard_dir: str, shard: int) -> str:
+    return os.path.join(shard_dir, f"shard_{shard:d}.db")
+
+
+def _by_user(name: str) -> Callable[..., Any]:
+    return _routed(name, "user_id", lambda self, user_id: self._user_shard(user_id))
+
+
+def _by_account(name: str) -> Callable[..., Any]:
+    return _routed(name, "account_id", lambda self, account_id: self._id_shard(account_id))
+
+
+def _by_transaction(name: str) -> Callable[..., Any]:
+    return _routed(
+        name, "transaction_id", lambda self, transaction_id: self._id_shard(transaction_id)
+    )
+
+
+def _routed(
+    name: str, key: str, shard_for: Callable[["ShardedDatabaseManager", int], DatabaseManager]
+) -> Callable[..., Any]:
+    """A method that calls DatabaseManager.<name> on the shard owning `key`."""
+
+    def method(self: "ShardedDatabaseManager", *args: Any, **kwargs: Any) -> Any:
+        value = kwargs[key] if key in kwargs else args[0]
+        return getattr(shard_for(self, value), name)(*args, **kwargs)
+
+    method.__name__ = name
+    method.__doc__ = f"DatabaseManager.{name}, on the shard that owns `{key}`."
+    return method
+
+
+class ShardedDatabaseManager:
+    """
+    DatabaseManager API over a catalog database and per-user shards.
+    Thread-safe like DatabaseManager; shards are opened on first use.
+    """
+
+    def __init__(
+        self,
+        mode: str = "bucket",
+        shard_dir: str = DB_SHARD_DIR,
+        buckets: int = DB_SHARD_BUCKETS,
+        **options: Any,
+    ) -> None:
+        """
+        options are passed to every DatabaseManager (pool_size,
+        durability, group_commit, ...). `mode` and `buckets` only decide
+        where new users go; existing users stay where the catalog says.
+        """
+        if mode not in SHARD_MODES:
+            raise ValueError(f"mode must be one of {SHARD_MODES}")
+        if buckets < 1:
+            raise ValueError("buckets must be at least 1")
+
+        self.mode = mode
+        self.shard_dir = shard_dir
+        self.buckets = buckets
+        self._options = options
+
+        os.makedirs(shard_dir, exist_ok=True)
+        self.catalog = DatabaseManager(db_path=os.path.join(shard_dir, CATALOG_NAME), **options)
+
+        self._shards: Dict[int, DatabaseManager] = {}
+        self._user_shards: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    # ---------- Routing ----------
+
+    def _assign_shard(self, user_id: int) -> int:
+        if self.mode == "user":
+            return user_id
+        return 1 + (user_id - 1) % self.buckets
+
+    def shard(self, shard: int) -> DatabaseManager:
+        """
+        The DatabaseManager of one shard (opened on first use). Only shards
+        the catalog assigns users to, or whose file exists, are opened:
+        the shard number of a made-up id must not create a file.
+        """
+        db = self._shards.get(shard)
+        if db is None:
+            with self._lock:
+                db = self._shards.get(shard)
+                if db is None:
+                    if not self._shard_exists(shard):
+                        raise ValueError(f"Shard {shard} does not exist")
+                    db = DatabaseManager(db_path=shard_path(self.shard_dir, shard), **self._options)
+                    _reserve_id_range(db, shard)
+                    self._shards[shard] = db
+
+        snapshots = getattr(self._local, "snapshots", None)
+        if snapshots is not None and shard not in snapshots[1]:
+            # Inside snapshot(): pin this shard on first use.
+            stack, pinned = snapshots
+            stack.enter_context(db.pool.snapshot())
+            pinned.add(shard)
+        return db
+
+    def _shard_exists(self, shard: int) -> bool:
+        if shard < 1:
+            return False
+        if os.path.exists(shard_path(self.shard_dir, shard)):
+            return True
+        with self.catalog.pool.reader() as conn:
+            row = conn.execute(
+                "SELECT 1 FROM user_shards WHERE shard = ? LIMIT 1", (shard,)
+            ).fetchone()
+        return row is not None
+
+    def _user_shard(self, user_id: int) -> DatabaseManager:
+        shard = self._user_shards.get(user_id)
+        if shard is None:
+            with self.catalog.pool.reader() as conn:
+                row = conn.execute(
+                    "SELECT shard FROM user_shards WHERE user_id = ?",
+                    (user_id,),
+                ).fetchone()
+            if row is None:
+                raise ValueError(f"User {user_id} does not exist")
+            shard = self._user_shards[user_id] = row["shard"]
+        return self.shard(shard)
+
+    def _id_shard(self, row_id: int) -> DatabaseManager:
+        return self.shard(shard_of_id(row_id))
+
+    def shard_numbers(self) -> List[int]:
+        """Every shard that has users."""
+        with self.catalog.pool.reader() as conn:
+            rows = conn.execute("SELECT DISTINCT shard FROM user_shards ORDER BY shard").fetchall()
+        return [r["shard"] for r in rows]
+
+    @property
+    def data_version(self) -> int:
+        """Counter that changes whenever data in any shard changes."""
+        return self.catalog.data_version + sum(
+            db.data_version for db in list(self._shards.values())
+        )
+
+    @contextmanager
+    def snapshot(self) -> Iterator["ShardedDatabaseManager"]:
+        """
+        Same as DatabaseManager.snapshot. Each shard is pinned when this
+        thread first reads it inside the block, so a report over one
+        account costs one snapshot connection.
+        """
+        if getattr(self._local, "snapshots", None) is not None:
+            yield self
+            return
+        with ExitStack() as stack:
+            self._local.snapshots = (stack, set())
+            try:
+                yield self
+            finally:
+                self._local.snapshots = None
+
+    # ---------- Users (catalog) ----------
+
+    def create_user(
+        self,
+        username: str,
+        password_hash: str,
+        recovery_question: Optional[str] = None,
+        recovery_answer_hash: Optional[str] = None,
+    ) -> Optional[int]:
+        with self.catalog.pool.writer() as conn:
+            user_id = self.catalog.create_user(
+                username, password_hash, recovery_question, recovery_answer_hash
+            )
+            if user_id is None:
+                return None
+            conn.execute(
+                "INSERT INTO user_shards (user_id, shard) VALUES (?, ?)",
+                (user_id, self._assign_shard(user_id)),
+            )
+        return user_id
+
+    def get_user_by_username(self, username: str) -> Optional[Dict[str, Any]]:
+        return self.catalog.get_user_by_username(username)
+
+    def get_user_by_id(self, user_id: int) -> Optional[Dict[str, Any]]:
+        return self.catalog.get_user_by_id(user_id)
+
+    def update_user_password(self, user_id: int, new_password_hash: str) -> None:
+        self.catalog.update_user_password(user_id, new_password_hash)
+
+    # ---------- Accounts, categories and transactions (shards) ----------
+
+    def add_account(self, user_id: int, name: str, description: str = "") -> Optional[int]:
+        db = self._user_shard(user_id)
+        with db.pool.writer() as conn:
+            # The shard's accounts reference users(id); keep a bare copy.
+            conn.execute(
+                "INSERT OR IGNORE INTO users (id, username, password_hash) VALUES (?, ?, '')",
+                (user_id, f"user-{user_id}"),
+            )
+            return db.add_account(user_id, name, description)
+
+    get_all_accounts = _by_user("get_all_accounts")
+    get_accounts_overview = _by_user("get_accounts_overview")
+    get_categories = _by_user("get_categories")
+    suggest_category = _by_user("suggest_category")
+    retrain_category_model = _by_user("retrain_category_model")
+    backfill_categories = _by_user("backfill_categories")
+
+    delete_account = _by_account("delete_account")
+    add_transaction = _by_account("add_transaction")
+    add_transaction_async = _by_account("add_transaction_async")
+    get_transactions = _by_account("get_transactions")
+    get_transactions_page = _by_account("get_transactions_page")
+    iter_transactions = _by_account("iter_transactions")
+    get_transactions_frame = _by_account("get_transactions_frame")
+    search_transactions = _by_account("search_transactions")
+    get_account_summary = _by_account("get_account_summary")
+    get_category_totals = _by_account("get_category_totals")
+    get_period_totals = _by_account("get_period_totals")
+
+    update_transaction = _by_transaction("update_transaction")
+    update_transaction_async = _by_transaction("update_transaction_async")
+    delete_transaction = _by_transaction("delete_transaction")
+    delete_transaction_async = _by_transaction("delete_transaction_async")
+
+    def add_transactions_bulk(
+        self,
+        rows: Iterable[Tuple[int, str, float, str, str, str]],
+        batch_size: int = 50_000,
+    ) -> int:
+        """
+        DatabaseManager.add_transactions_bulk, routed by account. Each run
+        of consecutive rows for the same shard is one transaction there.
+        """
+        inserted = 0
+        for shard, run in groupby(rows, key=lambda row: shard_of_id(row[0])):
+            inserted += self.shard(shard).add_transactions_bulk(run, batch_size=batch_size)
+        return inserted
+
+    # ---------- Maintenance (every shard) ----------
+
+    def _all_shards(self) -> List[DatabaseManager]:
+        return [self.shard(n) for n in self.shard_numbers()]
+
+    def rebuild_account_balances(self) -> int:
+        return sum(db.rebuild_account_balances() for db in self._all_shards())
+
+    def verify_account_balances(self, tolerance: float = 0.005) -> List[Dict[str, Any]]:
+        return [m for db in self._all_shards() for m in db.verify_account_balances(tolerance)]
+
+    def rebuild_monthly_rollups(self) -> int:
+        return sum(db.rebuild_monthly_rollups() for db in self._all_shards())
+
+    def verify_monthly_rollups(self, tolerance: float = 0.005) -> List[Dict[str, Any]]:
+        return [m for db in self._all_shards() for m in db.verify_monthly_rollups(tolerance)]
+
+    def rebuild_search_index(self) -> int:
+        return sum(db.rebuild_search_index() for db in self._all_shards())
+
+    def flush_writes(self) -> None:
+        for db in list(self._shards.values()):
+            db.flush_writes()
+
+    def close(self) -> None:
+        with self._lock:
+            for db in self._shards.values():
+                db.close()
+            self._shards.clear()
+        self.catalog.close()
+
+
+def _reserve_id_range(db: DatabaseManager, shard: int) -> None:
+    """Make the shard's AUTOINCREMENT ids start inside its id range."""
+    base = shard_id_base(shard)
+    with db.pool.writer() as conn:
+        for table in _SHARDED_ID_TABLES:
+            conn.execute(
+                """
+                INSERT INTO sqlite_sequence (name, seq)
+                SELECT ?, ? WHERE NOT EXISTS (SELECT 1 FROM sqlite_sequence WHERE name = ?)
+                """,
+                (table, base, table),
+            )
+            conn.execute(
+                "UPDATE sqlite_sequence SET seq = ? WHERE name = ? AND seq < ?",
+                (base, table, base),
+            )
+
+
+def split_database(
+    source: DatabaseManager,
+    shard_dir: str,
+    mode: str = "bucket",
+    buckets: int = DB_SHARD_BUCKETS,
+) -> Dict[int, int]:
+    """
+    Copy a single-file database into a new sharded layout in shard_dir.
+
+    Users keep their ids; account, category and transaction ids are moved
+    into their shard's id range (old id + shard base). Running totals,
+    rollups and the search index are filled by the shards' triggers. The
+    source is not modified. Returns {shard: number of users}.
+    """
+    source_path = os.path.abspath(source.pool.db_path)
+    with source.pool.reader() as conn:
+        if conn.execute("SELECT COUNT(*) FROM archive_partitions").fetchone()[0]:
+            raise ValueError("Archived years cannot be split into shards; re-import them first")
+
+    sharded = ShardedDatabaseManager(mode=mode, shard_dir=shard_dir, buckets=buckets)
+    try:
+        catalog = sharded.catalog
+        with catalog.pool.writer(transaction=False) as conn:
+            if conn.execute("SELECT COUNT(*) FROM users").fetchone()[0]:
+                raise ValueError(f"{shard_dir} already has users; split into an empty directory")
+            conn.execute("ATTACH DATABASE ? AS source", (source_path,))
+            try:
+                with catalog.pool.writer():
+                    conn.execute(
+                        """
+                        INSERT INTO users (
+                            id, username, password_hash, recovery_question,
+                            recovery_answer_hash, created_at
+                        )
+                        SELECT id, username, password_hash, recovery_question,
+                               recovery_answer_hash, created_at
+                        FROM source.users
+                        """
+                    )
+                    user_ids = [r["id"] for r in conn.execute("SELECT id FROM users ORDER BY id")]
+                    conn.executemany(
+                        "INSERT INTO user_shards (user_id, shard) VALUES (?, ?)",
+                        [(user_id, sharded._assign_shard(user_id)) for user_id in user_ids],
+                    )
+            finally:
+                conn.execute("DETACH DATABASE source")
+
+        users_per_shard: Dict[int, List[int]] = {}
+        for user_id in user_ids:
+            users_per_shard.setdefault(sharded._assign_shard(user_id), []).append(user_id)
+
+        for shard, shard_users in users_per_shard.items():
+            _copy_users(sharded.shard(shard), source_path, shard, shard_users)
+    finally:
+        sharded.close()
+    return {shard: len(users) for shard, users in sorted(users_per_shard.items())}
+
+
+def _copy_users(db: DatabaseManager, source_path: str, shard: int, user_ids: List[int]) -> None:
+    base = shard_id_base(shard)
+    with db.pool.writer(transaction=False) as conn:
+        conn.execute("ATTACH DATABASE ? AS source", (source_path,))
+        try:
+            with db.pool.writer():
+                conn.execute("CREATE TEMP TABLE shard_users (id INTEGER PRIMARY KEY)")
+                conn.executemany(
+                    "INSERT INTO temp.shard_users (id) VALUES (?)", [(u,) for u in user_ids]
+                )
+                conn.execute(
+                    """
+                    INSERT INTO users (id, username, password_hash)
+                    SELECT id, 'user-' || id, '' FROM temp.shard_users
+                    """
+                )
+                conn.execute(
+                    """
+                    INSERT INTO accounts (id, user_id, name, description, created_at)
+                    SELECT id + ?, user_id, name, description, created_at
+                    FROM source.accounts
+                    WHERE user_id IN (SELECT id FROM temp.shard_users)
+                    """,
+                    (base,),
+                )
+                conn.execute(
+                    """
+                    INSERT INTO categories (id, user_id, name, name_key)
+                    SELECT id + ?, user_id, name, name_key
+                    FROM source.categories
+                    WHERE user_id IN (SELECT id FROM temp.shard_users)
+                    """,
+                    (base,),
+                )
+                conn.execute(
+                    """
+                    INSERT INTO transactions (
+                        id, account_id, type, amount, description, category_id,
+                        transaction_date, created_at
+                    )
+                    SELECT t.id + ?1, t.account_id + ?1, t.type, t.amount, t.description,
+                           t.category_id + ?1, t.transaction_date, t.created_at
+                    FROM source.transactions t
+                    JOIN source.accounts a ON a.id = t.account_id
+                    WHERE a.user_id IN (SELECT id FROM temp.shard_users)
+                    ORDER BY t.id
+                    """,
+                    (base,),
+                )
+                conn.execute(
+                    """
+                    INSERT INTO category_model (user_id, category_id, doc_count, term_counts)
+                    SELECT user_id, category_id + ?, doc_count, term_counts
+                    FROM source.category_model
+                    WHERE user_id IN (SELECT id FROM temp.shard_users)
+                    """,
+                    (base,),
+                )
+                conn.execute("DROP TABLE temp.shard_users")
+        finally:
+            conn.execute("DETACH DATABASE source")
@@ -0,0 +1,163 @@
+"""
+Group commit for SQLite writes.
+
+Every write through ConnectionPool.writer() is its own transaction, and
+with durability="strict" every commit is an fsync. Under bursty load
+(many sessions saving at once) the disk flush, not SQLite, caps the
+number of writes per second.
+
+GroupCommitQueue puts writes on a queue instead. One background thread
+takes them off in batches and runs each batch in a single BEGIN IMMEDIATE
+transaction, so one commit (and one fsync) covers many writes:
+
+- A batch closes after `max_batch` writes, or `max_delay_ms` after its
+  first write was taken, whichever comes first. Writes that queue up
+  while a commit is in progress simply form the next batch, so batching
+  happens even with max_delay_ms=0 (the default) once writers overlap.
+- Each write runs inside its own SAVEPOINT. A write that raises is rolled
+  back alone and its future gets the exception; the rest of the batch
+  still commits.
+- A write's future resolves only after its batch has committed, so a
+  caller that waits on it reads its own write on any connection.
+"""
+
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, List, Optional, Tuple
+
+from config import DB_GROUP_COMMIT_MAX_BATCH, DB_GROUP_COMMIT_MAX_DELAY_MS
+from .pool import ConnectionPool
+
+
+# A queued write: runs on the writer connection, inside the batch transaction.
+Write = Callable[[sqlite3.Connection], Any]
+
+_STOP = object()
+
+
+class GroupCommitQueue:
+    """
+    Commits writes submitted from any thread in batches, on one
+    background thread.
+    """
+
+    def __init__(
+        self,
+        pool: ConnectionPool,
+        max_batch: int = DB_GROUP_COMMIT_MAX_BATCH,
+        max_delay_ms: float = DB_GROUP_COMMIT_MAX_DELAY_MS,
+        on_commit: Optional[Callable[[], None]] = None,
+    ) -> None:
+        """
+        on_commit is called on the writer thread after every batch that
+        committed at least one write, before any of its futures resolve.
+        """
+        if max_batch < 1:
+            raise ValueError("max_batch must be at least 1")
+
+        self.pool = pool
+        self.max_batch = max_batch
+        self.max_delay_ms = max_delay_ms
+        self.on_commit = on_commit
+
+        # Counters for benchmarks and tests.
+        self.committed_batches = 0
+        self.committed_writes = 0
+
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._submit_lock = threading.Lock()
+        self._closed = False
+        self._thread = threading.Thread(
+            target=self._run, name="sqlite-group-commit", daemon=True
+        )
+        self._thread.start()
+
+    # ---------- Public API ----------
+
+    def submit(self, write: Write) -> "Future[Any]":
+        """
+        Queue `write` and return a Future for its return value.
+
+        Must not be waited on from a thread that holds the pool's writer:
+        the batch thread needs the writer to run it.
+        """
+        future: "Future[Any]" = Future()
+        with self._submit_lock:
+            if self._closed:
+                raise sqlite3.ProgrammingError("Write queue is closed")
+            self._queue.put((write, future))
+        return future
+
+    def flush(self) -> None:
+        """Wait until every write submitted so far has been committed."""
+        self.submit(lambda conn: None).result()
+
+    def close(self) -> None:
+        """Commit all pending writes, then stop the background thread."""
+        with self._submit_lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(_STOP)
+        self._thread.join()
+
+    # ---------- Background thread ----------
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            deadline = time.monotonic() + self.max_delay_ms / 1000.0
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._commit(batch)
+
+    def _commit(self, batch: List[Tuple[Write, "Future[Any]"]]) -> None:
+        live = [(write, future) for write, future in batch if future.set_running_or_notify_cancel()]
+        if not live:
+            return
+
+        outcomes: List[Tuple["Future[Any]", Any, Optional[BaseException]]] = []
+        try:
+            with self.pool.writer() as conn:
+                for write, future in live:
+                    conn.execute("SAVEPOINT queued_write")
+                    try:
+                        result = write(conn)
+                    except Exception as exc:
+                        conn.execute("ROLLBACK TO queued_write")
+                        conn.execute("RELEASE queued_write")
+                        outcomes.append((future, None, exc))
+                    else:
+                        conn.execute("RELEASE queued_write")
+                        outcomes.append((future, result, None))
+        except Exception as exc:
+            # BEGIN or COMMIT failed: nothing in the batch was written.
+            for _, future in live:
+                future.set_exception(exc)
+            return
+
+        succeeded = sum(1 for _, _, exc in outcomes if exc is None)
+        self.committed_batches += 1
+        self.committed_writes += succeeded
+        if succeeded and self.on_commit is not None:
+            self.on_commit()
+
+        for future, result, exc in outcomes:
+            if exc is None:
+                future.set_result(result)
+            else:
+                future.set_exception(exc)
@@ -0,0 +1,75 @@
+"""
+Bounded LRU cache for NLPParser results.
+
+Users and integrations send the same phrasings again and again ("paid 50
+for milk today", recurring bill alerts), so the parser keeps recent
+results keyed on the normalized text. Entries remember the day they were
+computed on, and how the date was derived, so NLPParser can re-resolve
+relative dates ("today", "2 days ago") on later days instead of
+returning a stale one. The cache is shared by every session using the
+parser, so it is guarded by a lock.
+"""
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date
+from typing import TYPE_CHECKING, NamedTuple, Optional
+
+if TYPE_CHECKING:
+    from .parser import ParsedTransaction
+
+
+class CacheInfo(NamedTuple):
+    """Same fields as functools.lru_cache's cache_info()."""
+
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+@dataclass
+class CacheEntry:
+    result: "ParsedTransaction"
+    # Days before computed_on the date was taken to be (today, yesterday,
+    # N days ago, no date in the text), or None for a date from the text.
+    days_back: Optional[int]
+    computed_on: date
+
+
+class ParseCache:
+    def __init__(self, maxsize: int) -> None:
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry
+
+    def put(self, key: str, entry: CacheEntry) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def info(self) -> CacheInfo:
+        with self._lock:
+            return CacheInfo(self._hits, self._misses, self.maxsize, len(self._entries))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._hits = self._misses = 0
@@ -0,0 +1,120 @@
+"""
+Per-user category classifier: multinomial naive Bayes over hashed words.
+
+The keyword rules in nlp/patterns.py only know a handful of categories,
+so most transactions end up uncategorized until the user picks one. This
+model learns from the user's own categorized transactions instead. A
+description becomes a set of word buckets (crc32 of each lower-cased word
+modulo N_BUCKETS), and each category keeps how many of its transactions
+contained each bucket. Training is adding counts, so the model can be
+updated one transaction at a time. Storage and incremental updates live
+in database/category_model.py.
+
+Scoring one description is a gather and a sum over a (categories x
+buckets) table of log-probabilities, a few microseconds. predict_many
+scores a whole batch with one matrix product per chunk.
+"""
+
+import re
+import zlib
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+
+# Hashed vocabulary size; bucket ids are stored as uint16.
+N_BUCKETS = 1 << 12
+# Additive smoothing of the per-category bucket counts.
+ALPHA = 0.5
+
+_WORD = re.compile(r"[^\W\d_]{2,}")
+
+Prediction = Tuple[int, float]  # (category_id, probability)
+
+
+def token_buckets(text: Optional[str]) -> np.ndarray:
+    """Distinct word buckets of a description (digits and 1-letter words skipped)."""
+    words = set(_WORD.findall((text or "").lower()))
+    return np.fromiter(
+        (zlib.crc32(w.encode("utf-8")) % N_BUCKETS for w in words),
+        dtype=np.intp,
+        count=len(words),
+    )
+
+
+def encode_counts(counts: np.ndarray) -> bytes:
+    """Sparse little-endian encoding: uint16 bucket ids, then uint32 counts."""
+    buckets = np.flatnonzero(counts)
+    return buckets.astype("<u2").tobytes() + counts[buckets].astype("<u4").tobytes()
+
+
+def decode_counts(blob: bytes) -> np.ndarray:
+    n = len(blob) // 6
+    counts = np.zeros(N_BUCKETS, dtype=np.float64)
+    counts[np.frombuffer(blob, "<u2", n)] = np.frombuffer(blob, "<u4", n, 2 * n)
+    return counts
+
+
+class CategoryModel:
+    """
+    A trained model: category_ids[i] has doc_counts[i] transactions, and
+    counts[i, b] of them contain word bucket b.
+    """
+
+    # Below this, a prediction is not worth suggesting.
+    MIN_DOCUMENTS = 5
+
+    def __init__(
+        self, category_ids: np.ndarray, doc_counts: np.ndarray, counts: np.ndarray
+    ) -> None:
+        self.category_ids = category_ids
+        self.doc_counts = doc_counts
+        self.counts = counts
+        self._log_prior = np.log(doc_counts / doc_counts.sum())
+        totals = counts.sum(axis=1, keepdims=True)
+        self._log_likelihood = np.log(counts + ALPHA) - np.log(totals + ALPHA * N_BUCKETS)
+        self._known = counts.sum(axis=0) > 0
+
+    @property
+    def usable(self) -> bool:
+        """At least two categories and MIN_DOCUMENTS examples to tell apart."""
+        return len(self.category_ids) >= 2 and self.doc_counts.sum() >= self.MIN_DOCUMENTS
+
+    def predict(self, text: Optional[str]) -> Optional[Prediction]:
+        """
+        Most likely category of a description and its probability, or None
+        when the model is not usable or knows none of the words.
+        """
+        buckets = token_buckets(text)
+        if not self.usable or not self._known[buckets].any():
+            return None
+        scores = self._log_prior + self._log_likelihood[:, buckets].sum(axis=1)
+        return self._best(scores[None, :])[0]
+
+    def predict_many(
+        self, texts: Iterable[Optional[str]], chunk_size: int = 1024
+    ) -> List[Optional[Prediction]]:
+        """predict() for many descriptions, scored a chunk at a time."""
+        texts = list(texts)
+        if not self.usable:
+            return [None] * len(texts)
+        results: List[Optional[Prediction]] = []
+        for start in range(0, len(texts), chunk_size):
+            chunk = [token_buckets(t) for t in texts[start:start + chunk_size]]
+            present = np.zeros((len(chunk), N_BUCKETS), dtype=np.float64)
+            rows = np.repeat(np.arange(len(chunk)), [len(b) for b in chunk])
+            present[rows, np.concatenate(chunk)] = 1.0
+            scores = self._log_prior + present @ self._log_likelihood.T
+            known = (present[:, self._known] > 0).any(axis=1)
+            results.extend(p if k else None for p, k in zip(self._best(scores), known))
+        return results
+
+    def _best(self, scores: np.ndarray) -> List[Prediction]:
+        scores = scores - scores.max(axis=1, keepdims=True)
+        probs = np.exp(scores)
+        probs /= probs.sum(axis=1, keepdims=True)
+        best = probs.argmax(axis=1)
+        return [
+            (int(self.category_ids[i]), float(probs[row, i]))
+            for row, i in enumerate(best)
+        ]
@@ -0,0 +1,104 @@
+"""
+Hand-rolled parsing of the date formats people actually type after "on":
+
+- year first:    2024-12-05, 2024/12/05
+- numeric:       05/12/2024, 5-12-24, 5.12 (day first, like dateutil's
+                 dayfirst=True)
+- day month:     5 dec, 5th of December 2024
+- month day:     dec 5, December 5th, 2024
+
+parse_weekday reads the weekday phrases spaCy marks as DATE ("last
+friday", "on monday"), which are relative to the day of parsing.
+
+Each pattern is anchored at the given position and has bounded
+repetition, so a call costs the same however long the rest of the text
+is. A missing year means the current one, as with dateutil's defaults.
+"""
+
+import re
+from datetime import date, timedelta
+from typing import Optional
+
+
+MONTHS = {
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "may": 5, "jun": 6,
+    "jul": 7, "aug": 8, "sep": 9, "oct": 10, "nov": 11, "dec": 12,
+}
+
+_MONTH = (
+    r"(jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?"
+    r"|aug(?:ust)?|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)\b\.?"
+)
+_DAY = r"(\d{1,2})(?:st|nd|rd|th)?\b"
+_YEAR = r"(?:,?[ \t]{1,3}(\d{4})\b)?"
+
+ISO_REGEX = re.compile(r"(\d{4})([-/.])(\d{1,2})\2(\d{1,2})\b")
+NUMERIC_REGEX = re.compile(r"(\d{1,2})([/.-])(\d{1,2})(?:\2(\d{4}|\d{2}))?\b")
+DAY_MONTH_REGEX = re.compile(_DAY + r"(?:[ \t]{1,3}of)?[ \t]{1,3}" + _MONTH + _YEAR, re.IGNORECASE)
+MONTH_DAY_REGEX = re.compile(_MONTH + r"[ \t]{1,3}" + _DAY + _YEAR, re.IGNORECASE)
+
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+WEEKDAY_REGEX = re.compile(r"(?:on[ \t]+)?(?:(last|this|past)[ \t]+)?([a-z]{3,9})\.?")
+
+
+def parse_date(text: str, pos: int, today: date) -> Optional[date]:
+    """The date starting at text[pos], or None if none of the formats match."""
+    m = ISO_REGEX.match(text, pos)
+    if m:
+        return _make(int(m.group(1)), int(m.group(3)), int(m.group(4)))
+
+    m = NUMERIC_REGEX.match(text, pos)
+    if m:
+        year = _full_year(m.group(4), today)
+        return _make(year, int(m.group(3)), int(m.group(1)))
+
+    m = DAY_MONTH_REGEX.match(text, pos)
+    if m:
+        day, month, year = m.group(1), m.group(2), m.group(3)
+    else:
+        m = MONTH_DAY_REGEX.match(text, pos)
+        if not m:
+            return None
+        month, day, year = m.group(1), m.group(2), m.group(3)
+    return _make(int(year) if year else today.year, MONTHS[month[:3].lower()], int(day))
+
+
+def _full_year(year: Optional[str], today: date) -> int:
+    if year is None:
+        return today.year
+    if len(year) == 4:
+        return int(year)
+    # Two digits: the year within 50 years of today, as dateutil does.
+    full = today.year // 100 * 100 + int(year)
+    if full >= today.year + 50:
+        full -= 100
+    elif full < today.year - 50:
+        full += 100
+    return full
+
+
+def _make(year: int, month: int, day: int) -> Optional[date]:
+    try:
+        return date(year, month, day)
+    except ValueError:
+        return None
+
+
+def parse_weekday(text: str, today: date) -> Optional[date]:
+    """
+    The day a weekday phrase refers to, looking back from `today`:
+    "friday" and "this friday" are the latest Friday up to today, "last
+    friday" the one before today. None for anything else (e.g. "next
+    friday": transactions are not in the future).
+    """
+    m = WEEKDAY_REGEX.fullmatch(text.strip().lower())
+    if not m:
+        return None
+    # "fri", "thurs" and "friday" alike
+    weekday = next((i for i, name in enumerate(WEEKDAYS) if name.startswith(m.group(2))), None)
+    if weekday is None:
+        return None
+    days_back = (today.weekday() - weekday) % 7
+    if m.group(1) in ("last", "past") and days_back == 0:
+        days_back = 7
+    return today - timedelta(days=days_back)
@@ -0,0 +1,85 @@
+"""
+Single-pass keyword matching for the NLP parser.
+
+KeywordMatcher compiles every keyword list in nlp/patterns.py into one
+regex shaped like a trie (keywords sharing a prefix share a branch), so
+finding all hits in a sentence is one scan whose cost depends on the
+sentence length and the longest keyword, not on how many keywords there
+are. That keeps the parser fast when the lists grow to thousands of
+merchant names.
+
+Keywords match whole words only ("bus" does not match "business", nor
+"got" "forgot"), optionally followed by a plural "s"/"es" ("books" still
+hits "book"). Matching is case-insensitive. Where keywords overlap, the
+leftmost and then longest one wins ("phone bill" over "bill").
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+Label = Tuple[str, str]  # (kind, label), e.g. ("type", "income")
+
+
+@dataclass(frozen=True)
+class KeywordHit:
+    keyword: str
+    start: int
+    end: int
+    labels: Tuple[Label, ...]
+
+    def label(self, kind: str) -> Optional[str]:
+        """This keyword's label of the given kind, if it has one."""
+        for k, label in self.labels:
+            if k == kind:
+                return label
+        return None
+
+
+class KeywordMatcher:
+    """
+    Matches keyword lists given as (kind, label, keywords) triples. A
+    keyword listed under several labels carries all of them.
+    """
+
+    def __init__(self, groups: Iterable[Tuple[str, str, Iterable[str]]]) -> None:
+        self._labels: Dict[str, Tuple[Label, ...]] = {}
+        for kind, label, keywords in groups:
+            for kw in keywords:
+                kw = kw.lower()
+                if (kind, label) not in self._labels.get(kw, ()):
+                    self._labels[kw] = self._labels.get(kw, ()) + ((kind, label),)
+        self._regex = re.compile(
+            r"(?<!\w)(" + _trie_pattern(self._labels) + r")(?:e?s)?(?!\w)",
+            re.IGNORECASE,
+        )
+
+    def find(self, text: str) -> List[KeywordHit]:
+        """All keyword hits in text, in order of position."""
+        return [
+            KeywordHit(kw, m.start(), m.end(), self._labels[kw])
+            for m in self._regex.finditer(text)
+            for kw in (m.group(1).lower(),)
+        ]
+
+
+def _trie_pattern(words: Iterable[str]) -> str:
+    trie: Dict[str, dict] = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+    return _node_pattern(trie) or "(?!)"
+
+
+def _node_pattern(node: Dict[str, dict]) -> str:
+    # Longer continuations come before the end of a word, so a regex scan
+    # prefers the longest keyword and backtracks to shorter ones.
+    branches = [re.escape(ch) + _node_pattern(child) for ch, child in sorted(node.items()) if ch]
+    if not branches:
+        return ""
+    if "" not in node:
+        return branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    return "(?:" + "|".join(branches) + ")?"
@@ -0,0 +1,54 @@
+"""
+Amounts written in words, as spaCy marks them MONEY: "five hundred",
+"two thousand five hundred rupees", "1.5 lakh", "twenty-five".
+
+Only used on entity text (a few words), never on a whole input, so a
+plain word loop is enough.
+"""
+
+import re
+from typing import Optional
+
+
+UNITS = {
+    "zero": 0, "a": 1, "an": 1, "one": 1, "two": 2, "three": 3, "four": 4,
+    "five": 5, "six": 6, "seven": 7, "eight": 8, "nine": 9, "ten": 10,
+    "eleven": 11, "twelve": 12, "thirteen": 13, "fourteen": 14, "fifteen": 15,
+    "sixteen": 16, "seventeen": 17, "eighteen": 18, "nineteen": 19,
+    "twenty": 20, "thirty": 30, "forty": 40, "fifty": 50, "sixty": 60,
+    "seventy": 70, "eighty": 80, "ninety": 90,
+}
+
+# Multipliers that close a group ("two thousand", "1.5 lakh")
+SCALES = {
+    "thousand": 1_000, "k": 1_000, "lakh": 100_000, "lakhs": 100_000,
+    "million": 1_000_000, "crore": 10_000_000, "crores": 10_000_000,
+}
+
+# Words around the number that do not change it
+IGNORED = {"and", "rs", "rs.", "inr", "₹", "rupee", "rupees", "only"}
+
+_WORD = re.compile(r"₹|[a-z]+\.?|\d+(?:,\d+)*(?:\.\d+)?")
+
+
+def parse_amount_words(text: str) -> Optional[float]:
+    """The amount `text` spells out, or None if it has other words."""
+    total = 0.0
+    group: Optional[float] = None  # value below the next scale word
+    for word in _WORD.findall(text.lower().replace("-", " ")):
+        if word in IGNORED:
+            continue
+        if word in UNITS:
+            group = (group or 0) + UNITS[word]
+        elif word[0].isdigit():
+            group = (group or 0) + float(word.replace(",", ""))
+        elif word == "hundred":
+            group = (group or 1) * 100
+        elif word in SCALES:
+            total += (group or 1) * SCALES[word]
+            group = None
+        else:
+            return None
+    if group is None and total == 0:
+        return None
+    return total + (group or 0)
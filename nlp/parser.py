@@ -4,19 +4,64 @@ NLP parser: converts natural language text into structured transaction data.
 
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Optional, Literal
+from collections import deque
+from dataclasses import dataclass, replace
+from functools import lru_cache
+from itertools import islice
+from typing import TYPE_CHECKING, Deque, Iterable, Iterator, List, Optional, Literal, Tuple
 from datetime import date, timedelta
 
+import os
 import re
-import spacy
-from dateutil import parser as date_parser
-
-from .patterns import AMOUNT_REGEXES, INCOME_KEYWORDS, EXPENSE_KEYWORDS, CATEGORY_KEYWORDS
+import time
+
+from .keywords import KeywordHit
+from .cache import CacheEntry, CacheInfo, ParseCache
+from .dates import parse_date, parse_weekday
+from .numbers import parse_amount_words
+from .patterns import (
+    AMOUNT_REGEXES,
+    CANDIDATE_NUMBER_REGEX,
+    CATEGORY_KEYWORDS,
+    DATE_END_REGEX,
+    DATE_HINT_REGEX,
+    DAYS_AGO_REGEX,
+    KEYWORD_MATCHER,
+    MULTIPLY_REGEX,
+    ON_DATE_REGEX,
+)
+from .stats import ParserStats, TierStats
+
+
+if TYPE_CHECKING:
+    from spacy.language import Language
 
 
 TransactionType = Literal["income", "expense"]
 
+# parse_many: texts handed to a worker process at a time. Batches that fit
+# in two chunks are parsed in-process; a pool would cost more than it saves.
+PARSE_CHUNK_SIZE = 2_000
+
+CATEGORY_ORDER = list(CATEGORY_KEYWORDS)
+
+# Longest text parse() accepts. Every rule is linear in the text length;
+# the cap bounds the worst case (a long SMS is a few hundred characters).
+MAX_TEXT_LENGTH = 1_000
+
+# Longest "on <date>" phrase handed to dateutil, the last-resort parser.
+MAX_DATE_TEXT_LENGTH = 40
+
+# Default number of recent results NLPParser keeps (see nlp/cache.py).
+PARSE_CACHE_SIZE = 4_096
+
+# Texts whose rule confidence (see _Reading) is below this go on to spaCy's
+# entity recognizer. 0 turns escalation off.
+ESCALATION_THRESHOLD = 0.5
+
+# Texts per nlp.pipe call (and per in-process parse_many batch).
+NER_BATCH_SIZE = 256
+
 
 @dataclass
 class ParsedTransaction:
@@ -29,27 +74,100 @@ class ParsedTransaction:
     description: str
     category: Optional[str]
     transaction_date: date
+    # Organization spaCy found in the text (only set for the "ner" tier)
+    merchant: Optional[str] = None
+    # How sure the rules were (0-1), and which tier produced the result:
+    # "rules" or "ner" (see nlp/stats.py)
+    confidence: float = 1.0
+    tier: str = "rules"
+
+
+@dataclass
+class ParseResult:
+    """
+    One item of NLPParser.parse_many: the parsed transaction, or the error
+    parse() raised for that text.
+    """
+
+    text: str
+    transaction: Optional[ParsedTransaction] = None
+    error: Optional[Exception] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class _Reading:
+    """
+    What the rules made of one text, before the description and category
+    are derived. Each part has a confidence:
+
+    - amount: 1.0 for a currency or "N of M each" match, 0.8 for the only
+      plain number in the text, 0.4 when there are several to pick from,
+      0 when there is none;
+    - date: 1.0 when one was found, 0.9 for the default (today), 0.3 for
+      the default when the text has date words the rules do not handle;
+    - type: 1.0 for a keyword, 0.7 for the default (expense).
+    """
+
+    original_text: str
+    today: date
+    hits: List[KeywordHit]
+    amount: Optional[float]
+    amount_confidence: float
+    trans_type: TransactionType
+    type_confidence: float
+    transaction_date: date
+    days_back: Optional[int]
+    date_confidence: float
+    merchant: Optional[str] = None
+    date_from_entities: bool = False
+
+    @property
+    def confidence(self) -> float:
+        return min(self.amount_confidence, self.date_confidence, self.type_confidence)
 
 
 class NLPParser:
     """
     High-level NLP parser that uses:
     - regex for amounts
-    - keyword rules for income/expense
-    - dateutil for dates
-    - optional spaCy for tokenization later
+    - keyword rules for income/expense and categories (one matcher pass)
+    - hand-written formats, then dateutil, for dates
+    - spaCy MONEY/DATE/ORG entities when the rules are unsure
+
+    The rules answer most texts in microseconds. Each answer comes with a
+    confidence, and only texts below `escalation_threshold` are run
+    through spaCy, which fills in the amount and date the rules were
+    unsure of and the merchant. Without spaCy or its model the rules'
+    answer is used as is.
+
+    Constructing a parser is cheap: spaCy is imported and the model loaded
+    the first time a text is escalated (or `nlp` is used), and dateutil
+    only when a sentence has an "on <date>" part.
     """
 
-    def __init__(self, model_name: str = "en_core_web_sm") -> None:
-        # Load spaCy model for future advanced parsing.
-        # We keep it simple for now (main logic uses regex/keywords).
-        try:
-            self.nlp = spacy.load(model_name)
-        except OSError as exc:
-            raise RuntimeError(
-                f"spaCy model '{model_name}' is not installed. "
-                f"Run: python -m spacy download {model_name}"
-            ) from exc
+    def __init__(
+        self,
+        model_name: str = "en_core_web_sm",
+        cache_size: int = PARSE_CACHE_SIZE,
+        escalation_threshold: float = ESCALATION_THRESHOLD,
+    ) -> None:
+        self.model_name = model_name
+        self.cache_size = cache_size
+        self.escalation_threshold = escalation_threshold
+        # LRU of recent results (see nlp/cache.py); 0 disables it.
+        self._cache = ParseCache(cache_size) if cache_size > 0 else None
+        self._stats = TierStats()
+        # Why escalation is off (spaCy or the model missing), once known.
+        self._ner_error: Optional[Exception] = None
+
+    @property
+    def nlp(self) -> "Language":
+        """The spaCy pipeline, loaded on first use and shared per model name."""
+        return _load_spacy(self.model_name)
 
     # ---------- Public API ----------
 
@@ -59,31 +177,249 @@ class NLPParser:
         Input: raw user text like "bought pen for 5 rupees yesterday"
         Output: ParsedTransaction object.
         """
-        if not text or not text.strip():
-            raise ValueError("Input text is empty")
+        result = self._parse_batch([text])[0]
+        if result.error is not None:
+            raise result.error
+        return result.transaction
 
-        original_text = text
-        text = text.strip().lower()
+    def cache_info(self) -> CacheInfo:
+        """Hits, misses and size of the parse cache (all 0 when disabled)."""
+        return self._cache.info() if self._cache is not None else CacheInfo(0, 0, 0, 0)
 
-        amount = self._extract_amount(text)
-        trans_type = self._detect_transaction_type(text)
-        tx_date = self._extract_date(text)
-        description = self._extract_description(original_text, amount, tx_date, trans_type)
-        category = self._detect_category(description or original_text)
+    def cache_clear(self) -> None:
+        if self._cache is not None:
+            self._cache.clear()
 
-        return ParsedTransaction(
-            trans_type=trans_type,
+    def tier_stats(self) -> ParserStats:
+        """
+        Texts answered per tier, their p50/p95 latency and the escalation
+        rate (see nlp/stats.py). parse_many worker processes keep their
+        own, so only texts parsed in this process are counted.
+        """
+        return self._stats.snapshot()
+
+    def tier_stats_clear(self) -> None:
+        self._stats.clear()
+
+    def parse_many(
+        self,
+        texts: Iterable[str],
+        workers: Optional[int] = None,
+        chunk_size: int = PARSE_CHUNK_SIZE,
+    ) -> Iterator[ParseResult]:
+        """
+        Parse many texts (e.g. imported SMS or bank alerts), yielding one
+        ParseResult per text, in input order. A text that fails to parse
+        yields a result with `error` set instead of stopping the batch.
+
+        Texts the rules are unsure of are sent to spaCy together, up to
+        NER_BATCH_SIZE (in-process) or `chunk_size` (workers) at a time.
+
+        Small batches, and workers=1, run in this process. Larger ones are
+        split into chunks of `chunk_size` texts and parsed by a pool of
+        `workers` processes (default: one per CPU), each with its own
+        parser. Only a few chunks per worker are in flight at once, so
+        `texts` can be a lazy iterable such as an open file.
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        workers = workers or os.cpu_count() or 1
+        it = iter(texts)
+        head = list(islice(it, 2 * chunk_size))
+
+        if workers == 1 or len(head) < 2 * chunk_size:
+            for batch in _chunks(head, it, NER_BATCH_SIZE):
+                yield from self._parse_batch(batch)
+            return
+
+        from concurrent.futures import Future, ProcessPoolExecutor
+
+        chunks = _chunks(head, it, chunk_size)
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(self.model_name, self.cache_size, self.escalation_threshold),
+        ) as pool:
+            pending: Deque[Future] = deque()
+            for chunk in islice(chunks, 2 * workers):
+                pending.append(pool.submit(_parse_chunk, chunk))
+            while pending:
+                results = pending.popleft().result()
+                for chunk in islice(chunks, 1):
+                    pending.append(pool.submit(_parse_chunk, chunk))
+                yield from results
+
+    # ---------- Internal helpers ----------
+
+    def _parse_batch(self, texts: List[str]) -> List[ParseResult]:
+        """
+        parse() for several texts: each is answered from the cache or the
+        rules, and the ones the rules are unsure of go through one
+        nlp.pipe call together.
+        """
+        today = date.today()
+        results: List[Optional[ParseResult]] = [None] * len(texts)
+        unsure: List[Tuple[int, _Reading, float]] = []
+
+        for i, text in enumerate(texts):
+            started = time.perf_counter()
+            try:
+                original_text = _normalize(text)
+            except ValueError as exc:
+                results[i] = ParseResult(text, error=exc)
+                continue
+
+            entry = self._cache.get(original_text) if self._cache is not None else None
+            if entry is not None:
+                tx = self._from_cache(entry, original_text.lower(), today)
+                results[i] = ParseResult(text, transaction=tx)
+                self._stats.record("cache", time.perf_counter() - started)
+                continue
+
+            reading = self._read(original_text, today)
+            if reading.confidence < self.escalation_threshold:
+                unsure.append((i, reading, time.perf_counter() - started))
+                continue
+            results[i] = self._finish(text, reading, "rules")
+            self._stats.record("rules", time.perf_counter() - started)
+
+        if unsure:
+            started = time.perf_counter()
+            tier = "rules"
+            if self._ner_ready():
+                self._read_entities([reading for _, reading, _ in unsure])
+                tier = "ner"
+            share = (time.perf_counter() - started) / len(unsure)
+            for i, reading, elapsed in unsure:
+                started = time.perf_counter()
+                results[i] = self._finish(texts[i], reading, tier)
+                self._stats.record(tier, elapsed + share + time.perf_counter() - started)
+
+        return results
+
+    def _read(self, original_text: str, today: date) -> _Reading:
+        """The rules' reading of a normalized text."""
+        text = original_text.lower()
+        hits = KEYWORD_MATCHER.find(text)
+
+        amount, amount_confidence = self._extract_amount(text)
+        trans_type = self._detect_transaction_type(hits)
+        type_confidence = 1.0 if any(hit.label("type") for hit in hits) else 0.7
+
+        tx_date, days_back = self._extract_date(text, today)
+        date_confidence = 1.0
+        if tx_date is None:
+            # Nothing found: today, unless the text has a date we missed
+            tx_date, days_back = today, 0
+            date_confidence = 0.3 if DATE_HINT_REGEX.search(text) else 0.9
+
+        return _Reading(
+            original_text=original_text,
+            today=today,
+            hits=hits,
             amount=amount,
-            description=description,
-            category=category,
+            amount_confidence=amount_confidence,
+            trans_type=trans_type,
+            type_confidence=type_confidence,
             transaction_date=tx_date,
+            days_back=days_back,
+            date_confidence=date_confidence,
         )
 
-    # ---------- Internal helpers ----------
-
-    def _extract_amount(self, text: str) -> float:
+    def _ner_ready(self) -> bool:
+        if self._ner_error is not None:
+            return False
+        try:
+            self.nlp
+        except (ImportError, RuntimeError) as exc:
+            # No spaCy or no model: keep answering from the rules alone
+            self._ner_error = exc
+            return False
+        return True
+
+    def _read_entities(self, readings: List[_Reading]) -> None:
+        """
+        Replace the parts of each reading the rules were unsure of with
+        spaCy's MONEY and DATE entities, and take the first ORG as the
+        merchant. Only the entity recognizer runs. Entities are read with
+        what the rules cannot: amounts in words (nlp/numbers.py) and
+        weekdays relative to today (dates.parse_weekday).
         """
-        Extract the amount from text.
+        nlp = self.nlp
+        disable = [name for name in nlp.pipe_names if name not in ("tok2vec", "ner")]
+        docs = nlp.pipe(
+            (reading.original_text for reading in readings),
+            batch_size=NER_BATCH_SIZE,
+            disable=disable,
+        )
+        for reading, doc in zip(readings, docs):
+            for ent in doc.ents:
+                if ent.label_ == "MONEY" and reading.amount_confidence < 1.0:
+                    amount = parse_amount_words(ent.text)
+                    if amount is None:
+                        # Digits next to words it does not know ("200 dollars")
+                        m = AMOUNT_REGEXES[-1].search(ent.text)
+                        amount = float(m.group(1).replace(",", "")) if m else None
+                    if amount is not None:
+                        reading.amount = amount
+                        reading.amount_confidence = 1.0
+                elif ent.label_ == "DATE" and reading.date_confidence < 1.0:
+                    ent_text = ent.text.lower()
+                    dt = (
+                        parse_date(ent_text, 0, reading.today)
+                        or parse_weekday(ent_text, reading.today)
+                        or _dateutil_date(ent_text)
+                    )
+                    if dt is not None:
+                        reading.transaction_date = dt
+                        reading.days_back = None
+                        reading.date_confidence = 1.0
+                        reading.date_from_entities = True
+                elif ent.label_ == "ORG" and reading.merchant is None:
+                    reading.merchant = ent.text
+
+    def _finish(self, text: str, reading: _Reading, tier: str) -> ParseResult:
+        """Description and category for a reading, as the result for `text`."""
+        if reading.amount is None:
+            return ParseResult(text, error=ValueError("Could not detect any amount in the text"))
+        description, kept = self._extract_description(
+            reading.original_text, reading.amount, reading.hits
+        )
+        result = ParsedTransaction(
+            trans_type=reading.trans_type,
+            amount=reading.amount,
+            description=description,
+            category=self._detect_category(kept),
+            transaction_date=reading.transaction_date,
+            merchant=reading.merchant,
+            confidence=reading.confidence,
+            tier=tier,
+        )
+        # A date spaCy found may be relative to today ("last friday") and
+        # the rules cannot re-resolve it on a later day, so it is not kept.
+        if self._cache is not None and not reading.date_from_entities:
+            entry = CacheEntry(replace(result), reading.days_back, reading.today)
+            self._cache.put(reading.original_text, entry)
+        return ParseResult(text, transaction=result)
+
+    def _from_cache(self, entry: CacheEntry, text: str, today: date) -> ParsedTransaction:
+        # Everything but the date only depends on the text. A date derived
+        # from the day of parsing moves along with it; a date written in the
+        # text can still depend on it (a missing year), so it is worked out
+        # again, which is cheap next to a full parse.
+        if entry.computed_on != today:
+            if entry.days_back is not None:
+                tx_date = today - timedelta(days=entry.days_back)
+            else:
+                tx_date = self._extract_date(text, today)[0] or today
+            entry.result = replace(entry.result, transaction_date=tx_date)
+            entry.computed_on = today
+        return replace(entry.result)
+
+    def _extract_amount(self, text: str) -> Tuple[Optional[float], float]:
+        """
+        Extract the amount from text, with the rules' confidence in it
+        (see _Reading); (None, 0.0) when there is none.
 
         Supports:
         - Normal patterns via AMOUNT_REGEXES (₹500, 5,000, 50 rupees, etc.)
@@ -92,26 +428,24 @@ class NLPParser:
           "got 3 books for 150 each"   -> 450
         """
 
+        # If "each" is present, we try the multiplicative pattern first and
+        # avoid the very generic standalone-number pattern (last in
+        # AMOUNT_REGEXES) so we don't pick just "2" in "2 shirts of 300 each".
+        has_each = "each" in text
+
         # 1) Try "quantity ... of/for ... each" style, e.g. "2 shirts of 300 each"
-        mult_match = re.search(
-            r"(\d+(?:\.\d+)?)\s+\w+(?:\s+\w+)*?\s+(?:of|for)\s+(\d+(?:,\d+)*(?:\.\d+)?)\s+each",
-            text,
-        )
+        mult_match = MULTIPLY_REGEX.search(text) if has_each else None
         if mult_match:
             qty_str, price_str = mult_match.groups()
             try:
                 qty = float(qty_str)
                 price = float(price_str.replace(",", ""))
-                return qty * price
+                return qty * price, 1.0
             except ValueError:
                 # If anything goes wrong, fall back to normal patterns
                 pass
 
         # 2) Fallback to predefined amount regexes
-        # If "each" is present, we try to avoid the very generic standalone-number
-        # pattern (last in AMOUNT_REGEXES) so we don't pick just "2" in "2 shirts of 300 each".
-        has_each = "each" in text
-
         for idx, regex in enumerate(AMOUNT_REGEXES):
             # Skip plain-number pattern when "each" is in text and this is the last pattern
             if has_each and idx == len(AMOUNT_REGEXES) - 1:
@@ -123,89 +457,108 @@ class NLPParser:
                 # Remove commas like "5,000"
                 number_str = number_str.replace(",", "")
                 try:
-                    return float(number_str)
+                    amount = float(number_str)
                 except ValueError:
                     continue
+                if idx < len(AMOUNT_REGEXES) - 1:
+                    return amount, 1.0
+                # A plain number: a guess if the text has others
+                candidates = CANDIDATE_NUMBER_REGEX.finditer(text)
+                return amount, 0.8 if next(islice(candidates, 1, None), None) is None else 0.4
 
-        raise ValueError("Could not detect any amount in the text")
+        return None, 0.0
 
-    def _detect_transaction_type(self, text: str) -> TransactionType:
+    def _detect_transaction_type(self, hits: List[KeywordHit]) -> TransactionType:
         """
         Decide if it's income or expense based on keywords.
-        Default: 'expense' if ambiguous.
+        Any income keyword wins; default: 'expense' if ambiguous.
         """
-        for kw in INCOME_KEYWORDS:
-            if kw in text:
-                return "income"
-
-        for kw in EXPENSE_KEYWORDS:
-            if kw in text:
-                return "expense"
-
-        # If no keyword matched, default to expense
+        if any(hit.label("type") == "income" for hit in hits):
+            return "income"
         return "expense"
 
-    def _extract_date(self, text: str) -> date:
+    def _extract_date(
+        self, text: str, today: date
+    ) -> Tuple[Optional[date], Optional[int]]:
         """
         Extract a date from the text.
         Supported examples:
         - "today", "yesterday"
         - "on 5 dec", "on 05/12/2024", "on 2024-12-05"
         - "2 days ago"
-        If nothing is found, returns today's date.
+        If nothing is found, returns (None, None).
+        Also returns how many days before `today` the date is when it was
+        derived from `today` alone (None for a date written in the text),
+        so cached results can be moved to a later day.
         """
-        today = date.today()
-
         # Relative keywords
         if "today" in text:
-            return today
+            return today, 0
         if "yesterday" in text:
-            return today - timedelta(days=1)
+            return today - timedelta(days=1), 1
 
         # "X days ago"
-        m = re.search(r"(\d+)\s+days?\s+ago", text)
+        m = DAYS_AGO_REGEX.search(text)
         if m:
             days = int(m.group(1))
-            return today - timedelta(days=days)
-
-        # Look for "on <date expression>"
-        m = re.search(r"on\s+(.+)", text)
-        if m:
-            date_part = m.group(1)
-            # Try to stop at " for " or " rupees " etc
-            date_part = re.split(r"\bfor\b|\brupees?\b|\brs\.?\b", date_part)[0].strip()
             try:
-                dt = date_parser.parse(date_part, dayfirst=True).date()
-                return dt
-            except (ValueError, OverflowError):
+                return today - timedelta(days=days), days
+            except OverflowError:
                 pass
 
-        # If nothing else worked, use today's date
-        return today
-
-    def _detect_category(self, text: str) -> Optional[str]:
+        # "on <date expression>": common formats are parsed by hand (see
+        # nlp/dates.py), trying every "on" in the text
+        starts = [m.end() for m in ON_DATE_REGEX.finditer(text)]
+        for start in starts:
+            dt = parse_date(text, start, today)
+            if dt is not None:
+                return dt, None
+
+        # Last resort: dateutil on a short first "on" phrase.
+        # Try to stop at " for " or " rupees " etc
+        if starts:
+            window = text[starts[0]:starts[0] + 2 * MAX_DATE_TEXT_LENGTH]
+            dt = _dateutil_date(DATE_END_REGEX.split(window, 1)[0].strip())
+            if dt is not None:
+                return dt, None
+
+        return None, None
+
+    def _detect_category(self, hits: List[KeywordHit]) -> Optional[str]:
         """
         Very simple rule-based category detection using CATEGORY_KEYWORDS.
+        Categories are tried in the order they are listed there.
         """
-        lowered = text.lower()
-        for cat, keywords in CATEGORY_KEYWORDS.items():
-            for kw in keywords:
-                if kw in lowered:
-                    return cat
+        found = {hit.label("category") for hit in hits}
+        for cat in CATEGORY_ORDER:
+            if cat in found:
+                return cat
         return None
 
     def _extract_description(
         self,
         original_text: str,
         amount: float,
-        tx_date: date,
-        trans_type: TransactionType,
-    ) -> str:
+        hits: List[KeywordHit],
+    ) -> Tuple[str, List[KeywordHit]]:
         """
         Derive a simple description by removing amounts, currency words,
         and obvious keywords. This is a heuristic, not perfect.
+        Also returns the keyword hits left in the description (all of them
+        when it falls back to the original text).
         """
-        text = original_text.lower()
+        lowered = original_text.lower()
+
+        # Remove transaction keywords (hits are positions in `lowered`)
+        parts, kept, pos = [], [], 0
+        for hit in hits:
+            if hit.label("type"):
+                parts.append(lowered[pos:hit.start])
+                pos = hit.end
+            else:
+                kept.append(hit)
+        parts.append(lowered[pos:])
+        text = " ".join(parts)
 
         # Remove numbers related to amount
         amount_str = str(int(amount)) if amount.is_integer() else str(amount)
@@ -215,10 +568,6 @@ class NLPParser:
         for token in ["rupees", "rupee", "rs.", "rs", "₹", "each"]:
             text = text.replace(token, " ")
 
-        # Remove transaction keywords
-        for kw in INCOME_KEYWORDS + EXPENSE_KEYWORDS:
-            text = text.replace(kw, " ")
-
         # Remove relative date words
         for t in ["today", "yesterday", "ago"]:
             text = text.replace(t, " ")
@@ -231,6 +580,67 @@ class NLPParser:
 
         # If after cleanup nothing remains, fallback to original text
         if not text:
-            return original_text.strip()
+            return original_text.strip(), hits
+
+        return text, kept
+
+
+def _normalize(text: str) -> str:
+    if not text or not text.strip():
+        raise ValueError("Input text is empty")
+    if len(text) > MAX_TEXT_LENGTH:
+        raise ValueError(f"Input text is longer than {MAX_TEXT_LENGTH} characters")
+    # Results only depend on the text up to whitespace, so that is what
+    # gets parsed and what the cache is keyed on.
+    return " ".join(text.split())
+
+
+def _dateutil_date(date_part: str) -> Optional[date]:
+    """dateutil's reading of a short date phrase, or None."""
+    if not date_part or len(date_part) > MAX_DATE_TEXT_LENGTH:
+        return None
+    from dateutil import parser as date_parser
+
+    try:
+        return date_parser.parse(date_part, dayfirst=True).date()
+    except (ValueError, OverflowError):
+        return None
+
+
+@lru_cache(maxsize=None)
+def _load_spacy(model_name: str) -> "Language":
+    # Importing spaCy alone takes about a second; the model adds a few
+    # hundred MB, so neither happens until a caller needs the pipeline.
+    import spacy
+
+    try:
+        return spacy.load(model_name)
+    except OSError as exc:
+        raise RuntimeError(
+            f"spaCy model '{model_name}' is not installed. "
+            f"Run: python -m spacy download {model_name}"
+        ) from exc
+
+
+# ---------- parse_many worker processes ----------
+
+_worker_parser: Optional[NLPParser] = None
+
+
+def _init_worker(model_name: str, cache_size: int, escalation_threshold: float) -> None:
+    global _worker_parser
+    _worker_parser = NLPParser(model_name, cache_size, escalation_threshold)
+
+
+def _parse_chunk(texts: List[str]) -> List[ParseResult]:
+    return _worker_parser._parse_batch(texts)
+
 
-        return text
+def _chunks(head: List[str], rest: Iterator[str], size: int) -> Iterator[List[str]]:
+    for i in range(0, len(head), size):
+        yield head[i:i + size]
+    while True:
+        chunk = list(islice(rest, size))
+        if not chunk:
+            return
+        yield chunk
@@ -4,19 +4,55 @@ Regex patterns and keyword lists used by the NLP parser.
 
 import re
 
+from .keywords import KeywordMatcher
+
 # ---------- Amount detection patterns ----------
 
+# A number only starts where the previous character is not part of one.
+# Without the lookbehind a failed match is retried from every digit of a
+# long digit run, which is quadratic in the input length.
+NUMBER = r"(?<![\d,])(\d+(?:,\d+)*(?:\.\d+)?)"
+
 AMOUNT_PATTERNS = [
-    r"₹\s*(\d+(?:,\d+)*(?:\.\d+)?)",           # ₹500 or ₹5,000
-    r"rs\.?\s*(\d+(?:,\d+)*(?:\.\d+)?)",       # Rs 500 or Rs. 5,000
-    r"(\d+(?:,\d+)*(?:\.\d+)?)\s*rupees?",     # 500 rupees
-    r"(\d+(?:,\d+)*(?:\.\d+)?)\s*rs\.?",       # 500 rs
-    r"\b(\d+(?:,\d+)*(?:\.\d+)?)\b",           # plain number (fallback)
+    r"₹\s*" + NUMBER,                 # ₹500 or ₹5,000
+    r"rs\.?\s*" + NUMBER,             # Rs 500 or Rs. 5,000
+    NUMBER + r"\s*rupees?",           # 500 rupees
+    NUMBER + r"\s*rs\.?",             # 500 rs
+    r"\b" + NUMBER + r"\b",           # plain number (fallback)
 ]
 
 # Pre-compiled regex objects for speed
 AMOUNT_REGEXES = [re.compile(pat, re.IGNORECASE) for pat in AMOUNT_PATTERNS]
 
+# Numbers that could be the amount when only the plain-number pattern
+# matched: not part of a date (5/12, 2024-12-05, 5 dec), an id (xx1234)
+# or "3 days ago". More than one of them makes the amount a guess.
+_MONTH_NAME = r"(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\b"
+CANDIDATE_NUMBER_REGEX = re.compile(
+    r"(?<![\w/.,-])\d+(?:,\d+)*(?:\.\d+)?(?![\w/-]|\.\d|[ \t]+(?:days?\b|" + _MONTH_NAME + r"))"
+)
+
+# "2 shirts of 300 each", "3 books for 150 each": at most 5 words between
+# the quantity and "of"/"for", so each attempt only looks a few words ahead.
+MULTIPLY_REGEX = re.compile(
+    r"(?<![\d,.])(\d+(?:\.\d+)?)(?:\s+\w+){1,5}?\s+(?:of|for)\s+" + NUMBER + r"\s+each"
+)
+
+# ---------- Date patterns ----------
+
+DAYS_AGO_REGEX = re.compile(r"(?<!\d)(\d+)\s+days?\s+ago")
+ON_DATE_REGEX = re.compile(r"\bon\s+")
+# Where an "on <date>" phrase ends before it is handed to dateutil
+DATE_END_REGEX = re.compile(r"\bfor\b|\brupees?\b|\brs\.?\b")
+
+# Words that say the text has a date. When none of the rules above found
+# one, the parser is unsure of its default (today).
+DATE_HINT_REGEX = re.compile(
+    r"\b(?:last|next|tomorrow|week|month|(?:mon|tues|wednes|thurs|fri|satur|sun)day|"
+    + _MONTH_NAME
+    + r")"
+)
+
 # ---------- Transaction type keywords ----------
 
 INCOME_KEYWORDS = [
@@ -57,3 +93,14 @@ CATEGORY_KEYWORDS = {
     "Entertainment": ["movie", "netflix", "prime", "spotify", "game", "games"],
     "Income": ["salary", "stipend", "allowance", "bonus", "refund", "interest"],
 }
+
+# ---------- Compiled keyword matcher ----------
+
+# Every keyword list above in one single-pass matcher (see nlp/keywords.py).
+KEYWORD_MATCHER = KeywordMatcher(
+    [
+        ("type", "income", INCOME_KEYWORDS),
+        ("type", "expense", EXPENSE_KEYWORDS),
+        *(("category", cat, keywords) for cat, keywords in CATEGORY_KEYWORDS.items()),
+    ]
+)
@@ -0,0 +1,410 @@
+"""
+Shared parser service: one process parses for every app process.
+
+Each Streamlit server process otherwise builds its own NLPParser, and
+with escalation (see NLPParser) its own copy of the spaCy model, so
+memory grows with the number of processes. Instead, run one service:
+
+    python -m nlp.service --socket data/parser.sock
+
+and set PARSER_SOCKET in config.py; utils/resources.get_parser() then
+hands out a ParserClient, which has the same parse()/parse_many() as
+NLPParser.
+
+- The service listens on a Unix socket. A request is one line of JSON,
+  {"texts": [...]}, and the reply one line, {"results": [...]}, in the
+  same order. A connection can carry any number of requests.
+- Requests from all clients go on one queue. A background thread takes
+  them off in batches of up to `max_batch` texts and parses each batch
+  with one NLPParser._parse_batch call, so texts escalated to spaCy
+  from different clients share an nlp.pipe call. As with the group
+  commit queue (database/write_queue.py), a batch also closes
+  `max_delay_ms` after its first request, and requests that arrive
+  while a batch is being parsed form the next one.
+- ParserClient falls back to an in-process NLPParser, built on first
+  use, while the service is unreachable, and tries the service again
+  after `retry_after` seconds.
+"""
+
+import argparse
+import json
+import os
+import queue
+import socket
+import socketserver
+import sys
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import asdict
+from datetime import date
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .parser import NER_BATCH_SIZE, NLPParser, ParsedTransaction, ParseResult
+
+
+# Upper bounds on one batch: number of texts, and how long the first
+# request of a batch may wait for others to join it.
+SERVICE_MAX_BATCH = NER_BATCH_SIZE
+SERVICE_MAX_DELAY_MS = 2.0
+
+# Texts per request when a client sends a parse_many batch.
+CLIENT_CHUNK_SIZE = 1_000
+# Seconds a client waits for a reply (the first escalation on the
+# service may still be loading spaCy), and before it retries the service
+# after failing to reach it.
+CLIENT_TIMEOUT = 10.0
+CLIENT_RETRY_AFTER = 5.0
+
+# Longest request line the service reads (CLIENT_CHUNK_SIZE texts of
+# MAX_TEXT_LENGTH characters fit with room to spare).
+MAX_REQUEST_BYTES = 16 * 1024 * 1024
+
+_STOP = object()
+
+Request = Tuple[List[str], "Future[List[ParseResult]]"]
+
+
+# ---------- Wire format ----------
+
+def _encode(result: ParseResult) -> Dict[str, Any]:
+    if result.error is not None:
+        return {"error": str(result.error), "type": type(result.error).__name__}
+    tx = asdict(result.transaction)
+    tx["transaction_date"] = tx["transaction_date"].isoformat()
+    return {"transaction": tx}
+
+
+def _decode(text: str, item: Dict[str, Any]) -> ParseResult:
+    if "error" in item:
+        # parse() only raises ValueError for bad input; anything else is
+        # a failure on the service.
+        if item["type"] == "ValueError":
+            return ParseResult(text, error=ValueError(item["error"]))
+        return ParseResult(text, error=RuntimeError(f"{item['type']}: {item['error']}"))
+    tx = dict(item["transaction"])
+    tx["transaction_date"] = date.fromisoformat(tx["transaction_date"])
+    return ParseResult(text, transaction=ParsedTransaction(**tx))
+
+
+# ---------- Service ----------
+
+class ParserService:
+    """
+    Serves one NLPParser to clients on a Unix socket, parsing the texts of
+    concurrent requests in shared batches on one background thread.
+    """
+
+    def __init__(
+        self,
+        parser: NLPParser,
+        socket_path: str,
+        max_batch: int = SERVICE_MAX_BATCH,
+        max_delay_ms: float = SERVICE_MAX_DELAY_MS,
+    ) -> None:
+        if max_batch < 1:
+            raise ValueError("max_batch must be at least 1")
+
+        self.parser = parser
+        self.socket_path = socket_path
+        self.max_batch = max_batch
+        self.max_delay_ms = max_delay_ms
+
+        # Counters for benchmarks and tests.
+        self.parsed_batches = 0
+        self.parsed_texts = 0
+
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._submit_lock = threading.Lock()
+        self._closed = False
+        self._batcher = threading.Thread(
+            target=self._run, name="parser-service-batcher", daemon=True
+        )
+        self._serving: Optional[threading.Thread] = None
+
+        _remove_stale_socket(socket_path)
+        self._server = _Server(socket_path, _Handler)
+        self._server.service = self
+        self._batcher.start()
+
+    # ---------- Public API ----------
+
+    def submit(self, texts: List[str]) -> "Future[List[ParseResult]]":
+        """Queue texts for the next batch; the Future gets their results."""
+        future: "Future[List[ParseResult]]" = Future()
+        with self._submit_lock:
+            if self._closed:
+                raise RuntimeError("Parser service is closed")
+            self._queue.put((texts, future))
+        return future
+
+    def serve_forever(self) -> None:
+        """Handle clients on this thread until close() is called."""
+        self._server.serve_forever()
+
+    def start(self) -> "ParserService":
+        """Handle clients on a background thread."""
+        self._serving = threading.Thread(
+            target=self.serve_forever, name="parser-service", daemon=True
+        )
+        self._serving.start()
+        return self
+
+    def close(self) -> None:
+        """Stop accepting clients, finish queued requests and remove the socket."""
+        if self._serving is not None:
+            self._server.shutdown()
+            self._serving.join()
+        self._server.server_close()
+        with self._submit_lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(_STOP)
+        self._batcher.join()
+        try:
+            os.unlink(self.socket_path)
+        except FileNotFoundError:
+            pass
+
+    # ---------- Background thread ----------
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            size = len(item[0])
+            deadline = time.monotonic() + self.max_delay_ms / 1000.0
+            while size < self.max_batch:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+                size += len(item[0])
+            self._parse(batch)
+
+    def _parse(self, batch: List[Request]) -> None:
+        texts = [text for request_texts, _ in batch for text in request_texts]
+        try:
+            results = self.parser._parse_batch(texts)
+        except Exception as exc:
+            for _, future in batch:
+                future.set_exception(exc)
+            return
+
+        self.parsed_batches += 1
+        self.parsed_texts += len(texts)
+        start = 0
+        for request_texts, future in batch:
+            future.set_result(results[start:start + len(request_texts)])
+            start += len(request_texts)
+
+
+class _Server(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+    # A Unix socket refuses connects outright once the backlog is full
+    # (socketserver's default is 5), e.g. when many app threads connect
+    # at once after a restart.
+    request_queue_size = 128
+    service: ParserService
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    server: _Server
+
+    def handle(self) -> None:
+        while True:
+            line = self.rfile.readline(MAX_REQUEST_BYTES)
+            if not line.endswith(b"\n"):
+                # Closed by the client, or a request over MAX_REQUEST_BYTES
+                return
+            try:
+                texts = json.loads(line)["texts"]
+                if not isinstance(texts, list) or not all(isinstance(t, str) for t in texts):
+                    raise TypeError
+            except (ValueError, KeyError, TypeError):
+                reply: Dict[str, Any] = {"error": "expected {\"texts\": [str, ...]}"}
+            else:
+                try:
+                    future = self.server.service.submit(texts)
+                except RuntimeError:
+                    return  # closing; the client falls back
+                try:
+                    reply = {"results": [_encode(r) for r in future.result()]}
+                except Exception as exc:
+                    reply = {"error": f"{type(exc).__name__}: {exc}"}
+            self.wfile.write(json.dumps(reply).encode("utf-8") + b"\n")
+
+
+def _remove_stale_socket(path: str) -> None:
+    # A socket file left by a service that died would make bind() fail.
+    # One that still accepts connections belongs to a running service.
+    if not os.path.exists(path):
+        return
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except OSError:
+        os.unlink(path)
+    else:
+        raise RuntimeError(f"A parser service is already listening on {path}")
+    finally:
+        probe.close()
+
+
+# ---------- Client ----------
+
+class ParserClient:
+    """
+    parse()/parse_many() through a ParserService, or an in-process parser
+    while the service is unreachable. Safe to share between threads: each
+    thread keeps its own connection.
+    """
+
+    def __init__(
+        self,
+        socket_path: str,
+        fallback: Callable[[], NLPParser] = NLPParser,
+        timeout: float = CLIENT_TIMEOUT,
+        retry_after: float = CLIENT_RETRY_AFTER,
+    ) -> None:
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self._fallback = fallback
+        self._local_parser: Optional[NLPParser] = None
+        self._local_lock = threading.Lock()
+        self._connections = threading.local()
+        self._down_until = 0.0
+
+    def parse(self, text: str) -> ParsedTransaction:
+        results = self._request([text])
+        if results is None:
+            return self._local().parse(text)
+        result = results[0]
+        if result.error is not None:
+            raise result.error
+        return result.transaction
+
+    def parse_many(self, texts: Iterable[str], **kwargs: Any) -> Iterator[ParseResult]:
+        """
+        Like NLPParser.parse_many, in requests of CLIENT_CHUNK_SIZE texts.
+        kwargs (workers, chunk_size) only apply to the fallback parser.
+        """
+        it = iter(texts)
+        while True:
+            chunk = list(islice(it, CLIENT_CHUNK_SIZE))
+            if not chunk:
+                return
+            results = self._request(chunk)
+            if results is None:
+                results = self._local().parse_many(chunk, **kwargs)
+            yield from results
+
+    @property
+    def using_fallback(self) -> bool:
+        """Whether the service was unreachable on the last attempt."""
+        return time.monotonic() < self._down_until
+
+    def close(self) -> None:
+        """Close this thread's connection."""
+        self._disconnect()
+
+    # ---------- Internal helpers ----------
+
+    def _request(self, texts: List[str]) -> Optional[List[ParseResult]]:
+        """The service's results for texts, or None if it cannot be reached."""
+        if self.using_fallback:
+            return None
+        payload = json.dumps({"texts": texts}).encode("utf-8") + b"\n"
+        try:
+            sock, rfile = self._connection()
+            sock.sendall(payload)
+            line = rfile.readline()
+            if not line:
+                raise ConnectionResetError("parser service closed the connection")
+        except OSError:
+            self._disconnect()
+            self._down_until = time.monotonic() + self.retry_after
+            return None
+        reply = json.loads(line)
+        if "error" in reply:
+            raise RuntimeError(f"parser service: {reply['error']}")
+        return [_decode(text, item) for text, item in zip(texts, reply["results"])]
+
+    def _connection(self) -> Tuple[socket.socket, Any]:
+        conn = getattr(self._connections, "conn", None)
+        if conn is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            try:
+                sock.connect(self.socket_path)
+            except OSError:
+                sock.close()
+                raise
+            conn = self._connections.conn = (sock, sock.makefile("rb"))
+        return conn
+
+    def _disconnect(self) -> None:
+        conn = getattr(self._connections, "conn", None)
+        if conn is not None:
+            self._connections.conn = None
+            conn[1].close()
+            conn[0].close()
+
+    def _local(self) -> NLPParser:
+        with self._local_lock:
+            if self._local_parser is None:
+                self._local_parser = self._fallback()
+            return self._local_parser
+
+
+# ---------- Command line ----------
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from config import (
+        PARSER_CACHE_SIZE,
+        PARSER_ESCALATION_THRESHOLD,
+        PARSER_SERVICE_MAX_BATCH,
+        PARSER_SERVICE_MAX_DELAY_MS,
+        PARSER_SOCKET,
+    )
+
+    ap = argparse.ArgumentParser(description="Shared NLP parser service.")
+    ap.add_argument("--socket", default=PARSER_SOCKET, required=PARSER_SOCKET is None)
+    ap.add_argument("--max-batch", type=int, default=PARSER_SERVICE_MAX_BATCH)
+    ap.add_argument("--max-delay-ms", type=float, default=PARSER_SERVICE_MAX_DELAY_MS)
+    args = ap.parse_args(argv)
+
+    parser = NLPParser(
+        cache_size=PARSER_CACHE_SIZE,
+        escalation_threshold=PARSER_ESCALATION_THRESHOLD,
+    )
+    # Load the model now rather than on the first unsure text.
+    if parser.escalation_threshold > 0:
+        try:
+            parser.nlp
+        except (ImportError, RuntimeError) as exc:
+            print(f"spaCy unavailable, parsing with the rules only: {exc}")
+
+    service = ParserService(parser, args.socket, args.max_batch, args.max_delay_ms)
+    print(f"Parser service listening on {args.socket}")
+    try:
+        service.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+"""
+Per-tier counters and latencies for NLPParser.
+
+Every text parse() or parse_many() handles is answered by one tier:
+
+- "cache": a recent result (nlp/cache.py),
+- "rules": the regex/keyword rules alone,
+- "ner":   the rules, then spaCy entities because the rules were unsure.
+
+The latency recorded for a text is its whole cost, so "ner" includes the
+rules that ran first plus its share of the batched spaCy call. Only the
+most recent LATENCY_SAMPLES latencies per tier are kept for percentiles;
+the counts cover the parser's lifetime (or since clear()).
+"""
+
+import threading
+from collections import deque
+from typing import Deque, Dict, NamedTuple
+
+
+LATENCY_SAMPLES = 2_048
+
+TIERS = ("cache", "rules", "ner")
+
+
+class TierInfo(NamedTuple):
+    count: int
+    p50_ms: float
+    p95_ms: float
+
+
+class ParserStats(NamedTuple):
+    parsed: int
+    escalated: int
+    # Share of texts not answered from the cache that went to spaCy.
+    escalation_rate: float
+    tiers: Dict[str, TierInfo]
+
+
+class TierStats:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counts: Dict[str, int] = {}
+        self._samples: Dict[str, Deque[float]] = {}
+        self.clear()
+
+    def record(self, tier: str, seconds: float) -> None:
+        with self._lock:
+            self._counts[tier] += 1
+            self._samples[tier].append(seconds)
+
+    def snapshot(self) -> ParserStats:
+        with self._lock:
+            tiers = {
+                tier: TierInfo(
+                    self._counts[tier],
+                    _percentile(self._samples[tier], 0.50),
+                    _percentile(self._samples[tier], 0.95),
+                )
+                for tier in TIERS
+            }
+        parsed = sum(info.count for info in tiers.values())
+        escalated = tiers["ner"].count
+        computed = parsed - tiers["cache"].count
+        return ParserStats(
+            parsed, escalated, escalated / computed if computed else 0.0, tiers
+        )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._counts = {tier: 0 for tier in TIERS}
+            self._samples = {tier: deque(maxlen=LATENCY_SAMPLES) for tier in TIERS}
+
+
+def _percentile(samples: Deque[float], q: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return 1000 * ordered[min(len(ordered) - 1, int(q * len(ordered)))]
@@ -0,0 +1,21 @@
+"""
+Fixtures shared by the test modules.
+"""
+
+import pytest
+
+from database.db_manager import DatabaseManager
+
+
+@pytest.fixture
+def db_options():
+    """Extra DatabaseManager arguments for `db`; a module overrides this to change them."""
+    return {}
+
+
+@pytest.fixture
+def db(tmp_path, db_options):
+    """A DatabaseManager on a fresh database file, closed after the test."""
+    manager = DatabaseManager(db_path=str(tmp_path / "test.db"), **db_options)
+    yield manager
+    manager.close()
@@ -0,0 +1,225 @@
+"""
+Tests for archiving closed years into attached partition files.
+"""
+
+import os
+import random
+import sqlite3
+from datetime import date, timedelta
+
+import pytest
+
+from database.archive import archivable_years, archive_year, list_partitions, partition_path
+from database import db_manager
+
+
+def seed(db, rows=900, seed_value=3):
+    """Transactions from 2010 to 2024, more years than SQLite can attach at once."""
+    rnd = random.Random(seed_value)
+    user_id = db.create_user("archive", "x")
+    accounts = [db.add_account(user_id, "A"), db.add_account(user_id, "B")]
+    first_day = date(2010, 1, 1)
+    db.add_transactions_bulk(
+        (
+            rnd.choice(accounts),
+            rnd.choice(["income", "expense"]),
+            rnd.randint(1, 500),
+            f"row {i}",
+            rnd.choice(["Groceries", "Rent", ""]),
+            (first_day + timedelta(days=rnd.randrange(15 * 365))).isoformat(),
+        )
+        for i in range(rows)
+    )
+    return accounts
+
+
+def snapshot(db, account_id):
+    return (
+        db.get_transactions(account_id),
+        db.get_transactions(account_id, "2012-03-01", "2021-02-15", trans_type="expense"),
+        db.get_account_summary(account_id),
+        db.get_account_summary(account_id, "2014-06-15", "2023-01-31"),
+        db.get_period_totals(account_id, "2011-01-01", "2020-12-31"),
+        db.get_period_totals(account_id, "2011-01-15", "2020-12-10"),
+        db.get_period_totals(account_id, "2016-12-20", "2017-01-10", granularity="day"),
+        list(db.iter_transactions(account_id, chunk_size=70)),
+        db.get_transactions_page(account_id, "2013-01-01", "2019-06-30", limit=25),
+        sorted(
+            db.get_category_totals(account_id, "2012-03-01", "2021-02-15"),
+            key=lambda r: r["category_id"] or 0,
+        ),
+        db.get_accounts_overview(db.get_user_by_username("archive")["id"], "2011-05-01", "2023-06-30"),
+        db.get_accounts_overview(db.get_user_by_username("archive")["id"]),
+    )
+
+
+def hot_row_count(db):
+    with db.pool.reader() as conn:
+        return conn.execute("SELECT COUNT(*) FROM transactions").fetchone()[0]
+
+
+def test_archiving_keeps_every_read_the_same(db):
+    accounts = seed(db)
+    before = {a: snapshot(db, a) for a in accounts}
+    total = hot_row_count(db)
+
+    years = archivable_years(db.pool, 2023)
+    assert years == list(range(2010, 2023))
+    moved = sum(archive_year(db.pool, year) for year in years)
+
+    assert hot_row_count(db) == total - moved
+    assert moved > 0
+    assert os.path.exists(partition_path(db.pool.db_path, 2010))
+    for a in accounts:
+        assert snapshot(db, a) == before[a]
+    assert db.verify_account_balances() == []
+    assert db.verify_monthly_rollups() == []
+
+
+def test_snapshot_reads_more_partitions_than_can_be_attached(db):
+    accounts = seed(db)
+    before = {a: snapshot(db, a) for a in accounts}
+    for year in archivable_years(db.pool, 2023):
+        archive_year(db.pool, year)
+    with db.pool.reader() as conn:
+        limit = conn.getlimit(sqlite3.SQLITE_LIMIT_ATTACHED)
+        assert len(list_partitions(conn, db.pool.db_path)) > limit
+
+    with db.snapshot() as snap:
+        db.add_transaction(accounts[0], "expense", 5, "during", "", "2024-03-03")
+        for a in accounts:
+            assert snapshot(snap, a) == before[a]
+            assert snapshot(snap, a) == before[a]  # partitions still attached
+    assert db.get_account_summary(accounts[0])["transaction_count"] == (
+        before[accounts[0]][2]["transaction_count"] + 1
+    )
+
+
+def test_rebuild_includes_archived_rows(db):
+    accounts = seed(db, rows=300)
+    before = db.get_account_summary(accounts[0])
+    for year in archivable_years(db.pool, 2020):
+        archive_year(db.pool, year)
+
+    db.rebuild_account_balances()
+    db.rebuild_monthly_rollups()
+    assert db.get_account_summary(accounts[0]) == before
+    assert db.verify_account_balances() == []
+    assert db.verify_monthly_rollups() == []
+
+
+def test_only_overlapping_partitions_are_attached(db):
+    accounts = seed(db, rows=300)
+    for year in (2012, 2013, 2014):
+        archive_year(db.pool, year)
+
+    with db.pool.reader() as conn:
+        assert list_partitions(conn, db.pool.db_path, "2024-11-01", "2024-11-30") == []
+        assert [p.year for p in list_partitions(conn, db.pool.db_path, "2013-06-01", None)] == [2013, 2014]
+
+    # A query outside 2012 never opens its file.
+    path_2012 = partition_path(db.pool.db_path, 2012)
+    os.rename(path_2012, path_2012 + ".bak")
+    db.get_transactions(accounts[0], "2013-01-01", "2016-12-31")
+    db.get_account_summary(accounts[0], "2015-01-01", "2024-12-31")
+    assert not os.path.exists(path_2012)
+
+
+def test_late_rows_of_an_archived_year(db):
+    accounts = seed(db, rows=100)
+    archive_year(db.pool, 2015)
+    tx_id = db.add_transaction(accounts[0], "expense", 7, "late receipt", "", "2015-05-05")
+
+    rows = db.get_transactions(accounts[0], "2015-01-01", "2015-12-31")
+    assert tx_id in [r["id"] for r in rows]
+    assert archive_year(db.pool, 2015) == 1
+    assert db.get_transactions(accounts[0], "2015-01-01", "2015-12-31") == rows
+    assert db.verify_account_balances() == []
+
+
+def test_only_closed_years_can_be_archived(db):
+    with pytest.raises(ValueError):
+        archive_year(db.pool, 2024, today=date(2024, 6, 1))
+
+
+def test_overview_of_a_fully_archived_account(db):
+    accounts = seed(db, rows=200)
+    old = db.add_account(db.get_user_by_username("archive")["id"], "Closed")
+    db.add_transaction(old, "expense", 3, "first", "", "2012-02-01")
+    db.add_transaction(old, "income", 9, "last", "", "2013-07-09")
+    before = db.get_accounts_overview(db.get_user_by_username("archive")["id"])
+    for year in archivable_years(db.pool, 2020):
+        archive_year(db.pool, year)
+
+    overview = db.get_accounts_overview(db.get_user_by_username("archive")["id"])
+    assert overview == before
+    closed = next(a for a in overview if a["account_id"] == old)
+    assert (closed["transaction_count"], str(closed["last_activity"])) == (2, "2013-07-09")
+
+
+def test_deleting_an_account_purges_its_archive(db):
+    accounts = seed(db, rows=200)
+    for year in archivable_years(db.pool, 2020):
+        archive_year(db.pool, year)
+
+    db.delete_account(accounts[0])
+    with db.pool.reader() as conn:
+        partitions = list_partitions(conn, db.pool.db_path)
+        archived = conn.execute("SELECT SUM(row_count) FROM archive_partitions").fetchone()[0]
+    assert len(partitions) == 10
+    assert archived == len(
+        [r for r in db.get_transactions(accounts[1]) if r["transaction_date"] < date(2020, 1, 1)]
+    )
+
+
+def test_frame_includes_archived_rows(db):
+    pytest.importorskip("pandas")
+    accounts = seed(db, rows=300)
+    expected = [r["id"] for r in db.get_transactions(accounts[0])]
+    for year in archivable_years(db.pool, 2022):
+        archive_year(db.pool, year)
+
+    df = db.get_transactions_frame(accounts[0])
+    assert df["id"].tolist() == expected
+
+
+def test_archived_rows_are_read_only(db):
+    accounts = seed(db, rows=200)
+    old = db.get_transactions(accounts[0], end_date="2011-12-31")[0]
+    archive_year(db.pool, 2010)
+    archive_year(db.pool, 2011)
+
+    with pytest.raises(ValueError, match=f"Transaction {old['id']} is archived \\(2011\\)"):
+        db.update_transaction(old["id"], "expense", 1, "edit", "", "2011-05-05")
+    with pytest.raises(ValueError, match="archived"):
+        db.delete_transaction(old["id"])
+    assert db.get_transactions(accounts[0], end_date="2011-12-31")[0] == old
+
+    # Unknown ids are still ignored
+    db.delete_transaction(10 ** 9)
+    assert db.verify_account_balances() == []
+
+
+def test_deleting_an_account_is_one_transaction(db, monkeypatch):
+    accounts = seed(db)
+    for year in archivable_years(db.pool, 2023):  # more years than can be attached
+        archive_year(db.pool, year)
+    before = db.get_transactions(accounts[0])
+
+    def fail(*args):
+        raise RuntimeError("retrain failed")
+
+    monkeypatch.setattr(db_manager, "retrain_categories", fail)
+    with pytest.raises(RuntimeError):
+        db.delete_account(accounts[0])
+    assert db.get_transactions(accounts[0]) == before
+    monkeypatch.undo()
+
+    db.delete_account(accounts[0])
+    assert db.get_transactions(accounts[0]) == []
+    with db.pool.reader() as conn:
+        archived = conn.execute("SELECT SUM(row_count) FROM archive_partitions").fetchone()[0]
+    assert archived == sum(
+        1 for t in db.get_transactions(accounts[1]) if str(t["transaction_date"]) < "2023"
+    )
+    assert db.verify_account_balances() == []
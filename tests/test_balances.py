@@ -0,0 +1,105 @@
+"""
+Tests for the trigger-maintained account_balances table behind the
+undated get_account_summary.
+"""
+
+import random
+
+import pytest
+
+
+@pytest.fixture
+def accounts(db):
+    user_id = db.create_user("balances", "x")
+    return db.add_account(user_id, "Home"), db.add_account(user_id, "Work")
+
+
+def summary(db, account_id):
+    s = db.get_account_summary(account_id)
+    return (
+        round(s["total_income"], 2),
+        round(s["total_expense"], 2),
+        round(s["balance"], 2),
+        s["transaction_count"],
+    )
+
+
+def test_updates_and_deletes_move_the_totals(db, accounts):
+    home, work = accounts
+    salary = db.add_transaction(home, "income", 100, "salary", "", "2024-01-01")
+    rent = db.add_transaction(home, "expense", 40, "rent", "", "2024-01-02")
+    db.add_transaction(work, "expense", 7, "tea", "", "2024-01-02")
+    assert summary(db, home) == (100, 40, 60, 2)
+
+    # Amount only
+    db.update_transaction(rent, "expense", 55.5, "rent", "", "2024-01-02")
+    assert summary(db, home) == (100, 55.5, 44.5, 2)
+    # Expense turned into income
+    db.update_transaction(rent, "income", 25, "refund", "", "2024-01-02")
+    assert summary(db, home) == (125, 0, 125, 2)
+    # Fields the totals do not depend on
+    db.update_transaction(salary, "income", 100, "salary jan", "Income", "2023-12-31")
+    assert summary(db, home) == (125, 0, 125, 2)
+
+    db.delete_transaction(salary)
+    assert summary(db, home) == (25, 0, 25, 1)
+    db.delete_transaction(rent)
+    assert summary(db, home) == (0, 0, 0, 0)
+    db.delete_transaction(rent)  # already gone: nothing changes
+    assert summary(db, home) == (0, 0, 0, 0)
+
+    assert summary(db, work) == (0, 7, -7, 1)
+    assert db.verify_account_balances() == []
+
+
+def test_totals_follow_random_writes(db, accounts):
+    rnd = random.Random(11)
+    expected = {a: {} for a in accounts}  # account -> {id: (type, amount)}
+
+    for _ in range(400):
+        account_id = rnd.choice(accounts)
+        rows = expected[account_id]
+        action = rnd.random()
+        trans_type = rnd.choice(["income", "expense"])
+        amount = rnd.randint(1, 50_000) / 100
+        if action < 0.5 or not rows:
+            tx_id = db.add_transaction(account_id, trans_type, amount, "x", "", "2024-02-01")
+            rows[tx_id] = (trans_type, amount)
+        elif action < 0.8:
+            tx_id = rnd.choice(list(rows))
+            db.update_transaction(tx_id, trans_type, amount, "y", "", "2024-02-02")
+            rows[tx_id] = (trans_type, amount)
+        else:
+            tx_id = rnd.choice(list(rows))
+            db.delete_transaction(tx_id)
+            del rows[tx_id]
+
+    for account_id, rows in expected.items():
+        income = sum(a for t, a in rows.values() if t == "income")
+        expense = sum(a for t, a in rows.values() if t == "expense")
+        assert summary(db, account_id) == (
+            round(income, 2), round(expense, 2), round(income - expense, 2), len(rows)
+        )
+    assert db.verify_account_balances() == []
+
+
+def test_rebuild_repairs_drifted_totals(db, accounts):
+    home, work = accounts
+    db.add_transaction(home, "income", 10, "a", "", "2024-01-01")
+    with db.pool.writer() as conn:
+        conn.execute("UPDATE account_balances SET total_income = 99 WHERE account_id = ?", (home,))
+    assert [r["account_id"] for r in db.verify_account_balances()] == [home]
+    db.rebuild_account_balances()
+    assert db.verify_account_balances() == []
+    assert summary(db, home) == (10, 0, 10, 1)
+
+
+def test_deleting_an_account_drops_its_totals(db, accounts):
+    home, work = accounts
+    db.add_transaction(home, "income", 10, "a", "", "2024-01-01")
+    db.delete_account(home)
+    with db.pool.reader() as conn:
+        assert conn.execute(
+            "SELECT COUNT(*) FROM account_balances WHERE account_id = ?", (home,)
+        ).fetchone()[0] == 0
+    assert summary(db, home) == (0, 0, 0, 0)
@@ -0,0 +1,115 @@
+"""
+Tests for the normalized categories table: case-insensitive resolution on
+write, integer category filtering, and the migration of databases that
+still store the category as free text on each transaction.
+"""
+
+import sqlite3
+
+import pytest
+
+from database.db_manager import DatabaseManager
+
+
+def test_categories_are_shared_case_insensitively(db):
+    user_id = db.create_user("cats", "x")
+    account_id = db.add_account(user_id, "Home")
+    db.add_transaction(account_id, "expense", 10, "milk", "Groceries", "2024-01-01")
+    db.add_transaction(account_id, "expense", 20, "bread", "groceries ", "2024-01-02")
+    db.add_transactions_bulk(
+        [(account_id, "expense", 5, "eggs", "GROCERIES", "2024-01-03"),
+         (account_id, "expense", 7, "bus", "", "2024-01-03")]
+    )
+
+    assert [c["name"] for c in db.get_categories(user_id)] == ["Groceries"]
+    groceries = db.get_transactions(account_id, category="gRoCeRiEs")
+    assert [t["amount"] for t in groceries] == [5, 20, 10]
+    assert {t["category"] for t in groceries} == {"Groceries"}
+
+    totals = {t["category"]: t for t in db.get_category_totals(account_id)}
+    assert totals["Groceries"]["total_expense"] == 35
+    assert totals[None]["transaction_count"] == 1
+
+
+def test_categories_are_per_user(db):
+    alice = db.create_user("alice", "x")
+    bob = db.create_user("bob", "x")
+    alice_acc = db.add_account(alice, "Home")
+    bob_acc = db.add_account(bob, "Home")
+    db.add_transaction(alice_acc, "expense", 10, "milk", "Food", "2024-01-01")
+    db.add_transaction(bob_acc, "expense", 10, "milk", "food", "2024-01-01")
+
+    assert [c["name"] for c in db.get_categories(alice)] == ["Food"]
+    assert [c["name"] for c in db.get_categories(bob)] == ["food"]
+
+
+def test_update_transaction_resolves_category(db):
+    user_id = db.create_user("cats", "x")
+    account_id = db.add_account(user_id, "Home")
+    tx_id = db.add_transaction(account_id, "expense", 10, "milk", "Food", "2024-01-01")
+
+    db.update_transaction(tx_id, "expense", 10, "milk", "Groceries", "2024-01-01")
+    assert db.get_transactions(account_id)[0]["category"] == "Groceries"
+
+    db.update_transaction(tx_id, "expense", 10, "milk", "", "2024-01-01")
+    assert db.get_transactions(account_id)[0]["category"] is None
+
+
+def test_migrates_text_categories(tmp_path):
+    path = str(tmp_path / "legacy.db")
+    conn = sqlite3.connect(path)
+    conn.executescript(
+        """
+        CREATE TABLE users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT NOT NULL UNIQUE,
+            password_hash TEXT NOT NULL,
+            recovery_question TEXT,
+            recovery_answer_hash TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+        CREATE TABLE accounts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            name TEXT NOT NULL,
+            description TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE (user_id, name)
+        );
+        CREATE TABLE transactions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            account_id INTEGER NOT NULL,
+            type TEXT NOT NULL,
+            amount REAL NOT NULL,
+            description TEXT,
+            category TEXT,
+            transaction_date DATE NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+        INSERT INTO users (username, password_hash) VALUES ('a', 'x'), ('b', 'x');
+        INSERT INTO accounts (user_id, name) VALUES (1, 'Home'), (2, 'Home');
+        INSERT INTO transactions (account_id, type, amount, category, transaction_date) VALUES
+            (1, 'expense', 10, 'Groceries', '2024-01-01'),
+            (1, 'expense', 20, 'groceries', '2024-01-02'),
+            (1, 'expense', 30, '', '2024-01-03'),
+            (1, 'expense', 40, NULL, '2024-01-04'),
+            (2, 'expense', 50, 'Groceries', '2024-01-05');
+        """
+    )
+    conn.close()
+
+    db = DatabaseManager(db_path=path)
+    try:
+        assert [c["name"] for c in db.get_categories(1)] == ["Groceries"]
+        assert [c["name"] for c in db.get_categories(2)] == ["Groceries"]
+        by_amount = {t["amount"]: t["category"] for t in db.get_transactions(1)}
+        assert by_amount == {10: "Groceries", 20: "Groceries", 30: None, 40: None}
+        assert len(db.get_transactions(2, category="groceries")) == 1
+        with db.pool.reader() as conn:
+            columns = {r["name"] for r in conn.execute("PRAGMA table_info(transactions)")}
+        assert "category" not in columns
+    finally:
+        db.close()
+
+    # Re-opening the migrated database is a no-op.
+    DatabaseManager(db_path=path).close()
@@ -0,0 +1,164 @@
+"""
+Tests for the per-user category classifier (nlp/classifier.py and
+database/category_model.py).
+"""
+
+import time
+
+import numpy as np
+import pytest
+
+from database.db_manager import DatabaseManager
+from database.archive import archive_year
+from database.migrate import discover, migrate
+from database.pool import ConnectionPool
+from nlp.classifier import N_BUCKETS, decode_counts, encode_counts
+
+
+HISTORY = [
+    ("uber ride to office", "Travel"),
+    ("ola cab airport", "Travel"),
+    ("uber ride home", "Travel"),
+    ("swiggy dinner order", "Food"),
+    ("zomato lunch order", "Food"),
+    ("swiggy breakfast", "Food"),
+    ("netflix subscription", "Subscriptions"),
+    ("spotify subscription renewal", "Subscriptions"),
+]
+
+
+@pytest.fixture
+def user(db):
+    user_id = db.create_user("ravi", "x")
+    account_id = db.add_account(user_id, "Main")
+    db.add_transactions_bulk(
+        (account_id, "expense", 10 + i, description, category, "2024-03-01")
+        for i, (description, category) in enumerate(HISTORY)
+    )
+    return user_id, account_id
+
+
+def model_rows(db, user_id):
+    with db.pool.reader() as conn:
+        return {
+            r["category_id"]: (r["doc_count"], decode_counts(r["term_counts"]).tolist())
+            for r in conn.execute(
+                "SELECT * FROM category_model WHERE user_id = ?", (user_id,)
+            )
+        }
+
+
+def test_counts_round_trip_sparsely():
+    counts = np.zeros(N_BUCKETS)
+    counts[[0, 7, N_BUCKETS - 1]] = [3, 1, 70000]
+    blob = encode_counts(counts)
+    assert len(blob) == 3 * 6
+    assert np.array_equal(decode_counts(blob), counts)
+
+
+def test_suggestions_come_from_the_users_history(db, user):
+    user_id, _ = user
+    assert db.suggest_category(user_id, "uber ride to the mall") == "Travel"
+    assert db.suggest_category(user_id, "Swiggy order") == "Food"
+    assert db.suggest_category(user_id, "spotify premium renewal") == "Subscriptions"
+    # Unknown words, and other users, get no suggestion.
+    assert db.suggest_category(user_id, "dentist appointment") is None
+    assert db.suggest_category(db.create_user("other", "x"), "uber ride") is None
+
+
+def test_corrections_move_examples_and_match_a_retrain(db, user):
+    user_id, account_id = user
+    rows = db.get_transactions(account_id)
+    netflix = next(r for r in rows if r["description"] == "netflix subscription")
+    ola = next(r for r in rows if r["description"] == "ola cab airport")
+
+    db.update_transaction(
+        netflix["id"], "expense", 10, "netflix subscription", "Entertainment", "2024-03-01"
+    )
+    db.update_transaction(ola["id"], "expense", 10, "ola cab to station", "Travel", "2024-03-01")
+    db.delete_transaction(rows[0]["id"])
+    db.add_transaction(account_id, "expense", 5, "uncategorized thing", "", "2024-03-02")
+
+    incremental = model_rows(db, user_id)
+    assert db.retrain_category_model(user_id) == len(HISTORY) - 1
+    assert model_rows(db, user_id) == incremental
+
+
+def test_deleting_an_account_retrains(db, user):
+    user_id, account_id = user
+    other = db.add_account(user_id, "Cash")
+    db.add_transaction(other, "expense", 5, "uber ride", "Travel", "2024-03-02")
+    db.delete_account(account_id, user_id=user_id)
+    assert {doc for doc, _ in model_rows(db, user_id).values()} == {1}
+
+
+def test_backfill_uncategorized_history(db, user):
+    user_id, account_id = user
+    for description in ("uber ride", "swiggy dinner", "hardware store"):
+        db.add_transaction(account_id, "expense", 7, description, "", "2024-03-05")
+
+    assert db.backfill_categories(user_id, dry_run=True) == {"Food": 1, "Travel": 1}
+    assert db.get_transactions(account_id, category="Travel")[0]["description"] != "uber ride"
+
+    assert db.backfill_categories(user_id) == {"Food": 1, "Travel": 1}
+    categories = {r["description"]: r["category"] for r in db.get_transactions(account_id)}
+    assert categories["uber ride"] == "Travel"
+    assert categories["swiggy dinner"] == "Food"
+    assert categories["hardware store"] is None
+    assert db.backfill_categories(user_id) == {}
+
+
+def test_migration_trains_existing_users(tmp_path):
+    path = str(tmp_path / "old.db")
+    pool = ConnectionPool(path)
+    migrate(pool, target=8)
+    with pool.writer() as conn:
+        conn.execute("INSERT INTO users (id, username, password_hash) VALUES (1, 'u', 'x')")
+        conn.execute("INSERT INTO accounts (id, user_id, name) VALUES (1, 1, 'Main')")
+        conn.execute(
+            "INSERT INTO categories (id, user_id, name, name_key) VALUES (1, 1, 'Food', 'food')"
+        )
+        conn.execute(
+            """
+            INSERT INTO transactions
+                (account_id, type, amount, description, category_id, transaction_date)
+            VALUES (1, 'expense', 5, 'swiggy order', 1, '2024-01-01'),
+                   (1, 'expense', 5, 'no category', NULL, '2024-01-01')
+            """
+        )
+    pool.close()
+
+    db = DatabaseManager(db_path=path)
+    try:
+        assert {k: v[0] for k, v in model_rows(db, 1).items()} == {1: 1}
+    finally:
+        db.close()
+
+
+def test_frozen_migration_trains_like_a_retrain(db, user):
+    user_id, account_id = user
+    other = db.add_account(db.create_user("asha", "x"), "Other")
+    db.add_transaction(account_id, "expense", 3, "Uber pool, uber again", "Travel", "2019-05-01")
+    db.add_transaction(other, "expense", 4, "swiggy order", "Food", "2024-01-02")
+    archive_year(db.pool, 2019)
+    db.retrain_category_model(user_id)
+    expected = model_rows(db, user_id)
+    assert sum(doc_count for doc_count, _ in expected.values()) == len(HISTORY) + 1
+
+    migration = next(m for m in discover() if m.version == 9)
+    with db.pool.writer() as conn:
+        migration.apply(conn)
+    assert model_rows(db, user_id) == expected
+
+
+def test_scoring_takes_under_a_millisecond(db, user):
+    user_id, account_id = user
+    db.add_transactions_bulk(
+        (account_id, "expense", 1, f"merchant{i} item{i % 97}", f"Cat{i % 40}", "2024-04-01")
+        for i in range(5000)
+    )
+    model = db._category_model(user_id)
+    started = time.perf_counter()
+    for _ in range(200):
+        model.predict("merchant17 item17 at the mall")
+    assert (time.perf_counter() - started) / 200 < 0.001
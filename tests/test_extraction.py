@@ -0,0 +1,138 @@
+"""
+Tests for amount/date extraction: the hand-rolled date formats
+(nlp/dates.py), amounts in words (nlp/numbers.py) and bounded parse
+latency on adversarial input.
+"""
+
+import time
+from datetime import date
+
+import pytest
+
+from nlp.dates import parse_date, parse_weekday
+from nlp.numbers import parse_amount_words
+from nlp.parser import MAX_TEXT_LENGTH, NLPParser
+
+
+TODAY = date(2026, 3, 15)
+
+# Worst-case parse time at MAX_TEXT_LENGTH; typical inputs take well under 1 ms.
+LATENCY_BUDGET_SECONDS = 0.01
+
+
+@pytest.fixture(scope="module")
+def parser():
+    # Rules only and no cache: timings measure the parse itself, not a
+    # cache hit or a spaCy model that may or may not be installed.
+    parser = NLPParser(cache_size=0, escalation_threshold=0)
+    parser.parse("paid 5 on 1st of never")  # imports dateutil
+    return parser
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("2024-12-05", date(2024, 12, 5)),
+        ("2024/12/05", date(2024, 12, 5)),
+        ("05/12/2024", date(2024, 12, 5)),
+        ("5-12-24", date(2024, 12, 5)),
+        ("5.12", date(2026, 12, 5)),
+        ("5 dec", date(2026, 12, 5)),
+        ("5th of December 2023", date(2023, 12, 5)),
+        ("Sept 30, 2025 for rent", date(2025, 9, 30)),
+        ("5/12/99", date(1999, 12, 5)),
+        ("31/02/2024", None),
+        ("5/12-2024", date(2026, 12, 5)),
+        ("monday", None),
+    ],
+)
+def test_date_formats(text, expected):
+    assert parse_date("on " + text, 3, TODAY) == expected
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("friday", date(2026, 3, 13)),
+        ("last Friday", date(2026, 3, 13)),
+        ("on tues", date(2026, 3, 10)),
+        ("this sunday", date(2026, 3, 15)),
+        ("last sunday", date(2026, 3, 8)),
+        ("next friday", None),
+        ("last week", None),
+    ],
+)
+def test_weekdays(text, expected):
+    assert TODAY.weekday() == 6
+    assert parse_weekday(text, TODAY) == expected
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("five hundred", 500),
+        ("two thousand five hundred rupees", 2500),
+        ("twenty-five", 25),
+        ("one hundred and twenty", 120),
+        ("1.5 lakh", 150_000),
+        ("Rs. 2 crore", 20_000_000),
+        ("5k", 5000),
+        ("200 dollars", None),
+        ("rupees", None),
+    ],
+)
+def test_amount_words(text, expected):
+    assert parse_amount_words(text) == expected
+
+
+def test_every_on_is_tried_and_dateutil_is_the_fallback(parser):
+    assert parser.parse("spent 50 on milk on 5 dec 2024").transaction_date == date(2024, 12, 5)
+    assert parser.parse("paid 40 on 2024-12-05").transaction_date == date(2024, 12, 5)
+    assert parser.parse("paid 40 on 5 December, 2024").transaction_date == date(2024, 12, 5)
+    assert parser.parse("paid 40 on 5-dec-2024").transaction_date == date(2024, 12, 5)
+    assert parser.parse("salon 500").transaction_date == date.today()
+
+
+def test_amount_patterns(parser):
+    assert parser.parse("₹1,200.50 at dmart").amount == 1200.5
+    assert parser.parse("bought 2 shirts of 300 each").amount == 600
+    assert parser.parse("bought 2 cotton shirts in blue of 300 each").amount == 600
+    assert parser.parse("paid 99999999999999999999 days ago for 5 rupees").amount == 5
+
+
+def fill(unit, prefix="", suffix=""):
+    return prefix + unit * ((MAX_TEXT_LENGTH - len(prefix) - len(suffix)) // len(unit)) + suffix
+
+
+ADVERSARIAL = {
+    "digit run": fill("1", suffix="."),
+    "number words": fill("1 ", prefix="each "),
+    "comma groups": fill("1,", "rs", "x"),
+    "each without price": fill("2 a ", suffix="of 5 eachx"),
+    "many ons": fill("on 1 "),
+    "repeated dates": fill("5 dec ", "on "),
+    "slashes": fill("1/", "on "),
+    "days without ago": fill("1 day ", suffix="x"),
+    "keywords": fill("bus paid got "),
+    "whitespace": fill(" ", "on 5", "dec 1"),
+    "dots": fill("1.", "5 "),
+    "mixed": fill("₹ rs 1, on 5 of "),
+}
+
+
+@pytest.mark.parametrize("text", ADVERSARIAL.values(), ids=ADVERSARIAL.keys())
+def test_adversarial_input_parses_in_bounded_time(parser, text):
+    def timed():
+        started = time.perf_counter()
+        try:
+            parser.parse(text)
+        except ValueError:
+            pass
+        return time.perf_counter() - started
+
+    assert min(timed() for _ in range(3)) < LATENCY_BUDGET_SECONDS
+
+
+def test_text_over_the_cap_is_rejected(parser):
+    with pytest.raises(ValueError, match="longer than"):
+        parser.parse("1" * (MAX_TEXT_LENGTH + 1))
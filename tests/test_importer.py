@@ -0,0 +1,240 @@
+"""
+Tests for the CSV / XLSX statement importer (utils/importer.py).
+"""
+
+import io
+from datetime import date, datetime
+
+import pytest
+
+from utils import importer
+from utils.importer import import_statement, make_row_normalizer, map_columns
+
+
+@pytest.fixture
+def account_id(db):
+    return db.add_account(db.create_user("import", "x"), "Bank")
+
+
+def csv_file(text, name="statement.csv"):
+    f = io.BytesIO(text.encode("utf-8"))
+    f.name = name
+    return f
+
+
+def imported(db, account_id):
+    return sorted(
+        (str(t["transaction_date"]), t["type"], t["amount"], t["description"], t["category"] or "")
+        for t in db.get_transactions(account_id)
+    )
+
+
+def normalizer(header):
+    return make_row_normalizer(map_columns(header), account_id=1)
+
+
+# ---------- Column mapping ----------
+
+def test_bank_headers_map_onto_fields():
+    header = [" Txn Date", "NARRATION", "Chq No", "Withdrawal Amt", "Deposit Amt", None]
+    assert map_columns(header) == {
+        "transaction_date": 0,
+        "description": 1,
+        "debit": 3,
+        "credit": 4,
+    }
+
+
+@pytest.mark.parametrize(
+    "header,message",
+    [
+        (["Narration", "Amount"], "No date column"),
+        (["Date", "Narration", "Balance"], "No amount"),
+    ],
+)
+def test_header_without_required_columns_is_rejected(header, message):
+    with pytest.raises(ValueError, match=message):
+        map_columns(header)
+
+
+# ---------- Types and amounts ----------
+
+def test_debit_and_credit_columns_set_the_type():
+    normalize = normalizer(["Date", "Details", "Debit", "Credit"])
+    assert normalize(["2024-01-05", "rent", "1,500.00", ""]) == (
+        1, "expense", 1500.0, "rent", "", "2024-01-05"
+    )
+    assert normalize(["2024-01-06", "salary", "", "40000"])[1:3] == ("income", 40000.0)
+    # A zero debit falls through to the credit column
+    assert normalize(["2024-01-07", "refund", "0", "12"])[1:3] == ("income", 12.0)
+
+
+def test_type_column_wins_over_the_sign():
+    normalize = normalizer(["Date", "Amount", "Dr/Cr"])
+    assert normalize(["2024-01-05", "-20", "CR"])[1:3] == ("income", 20.0)
+    assert normalize(["2024-01-05", "20", " dr "])[1:3] == ("expense", 20.0)
+    with pytest.raises(ValueError, match="Unknown transaction type 'X'"):
+        normalize(["2024-01-05", "20", "X"])
+
+
+@pytest.mark.parametrize(
+    "raw,trans_type,amount",
+    [
+        ("250", "income", 250.0),
+        ("-250", "expense", 250.0),
+        ("(250.00)", "expense", 250.0),
+        ("(1,200.50)", "expense", 1200.5),
+        ("₹1,200.50", "income", 1200.5),
+        ("Rs. 500", "income", 500.0),
+        ("INR 1 000", "income", 1000.0),
+        (75, "income", 75.0),
+        (-7.5, "expense", 7.5),
+    ],
+)
+def test_signed_amounts(raw, trans_type, amount):
+    normalize = normalizer(["Date", "Amount"])
+    assert normalize(["2024-01-05", raw])[1:3] == (trans_type, amount)
+
+
+@pytest.mark.parametrize("raw", ["", None, "0", "0.00", "₹"])
+def test_missing_or_zero_amount_is_an_error(raw):
+    normalize = normalizer(["Date", "Amount"])
+    with pytest.raises(ValueError, match="Missing or zero amount"):
+        normalize(["2024-01-05", raw])
+
+
+def test_unparseable_amount_is_an_error():
+    with pytest.raises(ValueError):
+        normalizer(["Date", "Amount"])(["2024-01-05", "twelve"])
+
+
+@pytest.mark.parametrize("raw", ["NaN", "inf", "-Infinity", "1e400", float("nan"), float("inf")])
+def test_non_finite_amount_is_an_error(raw):
+    with pytest.raises(ValueError, match="not a finite number"):
+        normalizer(["Date", "Amount"])(["2024-01-05", raw])
+
+
+# ---------- Dates ----------
+
+@pytest.mark.parametrize(
+    "raw",
+    [
+        "2024-12-05",
+        "05/12/2024",
+        "05-12-2024",
+        "05/12/24",
+        "05-12-24",
+        "05.12.2024",
+        "05 Dec 2024",
+        " 05/12/2024 ",
+        datetime(2024, 12, 5, 14, 30),
+        date(2024, 12, 5),
+    ],
+)
+def test_date_forms(raw):
+    assert normalizer(["Date", "Amount"])([raw, "1"])[5] == "2024-12-05"
+
+
+@pytest.mark.parametrize("raw,message", [("", "Missing date"), (None, "Missing date"),
+                                         ("12/31/2024", "Unrecognised date")])
+def test_bad_dates_are_errors(raw, message):
+    with pytest.raises(ValueError, match=message):
+        normalizer(["Date", "Amount"])([raw, "1"])
+
+
+def test_short_rows_are_padded():
+    normalize = normalizer(["Date", "Amount", "Description", "Category"])
+    assert normalize(["2024-01-05", "9"]) == (1, "income", 9.0, "", "", "2024-01-05")
+
+
+# ---------- Whole imports ----------
+
+def test_import_reports_bad_rows_by_line(db, account_id):
+    result = import_statement(
+        db,
+        account_id,
+        csv_file(
+            "\ufeffDate,Narration,Withdrawal,Deposit,Category\n"
+            "05/01/2024,Coffee,120,,Food\n"
+            "not a date,Broken,10,,\n"
+            "\n"
+            "06/01/2024,Salary,,50000,\n"
+            "07/01/2024,Nothing,,,\n"
+            "07/01/2024,Overflow,1e400,,\n"
+            "07/01/2024,Not a number,NaN,,\n"
+            '08/01/2024,"Rent, January","1,500",,Rent\n'
+        ),
+    )
+    assert result.inserted == 3
+    assert result.error_count == 4
+    assert [(e.line, e.message) for e in result.errors] == [
+        (3, "Unrecognised date 'not a date'"),
+        (6, "Missing or zero amount"),
+        (7, "Amount is not a finite number: '1e400'"),
+        (8, "Amount is not a finite number: 'NaN'"),
+    ]
+    assert imported(db, account_id) == [
+        ("2024-01-05", "expense", 120.0, "Coffee", "Food"),
+        ("2024-01-06", "income", 50000.0, "Salary", ""),
+        ("2024-01-08", "expense", 1500.0, "Rent, January", "Rent"),
+    ]
+    assert db.verify_account_balances() == []
+
+
+def test_header_after_blank_lines(db, account_id, tmp_path):
+    path = tmp_path / "statement.csv"
+    path.write_text(",,\n\nDate,Amount,Memo\n2024-02-01,-40,fuel\n", encoding="utf-8")
+    result = import_statement(db, account_id, str(path))
+    assert (result.inserted, result.error_count) == (1, 0)
+    assert imported(db, account_id) == [("2024-02-01", "expense", 40.0, "fuel", "")]
+
+
+def test_only_the_first_errors_are_kept(db, account_id, monkeypatch):
+    monkeypatch.setattr(importer, "MAX_REPORTED_ERRORS", 3)
+    body = "".join(f"2024-01-{d:02d},0\n" for d in range(1, 11))
+    result = import_statement(db, account_id, csv_file("Date,Amount\n" + body))
+    assert result.inserted == 0
+    assert result.error_count == 10
+    assert [e.line for e in result.errors] == [2, 3, 4]
+
+
+def test_small_batches_import_everything(db, account_id):
+    body = "".join(f"2024-03-{d % 28 + 1:02d},{d + 1},row {d}\n" for d in range(250))
+    result = import_statement(
+        db, account_id, csv_file("Date,Amount,Details\n" + body), batch_size=40
+    )
+    assert result.inserted == 250
+    assert len(db.get_transactions(account_id)) == 250
+
+
+def test_format_and_empty_file_errors(db, account_id):
+    with pytest.raises(ValueError, match="Cannot tell the file format"):
+        import_statement(db, account_id, io.BytesIO(b"Date,Amount\n"))
+    with pytest.raises(ValueError, match="The file is empty"):
+        import_statement(db, account_id, csv_file("\n,,\n"))
+    # An explicit format overrides the name
+    result = import_statement(
+        db, account_id, csv_file("Date,Amount\n2024-01-01,5\n", name="upload.bin"), fmt="CSV"
+    )
+    assert result.inserted == 1
+
+
+def test_xlsx_import(db, account_id, tmp_path):
+    openpyxl = pytest.importorskip("openpyxl")
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.append(["Value Date", "Particulars", "Amount", "Type"])
+    ws.append([datetime(2024, 4, 1), "Groceries", 320.5, "Debit"])
+    ws.append([date(2024, 4, 2), "Interest", 12, "credit"])
+    ws.append([None, None, None, None])
+    ws.append(["02/04/2024", "Bad amount", "abc", "Debit"])
+    path = tmp_path / "statement.xlsx"
+    wb.save(path)
+
+    result = import_statement(db, account_id, str(path))
+    assert result.inserted == 2
+    assert [e.line for e in result.errors] == [5]
+    assert imported(db, account_id) == [
+        ("2024-04-01", "expense", 320.5, "Groceries", ""),
+        ("2024-04-02", "income", 12.0, "Interest", ""),
+    ]
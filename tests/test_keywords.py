@@ -0,0 +1,65 @@
+"""
+Tests for the single-pass keyword matcher (nlp/keywords.py) and the
+parser rules built on it.
+"""
+
+import pytest
+
+from nlp.keywords import KeywordMatcher
+from nlp.parser import NLPParser
+
+
+@pytest.fixture(scope="module")
+def parser():
+    return NLPParser()
+
+
+def test_whole_words_plurals_and_positions():
+    matcher = KeywordMatcher(
+        [("type", "income", ["got"]), ("category", "Transport", ["bus", "metro card"])]
+    )
+    text = "forgot the bus pass, got two buses and a Metro Card"
+    hits = matcher.find(text)
+    assert [(h.keyword, text[h.start:h.end]) for h in hits] == [
+        ("bus", "bus"),
+        ("got", "got"),
+        ("bus", "buses"),
+        ("metro card", "Metro Card"),
+    ]
+    assert hits[0].label("category") == "Transport" and hits[0].label("type") is None
+
+
+def test_longest_keyword_wins_and_shared_keywords_keep_all_labels():
+    matcher = KeywordMatcher(
+        [
+            ("type", "expense", ["bill"]),
+            ("type", "income", ["salary"]),
+            ("category", "Utilities", ["phone bill"]),
+            ("category", "Income", ["salary"]),
+        ]
+    )
+    hits = matcher.find("phone bill and salary")
+    assert [h.keyword for h in hits] == ["phone bill", "salary"]
+    assert hits[1].labels == (("type", "income"), ("category", "Income"))
+
+
+def test_thousands_of_keywords():
+    merchants = [f"merchant{i}" for i in range(5000)]
+    matcher = KeywordMatcher([("category", "Shopping", merchants)])
+    hits = matcher.find("paid merchant4321 and merchant43 but not merchant99999")
+    assert [h.keyword for h in hits] == ["merchant4321", "merchant43"]
+
+
+@pytest.mark.parametrize(
+    "text, trans_type, category",
+    [
+        ("forgot to pay 300 for business lunch", "expense", None),
+        ("got 2000 rupees salary today", "income", "Income"),
+        ("paid phone bill 500", "expense", "Utilities"),
+        ("bought 3 books for 150 each", "expense", "Education"),
+        ("took a bus for 40", "expense", "Transport"),
+    ],
+)
+def test_parser_rules(parser, text, trans_type, category):
+    result = parser.parse(text)
+    assert (result.trans_type, result.category) == (trans_type, category)
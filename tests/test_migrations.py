@@ -0,0 +1,268 @@
+"""
+Tests for the PRAGMA user_version migration runner.
+"""
+
+import sqlite3
+
+import pytest
+
+from database.db_manager import DatabaseManager
+from database.migrate import MigrationError, current_version, discover, migrate, split_statements
+from database.pool import ConnectionPool
+
+
+def schema_objects(path):
+    conn = sqlite3.connect(path)
+    try:
+        rows = conn.execute(
+            "SELECT type, name FROM sqlite_master WHERE name NOT LIKE 'sqlite_%' ORDER BY 1, 2"
+        ).fetchall()
+        columns = {
+            table: [r[1] for r in conn.execute(f"PRAGMA table_info({table})")]
+            for table in ("users", "accounts", "categories", "transactions")
+        }
+    finally:
+        conn.close()
+    return rows, {t: sorted(c) for t, c in columns.items()}
+
+
+def write_migrations(directory, files):
+    directory.mkdir()
+    for name, body in files.items():
+        (directory / name).write_text(body, encoding="utf-8")
+    return str(directory)
+
+
+def test_fresh_database_reaches_latest_version(tmp_path):
+    db = DatabaseManager(db_path=str(tmp_path / "fresh.db"))
+    try:
+        with db.pool.reader() as conn:
+            assert current_version(conn) == discover()[-1].version
+    finally:
+        db.close()
+
+
+def test_up_to_date_database_costs_one_pragma(tmp_path):
+    path = str(tmp_path / "fast.db")
+    DatabaseManager(db_path=path).close()
+
+    pool = ConnectionPool(path)
+    statements = []
+    pool._writer.set_trace_callback(statements.append)
+    try:
+        assert migrate(pool) == []
+    finally:
+        pool.close()
+    assert statements == ["PRAGMA user_version"]
+
+
+def test_dry_run_writes_nothing(tmp_path):
+    path = str(tmp_path / "dry.db")
+    pool = ConnectionPool(path)
+    try:
+        pending = migrate(pool, dry_run=True)
+        assert [m.version for m in pending] == [m.version for m in discover()]
+        with pool.reader() as conn:
+            assert current_version(conn) == 0
+            assert conn.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()[0] == 0
+
+        assert [m.version for m in migrate(pool, target=2)] == [1, 2]
+        assert [m.version for m in migrate(pool, dry_run=True)] == [
+            m.version for m in discover()[2:]
+        ]
+    finally:
+        pool.close()
+
+
+def test_failed_migration_is_rolled_back(tmp_path):
+    directory = write_migrations(
+        tmp_path / "migrations",
+        {
+            "0001_first.sql": "CREATE TABLE a (x INTEGER);\n",
+            "0002_broken.sql": "CREATE TABLE b (x INTEGER);\nINSERT INTO missing VALUES (1);\n",
+        },
+    )
+    pool = ConnectionPool(str(tmp_path / "broken.db"))
+    try:
+        with pytest.raises(sqlite3.OperationalError):
+            migrate(pool, directory)
+        with pool.reader() as conn:
+            assert current_version(conn) == 1
+            tables = {r[0] for r in conn.execute("SELECT name FROM sqlite_master")}
+        assert tables == {"a"}
+    finally:
+        pool.close()
+
+
+def test_python_migration_and_triggers(tmp_path):
+    directory = write_migrations(
+        tmp_path / "migrations",
+        {
+            "0001_tables.sql": """
+                CREATE TABLE a (x INTEGER);
+                CREATE TABLE log (x INTEGER);
+                -- Trigger bodies contain semicolons of their own.
+                CREATE TRIGGER trg AFTER INSERT ON a
+                BEGIN
+                    INSERT INTO log VALUES (NEW.x);
+                    INSERT INTO log VALUES (NEW.x * 10);
+                END;
+            """,
+            "0002_data.py": (
+                "def upgrade(conn):\n"
+                "    conn.executemany('INSERT INTO a VALUES (?)', [(1,), (2,)])\n"
+            ),
+        },
+    )
+    pool = ConnectionPool(str(tmp_path / "py.db"))
+    try:
+        assert [m.kind for m in migrate(pool, directory)] == ["sql", "py"]
+        with pool.reader() as conn:
+            assert sorted(r[0] for r in conn.execute("SELECT x FROM log")) == [1, 2, 10, 20]
+    finally:
+        pool.close()
+
+
+def test_newer_database_is_refused(tmp_path):
+    path = str(tmp_path / "newer.db")
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA user_version = 999")
+    conn.close()
+    with pytest.raises(MigrationError):
+        DatabaseManager(db_path=path)
+
+
+def test_numbering_gaps_are_rejected(tmp_path):
+    directory = write_migrations(
+        tmp_path / "migrations",
+        {"0001_a.sql": "SELECT 1;\n", "0003_c.sql": "SELECT 1;\n"},
+    )
+    with pytest.raises(MigrationError):
+        discover(directory)
+
+
+def test_split_statements_rejects_incomplete_script():
+    assert split_statements("SELECT 1;\n-- trailing comment\n") == ["SELECT 1;"]
+    with pytest.raises(MigrationError):
+        split_statements("SELECT 1;\nSELECT 2\n")
+
+
+def test_unversioned_current_database_is_adopted(tmp_path):
+    """A database created by the old schema script, before versioning existed."""
+    path = str(tmp_path / "adopt.db")
+    db = DatabaseManager(db_path=path)
+    user_id = db.create_user("adopt", "x")
+    account_id = db.add_account(user_id, "Home")
+    db.add_transaction(account_id, "expense", 10, "milk", "Groceries", "2024-01-01")
+    with db.pool.writer(transaction=False) as conn:
+        conn.execute("PRAGMA user_version = 0")
+    db.close()
+    before = schema_objects(path)
+
+    db = DatabaseManager(db_path=path)
+    try:
+        assert db.get_transactions(account_id)[0]["category"] == "Groceries"
+        assert db.verify_account_balances() == []
+        assert db.verify_monthly_rollups() == []
+        assert len(db.search_transactions(account_id, "milk")) == 1
+    finally:
+        db.close()
+    assert schema_objects(path) == before
+
+
+def test_legacy_database_matches_fresh_schema(tmp_path):
+    """The baseline schema migrated forward ends up like a fresh database."""
+    fresh = str(tmp_path / "fresh.db")
+    DatabaseManager(db_path=fresh).close()
+
+    legacy = str(tmp_path / "legacy.db")
+    pool = ConnectionPool(legacy)
+    try:
+        migrate(pool, target=1)
+        with pool.writer() as conn:
+            conn.execute("INSERT INTO users (username, password_hash) VALUES ('a', 'x')")
+            conn.execute("INSERT INTO accounts (user_id, name) VALUES (1, 'Home')")
+            conn.execute(
+                "INSERT INTO transactions (account_id, type, amount, category, transaction_date) "
+                "VALUES (1, 'expense', 5, 'Food', '2024-01-01')"
+            )
+            conn.execute("PRAGMA user_version = 0")
+    finally:
+        pool.close()
+
+    db = DatabaseManager(db_path=legacy)
+    try:
+        assert db.get_transactions(1)[0]["category"] == "Food"
+        assert db.get_account_summary(1)["total_expense"] == 5
+    finally:
+        db.close()
+    assert schema_objects(legacy) == schema_objects(fresh)
+
+
+def test_baseline_database_with_data_upgrades_to_latest(tmp_path):
+    """A database written by the pre-migration app, opened by the current one."""
+    path = str(tmp_path / "baseline.db")
+    baseline = next(m for m in discover() if m.version == 1)
+    conn = sqlite3.connect(path)
+    with open(baseline.path, encoding="utf-8") as f:
+        conn.executescript(f.read())  # what the old app did on start-up
+    conn.executemany(
+        "INSERT INTO users (id, username, password_hash) VALUES (?, ?, 'x')",
+        [(1, "asha"), (2, "ravi")],
+    )
+    conn.executemany(
+        "INSERT INTO accounts (id, user_id, name) VALUES (?, ?, ?)",
+        [(1, 1, "Home"), (2, 1, "Work"), (3, 2, "Home")],
+    )
+    conn.executemany(
+        """
+        INSERT INTO transactions (account_id, type, amount, description, category, transaction_date)
+        VALUES (?, ?, ?, ?, ?, ?)
+        """,
+        [
+            (1, "expense", 120, "swiggy dinner", "Food", "2023-12-30"),
+            (1, "expense", 80, "zomato lunch", "food", "2024-01-02"),
+            (1, "income", 5000, "salary", "Income", "2024-01-31"),
+            (2, "expense", 40, "uber to office", "Travel", "2024-01-05"),
+            (2, "expense", 15, "tea", None, "2024-02-01"),
+            (3, "expense", 60, "swiggy order", "FOOD ", "2024-01-10"),
+        ],
+    )
+    conn.commit()
+    conn.close()
+
+    db = DatabaseManager(db_path=path)
+    try:
+        with db.pool.reader() as conn:
+            assert current_version(conn) == discover()[-1].version
+        # Categories became one row per user and case-folded name
+        assert [c["name"] for c in db.get_categories(1)] == ["Food", "Income", "Travel"]
+        assert [c["name"] for c in db.get_categories(2)] == ["FOOD"]
+        assert {t["category"] for t in db.get_transactions(1)} == {"Food", "Income"}
+        assert db.get_transactions(2, category="travel")[0]["description"] == "uber to office"
+
+        assert db.get_account_summary(1) == {
+            "total_income": 5000.0,
+            "total_expense": 200.0,
+            "balance": 4800.0,
+            "transaction_count": 3,
+        }
+        assert db.verify_account_balances() == []
+        assert db.verify_monthly_rollups() == []
+        assert [t["description"] for t in db.search_transactions(1, "swiggy")] == ["swiggy dinner"]
+        january = db.get_period_totals(1, "2024-01-01", "2024-01-31")
+        assert {(r["category"], r["type"], r["total_amount"]) for r in january} == {
+            ("Food", "expense", 80.0),
+            ("Income", "income", 5000.0),
+        }
+        assert db.retrain_category_model(1) == 4
+
+        # Writes keep every derived table in step
+        tx_id = db.add_transaction(3, "expense", 10, "swiggy snack", "food", "2024-02-02")
+        assert db.get_account_summary(3)["total_expense"] == 70
+        assert len(db.search_transactions(3, "swiggy")) == 2
+        db.delete_transaction(tx_id)
+        assert db.verify_account_balances() == []
+        assert db.verify_monthly_rollups() == []
+    finally:
+        db.close()
@@ -0,0 +1,89 @@
+"""
+Tests for keyset pagination (get_transactions_page / iter_transactions)
+when many transactions share a date.
+"""
+
+from datetime import date
+
+import pytest
+
+
+@pytest.fixture
+def account_id(db):
+    user_id = db.create_user("pages", "x")
+    account_id = db.add_account(user_id, "Main")
+    # 30 rows over three dates, 10 per date, added out of date order
+    db.add_transactions_bulk(
+        (
+            account_id,
+            "expense" if i % 3 else "income",
+            i + 1,
+            f"row {i}",
+            "Food" if i % 2 else "",
+            ["2024-01-02", "2024-01-01", "2024-01-03"][i % 3],
+        )
+        for i in range(30)
+    )
+    return account_id
+
+
+def walk(db, account_id, limit, **filters):
+    ids, pages, cursor = [], 0, None
+    while True:
+        page, cursor = db.get_transactions_page(account_id, limit=limit, after=cursor, **filters)
+        assert len(page) <= limit
+        assert page or pages == 0, "empty page after a non-None cursor"
+        ids.extend(t["id"] for t in page)
+        pages += 1
+        if cursor is None:
+            return ids, pages
+        assert cursor == (str(page[-1]["transaction_date"]), page[-1]["id"])
+
+
+@pytest.mark.parametrize("limit", [1, 3, 4, 7, 10, 29, 30, 31])
+def test_pages_split_inside_a_date(db, account_id, limit):
+    expected = [t["id"] for t in db.get_transactions(account_id)]
+    ids, pages = walk(db, account_id, limit)
+    assert ids == expected
+    assert len(set(ids)) == 30
+    assert pages == max(1, -(-30 // limit))  # no trailing empty page
+
+
+def test_order_is_date_then_id_descending(db, account_id):
+    rows, _ = db.get_transactions_page(account_id, limit=30)
+    keys = [(str(t["transaction_date"]), t["id"]) for t in rows]
+    assert keys == sorted(keys, reverse=True)
+    assert [str(t["transaction_date"]) for t in rows[:10]] == ["2024-01-03"] * 10
+
+
+def test_filters_combine_with_the_cursor(db, account_id):
+    filters = {"trans_type": "expense", "category": "food", "start_date": "2024-01-02"}
+    expected = [t["id"] for t in db.get_transactions(account_id, **filters)]
+    assert expected
+    assert walk(db, account_id, 2, **filters)[0] == expected
+    assert [t["id"] for t in db.iter_transactions(account_id, chunk_size=3, **filters)] == expected
+
+
+def test_cursor_accepts_a_date_object(db, account_id):
+    first, cursor = db.get_transactions_page(account_id, limit=12)
+    as_date = (date.fromisoformat(cursor[0]), cursor[1])
+    assert db.get_transactions_page(account_id, limit=12, after=as_date) == (
+        db.get_transactions_page(account_id, limit=12, after=cursor)
+    )
+
+
+def test_writes_between_pages_cause_no_duplicates(db, account_id):
+    first, cursor = db.get_transactions_page(account_id, limit=15)
+    # Same date as the cursor but a higher id: sorts before it, so it is
+    # not on later pages; and a row deleted from the next page just vanishes.
+    db.add_transaction(account_id, "expense", 1, "late", "", cursor[0])
+    rest = [t["id"] for t in db.iter_transactions(account_id, chunk_size=4)]
+    gone = rest[rest.index(first[-1]["id"]) + 1]
+    db.delete_transaction(gone)
+
+    seen = [t["id"] for t in first]
+    while cursor is not None:
+        page, cursor = db.get_transactions_page(account_id, limit=15, after=cursor)
+        seen.extend(t["id"] for t in page)
+    assert len(seen) == len(set(seen)) == 29
+    assert gone not in seen
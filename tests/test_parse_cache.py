@@ -0,0 +1,77 @@
+"""
+Tests for NLPParser's parse cache (nlp/cache.py).
+"""
+
+from datetime import date
+
+import pytest
+
+import nlp.parser
+from nlp.parser import NLPParser
+
+
+class FakeDate(date):
+    current = date(2025, 3, 10)
+
+    @classmethod
+    def today(cls):
+        return cls.current
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    monkeypatch.setattr(nlp.parser, "date", FakeDate)
+    FakeDate.current = date(2025, 3, 10)
+    return FakeDate
+
+
+def test_hits_misses_and_normalized_keys(clock):
+    parser = NLPParser(cache_size=8)
+    first = parser.parse("paid 50 for milk today")
+    again = parser.parse("  paid 50   for milk today ")
+    assert again == first and again is not first
+    assert parser.parse("Paid 50 for milk today") == first
+    assert tuple(parser.cache_info()) == (1, 2, 8, 2)
+
+    parser.cache_clear()
+    assert tuple(parser.cache_info()) == (0, 0, 8, 0)
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    parser = NLPParser(cache_size=2)
+    parser.parse("pen 5")
+    parser.parse("pen 6")
+    parser.parse("pen 5")
+    parser.parse("pen 7")
+    assert parser.cache_info().currsize == 2
+    parser.parse("pen 5")
+    parser.parse("pen 6")
+    assert parser.cache_info().hits == 2
+
+
+@pytest.mark.parametrize(
+    "text, on_day_one, on_day_two",
+    [
+        ("paid 50 for milk today", date(2025, 3, 10), date(2026, 2, 1)),
+        ("paid 50 for milk yesterday", date(2025, 3, 9), date(2026, 1, 31)),
+        ("paid 50 for milk 3 days ago", date(2025, 3, 7), date(2026, 1, 29)),
+        ("paid 50 for milk", date(2025, 3, 10), date(2026, 2, 1)),
+        ("paid 50 for milk on 5/1/2024", date(2024, 1, 5), date(2024, 1, 5)),
+        ("paid 50 for milk on 5 jan", date(2025, 1, 5), date(2026, 1, 5)),
+    ],
+)
+def test_cached_dates_follow_the_current_day(clock, text, on_day_one, on_day_two):
+    parser = NLPParser()
+    assert parser.parse(text).transaction_date == on_day_one
+    clock.current = date(2026, 2, 1)
+    cached = parser.parse(text)
+    assert cached.transaction_date == on_day_two
+    assert cached.amount == 50
+    assert parser.cache_info().hits == 1
+
+
+def test_cache_can_be_disabled():
+    parser = NLPParser(cache_size=0)
+    parser.parse("pen 5")
+    parser.parse("pen 5")
+    assert tuple(parser.cache_info()) == (0, 0, 0, 0)
@@ -0,0 +1,64 @@
+"""
+Tests for NLPParser.parse_many.
+"""
+
+import pytest
+
+from nlp.parser import NLPParser
+
+
+SAMPLES = [
+    "bought pen for 5 rupees",
+    "got 2000 rupees salary",
+    "no amount here",
+    "paid electricity bill rs 1,200",
+    "",
+]
+
+
+def corpus(n):
+    return (SAMPLES[i % len(SAMPLES)] for i in range(n))
+
+
+@pytest.fixture(scope="module")
+def parser():
+    return NLPParser()
+
+
+def expected(parser, n):
+    """(text, transaction, error type) of parse() on each text."""
+    results = []
+    for text in corpus(n):
+        try:
+            results.append((text, parser.parse(text), type(None)))
+        except ValueError as exc:
+            results.append((text, None, type(exc)))
+    return results
+
+
+def test_in_process_keeps_order_and_errors(parser):
+    results = list(parser.parse_many(corpus(10), workers=1))
+    assert [r.text for r in results] == list(corpus(10))
+    assert [r.ok for r in results] == [True, True, False, True, False] * 2
+    assert results[3].transaction.amount == 1200
+    assert isinstance(results[2].error, ValueError)
+
+
+def test_process_pool_matches_in_process(parser):
+    results = parser.parse_many(corpus(203), workers=2, chunk_size=10)
+    assert [(r.text, r.transaction, type(r.error)) for r in results] == expected(parser, 203)
+
+
+def test_small_batches_skip_the_pool(parser, monkeypatch):
+    import concurrent.futures
+
+    def no_pool(*args, **kwargs):
+        raise AssertionError("pool started for a small batch")
+
+    monkeypatch.setattr(concurrent.futures, "ProcessPoolExecutor", no_pool)
+    assert len(list(parser.parse_many(corpus(19), workers=4, chunk_size=10))) == 19
+
+
+def test_rejects_bad_chunk_size(parser):
+    with pytest.raises(ValueError):
+        list(parser.parse_many(["x"], chunk_size=0))
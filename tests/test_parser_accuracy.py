@@ -0,0 +1,45 @@
+"""
+Parser accuracy on the labelled benchmark corpus
+(benchmarks/parser_corpus.py, benchmarks/bench_parser.py), so a change
+to nlp/patterns.py that breaks a supported form fails here.
+"""
+
+import json
+
+from benchmarks.bench_parser import compare, run
+
+
+# Known misses: "rs" between two numbers can be read as the prefix of
+# the second ("pen 500 rs 4 days ago" -> 4), and income keywords that are
+# also Income category keywords (salary, refund, bonus) are stripped from
+# the description before the category is detected.
+ACCURACY_FLOORS = {
+    "trans_type": 1.0,
+    "amount": 0.99,
+    "category": 0.84,
+    "transaction_date": 1.0,
+    "rejected": 1.0,
+}
+
+
+def test_accuracy_floors():
+    report = run(lines=2_000, seed=11)
+    for field, floor in ACCURACY_FLOORS.items():
+        assert report["accuracy"][field] >= floor, (field, report["mismatches"])
+    assert report["exact_by_template"]["each"] == 1.0
+
+
+def test_report_is_json_and_compares(capsys):
+    report = json.loads(json.dumps(run(lines=300, seed=3)))
+    assert set(report["stages_us"]) == {
+        "_extract_amount", "_extract_date", "_extract_description", "_detect_category",
+    }
+    assert report["parses_per_sec"] > 0
+    assert report["latency_us"]["p99"] >= report["latency_us"]["p50"]
+    assert compare(report, report) == []
+
+    worse = json.loads(json.dumps(report))
+    worse["accuracy"]["amount"] += 0.01
+    assert compare(report, worse) == [
+        f"amount: {worse['accuracy']['amount']:.2%} -> {report['accuracy']['amount']:.2%}"
+    ]
@@ -0,0 +1,100 @@
+"""
+Tests for the shared parser service and its client (nlp/service.py).
+"""
+
+import threading
+
+import pytest
+
+from nlp.parser import NLPParser
+from nlp.service import ParserClient, ParserService
+
+
+SAMPLES = [
+    "bought pen for 5 rupees",
+    "got 2000 rupees salary yesterday",
+    "no amount here",
+    "paid electricity bill rs 1,200 on 5 dec 2024",
+    "",
+]
+
+
+@pytest.fixture
+def socket_path(tmp_path):
+    return str(tmp_path / "parser.sock")
+
+
+@pytest.fixture
+def service(socket_path):
+    service = ParserService(NLPParser(), socket_path).start()
+    yield service
+    service.close()
+
+
+def test_client_matches_in_process_parser(service, socket_path):
+    client = ParserClient(socket_path, fallback=lambda: pytest.fail("fell back"))
+    local = NLPParser()
+    assert client.parse("bought pen for 5 rupees") == local.parse("bought pen for 5 rupees")
+    with pytest.raises(ValueError, match="Could not detect any amount"):
+        client.parse("no amount here")
+
+    results = list(client.parse_many(SAMPLES * 3))
+    expected = list(local.parse_many(SAMPLES * 3, workers=1))
+    assert [r.text for r in results] == SAMPLES * 3
+    assert [r.transaction for r in results] == [r.transaction for r in expected]
+    assert [type(r.error) for r in results] == [type(r.error) for r in expected]
+    client.close()
+
+
+def test_concurrent_clients_share_batches(socket_path):
+    service = ParserService(NLPParser(), socket_path, max_batch=64, max_delay_ms=50).start()
+    client = ParserClient(socket_path, fallback=lambda: pytest.fail("fell back"))
+    try:
+        results = {}
+        barrier = threading.Barrier(8)
+
+        def worker(n):
+            barrier.wait()
+            results[n] = client.parse(f"bought pen for {n} rupees").amount
+            client.close()
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(1, 9)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    finally:
+        service.close()
+
+    assert results == {n: n for n in range(1, 9)}
+    assert service.parsed_texts == 8
+    assert service.parsed_batches < 8
+
+
+def test_client_falls_back_while_the_service_is_down(socket_path):
+    built = []
+
+    def fallback():
+        built.append(NLPParser())
+        return built[-1]
+
+    client = ParserClient(socket_path, fallback=fallback, retry_after=0)
+    assert client.parse("bought pen for 5 rupees").amount == 5
+    assert client.using_fallback is False  # retry_after=0: try again next call
+    assert len(built) == 1
+
+    service = ParserService(NLPParser(), socket_path).start()
+    try:
+        assert client.parse("bought pen for 6 rupees").amount == 6
+        assert service.parsed_texts == 1
+    finally:
+        service.close()
+
+    # The service went away under an open connection
+    assert client.parse("bought pen for 7 rupees").amount == 7
+    assert len(built) == 1
+
+
+def test_second_service_on_a_live_socket_is_refused(service, socket_path):
+    with pytest.raises(RuntimeError, match="already listening"):
+        ParserService(NLPParser(), socket_path)
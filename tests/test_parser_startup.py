@@ -0,0 +1,21 @@
+"""
+Startup budget for the NLP parser (see benchmarks/bench_parser_startup.py).
+"""
+
+from datetime import date
+
+from benchmarks.bench_parser_startup import STARTUP_BUDGET_MS, measure_cold_start
+from nlp.parser import NLPParser
+
+
+def test_construction_does_not_load_heavy_modules():
+    result = measure_cold_start()
+    assert result["heavy"] == []
+    assert result["ms"] < STARTUP_BUDGET_MS
+
+
+def test_parse_works_without_spacy():
+    parser = NLPParser()
+    result = parser.parse("bought milk for 50 rupees on 5 dec 2024")
+    assert (result.trans_type, result.amount, result.category) == ("expense", 50, "Groceries")
+    assert result.transaction_date == date(2024, 12, 5)
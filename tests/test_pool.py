@@ -0,0 +1,170 @@
+"""
+Tests for the SQLite connection pool (database/pool.py) under concurrent
+readers and writers.
+"""
+
+import sqlite3
+import threading
+
+import pytest
+
+from database.db_manager import DatabaseManager
+from database.pool import ConnectionPool
+
+
+@pytest.fixture
+def pool(tmp_path):
+    pool = ConnectionPool(str(tmp_path / "pool.db"), pool_size=2, busy_timeout_ms=2000)
+    with pool.writer() as conn:
+        conn.execute("CREATE TABLE counter (n INTEGER NOT NULL)")
+        conn.execute("INSERT INTO counter VALUES (0)")
+    yield pool
+    pool.close()
+
+
+def count(conn):
+    return conn.execute("SELECT n FROM counter").fetchone()[0]
+
+
+def test_readers_are_not_blocked_by_an_open_write(pool):
+    written = threading.Event()
+    release = threading.Event()
+
+    def writer():
+        with pool.writer() as conn:
+            conn.execute("UPDATE counter SET n = 1")
+            written.set()
+            release.wait(5)
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    try:
+        assert written.wait(5)
+        with pool.reader() as conn:
+            assert count(conn) == 0  # the write is not committed yet
+    finally:
+        release.set()
+        thread.join()
+    with pool.reader() as conn:
+        assert count(conn) == 1
+
+
+def test_writes_are_serialized(pool):
+    def increment():
+        for _ in range(50):
+            with pool.writer() as conn:
+                conn.execute("UPDATE counter SET n = ?", (count(conn) + 1,))
+
+    threads = [threading.Thread(target=increment) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    with pool.reader() as conn:
+        assert count(conn) == 400
+
+
+def test_readers_wait_for_a_free_connection(pool):
+    held = threading.Barrier(3)
+    release = threading.Event()
+    seen = []
+
+    def hold():
+        with pool.reader() as conn:
+            seen.append(conn)
+            held.wait(5)
+            release.wait(5)
+
+    holders = [threading.Thread(target=hold) for _ in range(2)]
+    for t in holders:
+        t.start()
+    held.wait(5)  # both connections are checked out
+
+    got = []
+
+    def wait_for_one():
+        with pool.reader() as conn:
+            got.append(conn)
+
+    waiter = threading.Thread(target=wait_for_one)
+    waiter.start()
+    waiter.join(0.2)
+    assert waiter.is_alive()  # pool_size=2: nothing to hand out yet
+    release.set()
+    waiter.join(5)
+    for t in holders:
+        t.join()
+    assert got and got[0] in seen
+    assert len(pool._all_readers) == 2
+
+
+def test_exhausted_pool_times_out(tmp_path):
+    pool = ConnectionPool(str(tmp_path / "small.db"), pool_size=1, busy_timeout_ms=100)
+    try:
+        with pool.reader():
+            outcome = []
+
+            def borrow():
+                try:
+                    with pool.reader():
+                        outcome.append("got one")
+                except sqlite3.OperationalError as exc:
+                    outcome.append(str(exc))
+
+            t = threading.Thread(target=borrow)
+            t.start()
+            t.join(5)
+        assert outcome and "No reader connection became free" in outcome[0]
+    finally:
+        pool.close()
+
+
+def test_nested_reads_share_a_connection_and_see_own_writes(pool):
+    with pool.reader() as outer:
+        with pool.reader() as inner:
+            assert inner is outer
+    with pool.writer() as conn:
+        conn.execute("UPDATE counter SET n = 7")
+        with pool.reader() as reader:
+            assert reader is conn
+            assert count(reader) == 7
+
+
+def test_concurrent_sessions_on_one_manager(tmp_path):
+    db = DatabaseManager(db_path=str(tmp_path / "sessions.db"), pool_size=4)
+    user_id = db.create_user("pool", "x")
+    account_id = db.add_account(user_id, "Main")
+    errors = []
+    done = threading.Event()
+
+    def write():
+        try:
+            for i in range(200):
+                db.add_transaction(account_id, "expense", 1, f"row {i}", "", "2024-01-01")
+        except Exception as exc:
+            errors.append(exc)
+        finally:
+            done.set()
+
+    def read():
+        try:
+            while not done.is_set():
+                # Each read sees a committed state, never a half-written one
+                summary = db.get_account_summary(account_id)
+                assert summary["total_expense"] == summary["transaction_count"]
+                page, _ = db.get_transactions_page(account_id, limit=500)
+                assert sum(t["amount"] for t in page) == len(page)
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=write)] + [threading.Thread(target=read) for _ in range(6)]
+    try:
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert errors == []
+        assert db.get_account_summary(account_id)["transaction_count"] == 200
+        assert len(db.pool._all_readers) <= 4
+    finally:
+        db.close()
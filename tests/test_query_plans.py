@@ -0,0 +1,106 @@
+"""
+EXPLAIN QUERY PLAN regression test for the hot DatabaseManager queries.
+
+Every query the app runs on a normal rerun must be answered from an index:
+no full SCAN of a table and no temp B-tree for ORDER BY / GROUP BY.
+The SQL is captured from the real methods with a trace callback, so the
+test follows any change to the query builders.
+"""
+
+from datetime import date, timedelta
+
+import pytest
+
+from database.db_manager import DatabaseManager
+
+
+START = "2024-01-01"
+END = "2024-03-31"
+
+
+@pytest.fixture
+def seeded_db(tmp_path):
+    db = DatabaseManager(db_path=str(tmp_path / "plans.db"))
+    user_id = db.create_user("plans", "x")
+    account_ids = [db.add_account(user_id, f"Account {i}") for i in range(3)]
+
+    first_day = date(2023, 1, 1)
+    db.add_transactions_bulk(
+        (
+            account_ids[i % 3],
+            "income" if i % 5 == 0 else "expense",
+            10 + i % 90,
+            f"row {i}",
+            "Groceries" if i % 2 else "Transport",
+            (first_day + timedelta(days=i % 700)).isoformat(),
+        )
+        for i in range(3000)
+    )
+    yield db, user_id, account_ids[0]
+    db.close()
+
+
+HOT_QUERIES = {
+    "get_transactions": lambda db, u, a: db.get_transactions(
+        a, start_date=START, end_date=END
+    ),
+    "get_transactions_filtered": lambda db, u, a: db.get_transactions(
+        a, start_date=START, end_date=END, trans_type="expense", category="groceries"
+    ),
+    "get_transactions_page_first": lambda db, u, a: db.get_transactions_page(a, limit=50),
+    "get_transactions_page_next": lambda db, u, a: db.get_transactions_page(
+        a, limit=50, after=("2024-02-01", 1500)
+    ),
+    "iter_transactions": lambda db, u, a: list(db.iter_transactions(a, chunk_size=200)),
+    "get_account_summary": lambda db, u, a: db.get_account_summary(a),
+    "get_account_summary_range": lambda db, u, a: db.get_account_summary(
+        a, start_date=START, end_date=END
+    ),
+    "get_category_totals": lambda db, u, a: db.get_category_totals(
+        a, start_date=START, end_date=END
+    ),
+    "get_category_totals_filtered": lambda db, u, a: db.get_category_totals(
+        a, start_date=START, end_date=END, category="Groceries"
+    ),
+    "get_period_totals": lambda db, u, a: db.get_period_totals(
+        a, start_date=START, end_date=END
+    ),
+    "get_period_totals_all_time": lambda db, u, a: db.get_period_totals(a),
+    "get_categories": lambda db, u, a: db.get_categories(u),
+    "get_all_accounts": lambda db, u, a: db.get_all_accounts(u),
+    "get_accounts_overview": lambda db, u, a: db.get_accounts_overview(u),
+    "get_accounts_overview_range": lambda db, u, a: db.get_accounts_overview(
+        u, start_date=START, end_date=END
+    ),
+}
+
+
+def query_plans(db, call):
+    """Run `call` and return (sql, plan details) for every SELECT it issued."""
+    statements = []
+    with db.pool.reader() as conn:
+        conn.set_trace_callback(statements.append)
+        try:
+            call()
+        finally:
+            conn.set_trace_callback(None)
+
+        plans = []
+        for sql in statements:
+            if not sql.lstrip().upper().startswith("SELECT"):
+                continue
+            details = [row["detail"] for row in conn.execute("EXPLAIN QUERY PLAN " + sql)]
+            plans.append((sql, details))
+    return plans
+
+
+@pytest.mark.parametrize("name", sorted(HOT_QUERIES))
+def test_hot_query_uses_indexes(seeded_db, name):
+    db, user_id, account_id = seeded_db
+    plans = query_plans(db, lambda: HOT_QUERIES[name](db, user_id, account_id))
+    assert plans, f"{name} issued no SELECT"
+
+    for sql, details in plans:
+        for detail in details:
+            assert not detail.startswith("SCAN"), f"{name} scans a table: {detail}\n{sql}"
+            assert "TEMP B-TREE" not in detail, f"{name} sorts in a temp B-tree: {detail}\n{sql}"
@@ -0,0 +1,164 @@
+"""
+Tests for the trigger-maintained monthly_rollups table and the
+get_period_totals dashboard API built on it.
+"""
+
+import random
+import sqlite3
+from collections import defaultdict
+from datetime import date, timedelta
+
+import pytest
+
+
+CATEGORIES = ["Groceries", "Transport", "", "Rent"]
+
+
+def seed(db, rows=600, seed_value=7):
+    rnd = random.Random(seed_value)
+    user_id = db.create_user("rollups", "x")
+    accounts = [db.add_account(user_id, "A"), db.add_account(user_id, "B")]
+    first_day = date(2023, 1, 1)
+    db.add_transactions_bulk(
+        (
+            rnd.choice(accounts),
+            rnd.choice(["income", "expense"]),
+            rnd.randint(1, 500),
+            "row",
+            rnd.choice(CATEGORIES),
+            (first_day + timedelta(days=rnd.randrange(730))).isoformat(),
+        )
+        for _ in range(rows)
+    )
+    return rnd, accounts
+
+
+def raw_totals(db, account_id, start, end, length):
+    """Reference aggregation straight from the transaction list."""
+    buckets = defaultdict(lambda: [0.0, 0])
+    for t in db.get_transactions(account_id, start_date=start, end_date=end):
+        key = (str(t["transaction_date"])[:length], t["category"], t["type"])
+        buckets[key][0] += t["amount"]
+        buckets[key][1] += 1
+    return {k: (round(v[0], 2), v[1]) for k, v in buckets.items()}
+
+
+def api_totals(rows):
+    return {
+        (r["period"], r["category"], r["type"]): (round(r["total_amount"], 2), r["transaction_count"])
+        for r in rows
+    }
+
+
+def test_rollups_follow_every_write(db):
+    rnd, accounts = seed(db)
+    ids = [t["id"] for a in accounts for t in db.get_transactions(a)]
+
+    for tx_id in rnd.sample(ids, 100):
+        db.update_transaction(
+            tx_id,
+            rnd.choice(["income", "expense"]),
+            rnd.randint(1, 500),
+            "edited",
+            rnd.choice(CATEGORIES),
+            (date(2023, 1, 1) + timedelta(days=rnd.randrange(730))).isoformat(),
+        )
+    for tx_id in rnd.sample(ids, 100):
+        db.delete_transaction(tx_id)
+
+    assert db.verify_monthly_rollups() == []
+
+    db.delete_account(accounts[1])
+    assert db.verify_monthly_rollups() == []
+
+
+@pytest.mark.parametrize(
+    "start,end",
+    [
+        (None, None),
+        ("2023-03-01", "2024-06-30"),  # whole months only
+        ("2023-03-15", "2024-06-10"),  # partial months at both ends
+        ("2023-03-15", None),
+        (None, "2024-06-10"),
+        ("2023-05-03", "2023-05-20"),  # inside one month
+        ("2023-05-03", "2023-06-20"),  # two partial months
+        ("2023-12-31", "2024-01-31"),
+    ],
+)
+def test_monthly_period_totals_match_transactions(db, start, end):
+    _, accounts = seed(db)
+    rows = db.get_period_totals(accounts[0], start_date=start, end_date=end)
+    assert api_totals(rows) == raw_totals(db, accounts[0], start, end, length=7)
+    assert [r["period"] for r in rows] == sorted(r["period"] for r in rows)
+
+
+def test_daily_period_totals_match_transactions(db):
+    _, accounts = seed(db)
+    rows = db.get_period_totals(
+        accounts[0], start_date="2023-05-03", end_date="2023-07-20", granularity="day"
+    )
+    assert api_totals(rows) == raw_totals(db, accounts[0], "2023-05-03", "2023-07-20", length=10)
+
+
+def test_period_totals_filters(db):
+    _, accounts = seed(db)
+    rows = db.get_period_totals(
+        accounts[0],
+        start_date="2023-03-15",
+        end_date="2024-06-10",
+        trans_type="expense",
+        category="groceries",
+    )
+    assert rows
+    assert {(r["category"], r["type"]) for r in rows} == {("Groceries", "expense")}
+    expected = sum(
+        t["amount"]
+        for t in db.get_transactions(
+            accounts[0], "2023-03-15", "2024-06-10", trans_type="expense", category="Groceries"
+        )
+    )
+    assert sum(r["total_amount"] for r in rows) == pytest.approx(expected)
+
+
+def test_rebuild_restores_rollups(db):
+    seed(db)
+    with db.pool.writer() as conn:
+        conn.execute("UPDATE monthly_rollups SET total_amount = total_amount + 1")
+    assert db.verify_monthly_rollups()
+    db.rebuild_monthly_rollups()
+    assert db.verify_monthly_rollups() == []
+
+
+def test_bulk_import_updates_derived_tables_per_batch(db):
+    user_id = db.create_user("bulk", "x")
+    account_id = db.add_account(user_id, "A")
+    db.add_transaction(account_id, "expense", 10, "coffee beans", "Groceries", "2024-01-05")
+
+    # Several batches, landing on the existing balance and rollup rows
+    db.add_transactions_bulk(
+        (
+            (account_id, "expense", 5, f"coffee {i}", "Groceries", "2024-01-06")
+            for i in range(250)
+        ),
+        batch_size=100,
+    )
+    db.add_transaction(account_id, "income", 7, "refund", "", "2024-02-01")
+
+    assert db.verify_account_balances() == []
+    assert db.verify_monthly_rollups() == []
+    assert len(db.search_transactions(account_id, "coffee", limit=1000)) == 251
+    assert db.search_transactions(account_id, "refund")
+    with db.pool.reader() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM bulk_load").fetchone()[0] == 0
+
+    # A failing batch leaves nothing behind, triggers included
+    with pytest.raises(sqlite3.IntegrityError):
+        db.add_transactions_bulk(
+            [(account_id, "expense", 1, "tea", "", "2024-03-01"),
+             (account_id, "expense", -1, "tea", "", "2024-03-01")]
+        )
+    assert db.verify_account_balances() == []
+    assert db.search_transactions(account_id, "tea") == []
+    db.add_transaction(account_id, "expense", 3, "tea", "", "2024-03-02")
+    assert len(db.search_transactions(account_id, "tea")) == 1
+    assert db.verify_monthly_rollups() == []
@@ -0,0 +1,89 @@
+"""
+Tests for full-text search over transaction descriptions.
+"""
+
+import pytest
+
+
+@pytest.fixture
+def accounts(db):
+    user_id = db.create_user("search", "x")
+    home = db.add_account(user_id, "Home")
+    work = db.add_account(user_id, "Work")
+    db.add_transactions_bulk(
+        [
+            (home, "expense", 120, "Coffee at Starbucks", "Food", "2024-01-05"),
+            (home, "expense", 80, "coffee beans from the shop", "Groceries", "2024-02-10"),
+            (home, "expense", 60, "Café latte", "Food", "2024-03-01"),
+            (home, "expense", 900, "Electricity bill", "Utilities", "2024-03-15"),
+            (home, "income", 50, "Refund for coffee machine", "", "2024-03-20"),
+            (home, "expense", 40, "bill for electricity repair", "", "2024-04-01"),
+            (work, "expense", 75, "Coffee with client", "Food", "2024-01-07"),
+        ]
+    )
+    return home, work
+
+
+def descriptions(rows):
+    return {r["description"] for r in rows}
+
+
+def test_search_words_are_scoped_to_account(db, accounts):
+    home, work = accounts
+    assert descriptions(db.search_transactions(home, "COFFEE")) == {
+        "Coffee at Starbucks",
+        "coffee beans from the shop",
+        "Refund for coffee machine",
+    }
+    assert descriptions(db.search_transactions(work, "coffee")) == {"Coffee with client"}
+
+
+def test_search_phrase_prefix_and_accents(db, accounts):
+    home, _ = accounts
+    assert descriptions(db.search_transactions(home, '"electricity bill"')) == {
+        "Electricity bill"
+    }
+    assert descriptions(db.search_transactions(home, "electricity bill")) == {
+        "Electricity bill",
+        "bill for electricity repair",
+    }
+    assert descriptions(db.search_transactions(home, "star*")) == {"Coffee at Starbucks"}
+    assert descriptions(db.search_transactions(home, "cafe")) == {"Café latte"}
+
+
+def test_search_filters(db, accounts):
+    home, _ = accounts
+    rows = db.search_transactions(
+        home, "coffee", start_date="2024-02-01", end_date="2024-03-31", trans_type="expense"
+    )
+    assert descriptions(rows) == {"coffee beans from the shop"}
+    assert descriptions(db.search_transactions(home, "coffee", category="food")) == {
+        "Coffee at Starbucks"
+    }
+
+
+def test_search_ranks_and_limits(db, accounts):
+    home, _ = accounts
+    rows = db.search_transactions(home, "bill electricity", limit=1)
+    assert len(rows) == 1
+    # The shorter description is the closer match.
+    assert rows[0]["description"] == "Electricity bill"
+
+
+def test_search_follows_updates_and_deletes(db, accounts):
+    home, _ = accounts
+    tx = db.search_transactions(home, "starbucks")[0]
+    db.update_transaction(
+        tx["id"], "expense", 120, "Tea at Chaayos", "Food", "2024-01-05"
+    )
+    assert db.search_transactions(home, "starbucks") == []
+    assert descriptions(db.search_transactions(home, "chaayos")) == {"Tea at Chaayos"}
+
+    db.delete_transaction(tx["id"])
+    assert db.search_transactions(home, "chaayos") == []
+
+
+@pytest.mark.parametrize("query", ["", "   ", '""', "***", "AND OR NOT", 'a"b: (c', "-coffee"])
+def test_search_never_raises_on_user_input(db, accounts, query):
+    home, _ = accounts
+    db.search_transactions(home, query)
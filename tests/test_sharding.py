@@ -0,0 +1,166 @@
+"""
+Tests for the sharded layout (database/sharding.py).
+"""
+
+import os
+import threading
+
+import pytest
+
+from database.db_manager import DatabaseManager
+from database.sharding import (
+    ShardedDatabaseManager,
+    shard_id_base,
+    shard_of_id,
+    shard_path,
+    split_database,
+)
+
+
+@pytest.fixture
+def sharded(tmp_path):
+    manager = ShardedDatabaseManager(mode="bucket", shard_dir=str(tmp_path / "shards"), buckets=3)
+    yield manager
+    manager.close()
+
+
+def fill(db, users=4, rows=30):
+    """A few users with two accounts each; returns {user_id: [account ids]}."""
+    accounts = {}
+    for u in range(users):
+        user_id = db.create_user(f"user{u}", "x")
+        accounts[user_id] = [db.add_account(user_id, "Home"), db.add_account(user_id, "Work")]
+        db.add_transactions_bulk(
+            (
+                accounts[user_id][i % 2],
+                "expense" if i % 3 else "income",
+                1 + i,
+                f"coffee {u} {i}",
+                ["Food", "Rent", ""][i % 3],
+                f"2024-{i % 12 + 1:02d}-{i % 28 + 1:02d}",
+            )
+            for i in range(rows)
+        )
+    return accounts
+
+
+def test_ids_route_to_the_users_shard(sharded):
+    accounts = fill(sharded)
+    for user_id, account_ids in accounts.items():
+        shard = 1 + (user_id - 1) % 3
+        assert {shard_of_id(a) for a in account_ids} == {shard}
+        rows = sharded.get_transactions(account_id=account_ids[0])
+        assert rows and {shard_of_id(r["id"]) for r in rows} == {shard}
+        assert [a["id"] for a in sharded.get_all_accounts(user_id)] == account_ids
+        assert {c["name"] for c in sharded.get_categories(user_id)} == {"Food", "Rent"}
+    assert sorted(sharded.shard_numbers()) == [1, 2, 3]
+    assert os.path.exists(shard_path(sharded.shard_dir, 3))
+
+
+def test_reads_and_writes_through_the_router(sharded):
+    accounts = fill(sharded, users=2)
+    user_id, (home, _) = next(iter(accounts.items()))
+    version = sharded.data_version
+
+    tx_id = sharded.add_transaction(home, "expense", 99, "laptop", "Tech", "2024-05-05")
+    assert sharded.data_version > version
+    sharded.update_transaction(tx_id, "expense", 100, "laptop", "Tech", "2024-05-05")
+    assert sharded.get_transactions(home, category="Tech")[0]["amount"] == 100
+    assert sharded.search_transactions(home, "laptop")[0]["id"] == tx_id
+
+    sharded.delete_transaction(tx_id)
+    assert sharded.get_transactions(home, category="Tech") == []
+    sharded.delete_account(home, user_id=user_id)
+    assert [a["id"] for a in sharded.get_all_accounts(user_id)] == [accounts[user_id][1]]
+    assert sharded.verify_account_balances() == []
+    assert sharded.verify_monthly_rollups() == []
+
+
+def test_users_live_in_the_catalog(sharded):
+    user_id = sharded.create_user("alice", "hash")
+    assert sharded.create_user("alice", "other") is None
+    assert sharded.get_user_by_username("alice")["id"] == user_id
+    sharded.update_user_password(user_id, "new")
+    assert sharded.get_user_by_id(user_id)["password_hash"] == "new"
+    with pytest.raises(ValueError):
+        sharded.get_all_accounts(user_id + 100)
+
+
+def test_made_up_ids_do_not_create_shards(sharded):
+    fill(sharded, users=1, rows=3)
+    before = sorted(os.listdir(sharded.shard_dir))
+    with pytest.raises(ValueError, match="does not exist"):
+        sharded.delete_transaction(shard_id_base(999) + 5)
+    with pytest.raises(ValueError, match="does not exist"):
+        sharded.get_account_summary(shard_id_base(12345))
+    with pytest.raises(ValueError, match="does not exist"):
+        sharded.get_transactions(account_id=7)  # an unsharded id: shard 0
+    assert sorted(os.listdir(sharded.shard_dir)) == before
+
+
+def test_per_user_mode(tmp_path):
+    db = ShardedDatabaseManager(mode="user", shard_dir=str(tmp_path / "users"))
+    try:
+        accounts = fill(db, users=3, rows=5)
+        for user_id, account_ids in accounts.items():
+            assert shard_of_id(account_ids[0]) == user_id
+            assert os.path.exists(shard_path(db.shard_dir, user_id))
+    finally:
+        db.close()
+
+
+def test_snapshot_pins_each_shard(sharded):
+    accounts = fill(sharded, users=1, rows=10)
+    (account_id, _), = accounts.values()
+    with sharded.snapshot() as snap:
+        before = snap.get_transactions(account_id)
+        t = threading.Thread(
+            target=sharded.add_transaction,
+            args=(account_id, "income", 5, "late", "", "2024-01-01"),
+        )
+        t.start()
+        t.join()
+        assert snap.get_transactions(account_id) == before
+    assert len(sharded.get_transactions(account_id)) == len(before) + 1
+
+
+def test_split_monolithic_database(tmp_path):
+    source = DatabaseManager(db_path=str(tmp_path / "mono.db"))
+    try:
+        accounts = fill(source, users=5)
+        expected = {
+            a: (source.get_transactions(a), source.get_account_summary(a))
+            for account_ids in accounts.values()
+            for a in account_ids
+        }
+        counts = split_database(source, str(tmp_path / "split"), mode="bucket", buckets=2)
+    finally:
+        source.close()
+    assert counts == {1: 3, 2: 2}
+
+    sharded = ShardedDatabaseManager(mode="bucket", shard_dir=str(tmp_path / "split"), buckets=2)
+    try:
+        for user_id, account_ids in accounts.items():
+            base = shard_id_base(1 + (user_id - 1) % 2)
+            assert sharded.get_user_by_id(user_id)["username"] == f"user{user_id - 1}"
+            assert [a["id"] for a in sharded.get_all_accounts(user_id)] == [
+                a + base for a in account_ids
+            ]
+            for a in account_ids:
+                rows, summary = expected[a]
+                moved = sharded.get_transactions(a + base)
+                assert [r["id"] for r in moved] == [r["id"] + base for r in rows]
+                assert [(r["amount"], r["category"], r["description"]) for r in moved] == [
+                    (r["amount"], r["category"], r["description"]) for r in rows
+                ]
+                assert sharded.get_account_summary(a + base) == summary
+        assert sharded.verify_account_balances() == []
+        assert sharded.verify_monthly_rollups() == []
+
+        # New rows continue inside the shard's id range.
+        a = accounts[1][0] + shard_id_base(1)
+        tx_id = sharded.add_transaction(a, "income", 1, "after split", "", "2024-01-01")
+        assert shard_of_id(tx_id) == 1
+        assert sharded.search_transactions(a, "coffee")
+    finally:
+        sharded.close()
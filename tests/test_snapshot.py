@@ -0,0 +1,91 @@
+"""
+Tests for consistent snapshot reads (DatabaseManager.snapshot).
+"""
+
+import sqlite3
+import threading
+
+import pytest
+
+from database.archive import archive_year
+
+
+@pytest.fixture
+def db_options():
+    return {"busy_timeout_ms": 500}
+
+
+@pytest.fixture
+def account_id(db):
+    account_id = db.add_account(db.create_user("snap", "x"), "Main")
+    db.add_transactions_bulk(
+        (account_id, "expense", 10, f"row {i}", "Food", f"2024-01-{i % 28 + 1:02d}")
+        for i in range(100)
+    )
+    return account_id
+
+
+def write_from_other_thread(db, account_id):
+    errors = []
+
+    def work():
+        try:
+            db.add_transaction(account_id, "expense", 5, "during export", "Food", "2024-02-01")
+            db.delete_transaction(db.get_transactions(account_id)[-1]["id"])
+        except Exception as exc:
+            errors.append(exc)
+
+    t = threading.Thread(target=work)
+    t.start()
+    t.join(timeout=5)
+    assert not t.is_alive() and errors == []
+
+
+def test_snapshot_sees_one_point_in_time(db, account_id):
+    with db.snapshot() as snap:
+        before = snap.get_transactions(account_id)
+        write_from_other_thread(db, account_id)
+        # Writers were not blocked, and the snapshot does not see them.
+        assert snap.get_transactions(account_id) == before
+        summary = snap.get_account_summary(account_id, "2024-01-01", "2024-12-31")
+        assert summary["transaction_count"] == 100
+        assert summary["total_expense"] == sum(r["amount"] for r in before)
+
+    after = db.get_transactions(account_id)
+    assert len(after) == 100
+    assert after[0]["description"] == "during export"
+
+
+def test_snapshot_is_read_only(db, account_id):
+    with db.snapshot():
+        with db.pool.reader() as conn:
+            with pytest.raises(sqlite3.OperationalError):
+                conn.execute("DELETE FROM transactions")
+
+
+def test_nested_snapshots_share_the_connection(db, account_id):
+    with db.pool.snapshot() as outer:
+        with db.pool.snapshot() as inner:
+            assert inner is outer
+        with db.pool.reader() as conn:
+            assert conn is outer
+    with db.pool.reader():
+        with pytest.raises(sqlite3.ProgrammingError):
+            with db.pool.snapshot():
+                pass
+
+
+def test_snapshot_reads_archive_partitions(db, account_id):
+    db.add_transactions_bulk(
+        (account_id, "income", 3, f"old {y}", "", f"{y}-06-01") for y in range(2015, 2020)
+    )
+    for year in range(2015, 2020):
+        archive_year(db.pool, year)
+
+    expected = db.get_transactions(account_id, "2016-01-01", "2024-12-31")
+    with db.snapshot() as snap:
+        # Partitions attached inside the snapshot are reused by later reads.
+        assert snap.get_transactions(account_id, "2016-01-01", "2024-12-31") == expected
+        assert snap.get_transactions(account_id, "2016-01-01", "2024-12-31") == expected
+        assert snap.get_account_summary(account_id, "2015-01-01", None)["transaction_count"] == 105
+    assert db.get_account_summary(account_id, "2015-01-01", None)["transaction_count"] == 105
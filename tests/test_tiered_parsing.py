@@ -0,0 +1,108 @@
+"""
+Tests for tiered parsing: rule confidence and escalation to spaCy
+entities (NLPParser._parse_batch). spaCy is replaced by a pipeline that
+returns fixed entities, so the tests run without the model.
+"""
+
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+
+import nlp.parser
+from nlp.dates import parse_weekday
+from nlp.parser import NLPParser
+
+
+ENTITIES = {
+    "paid 3 guys 200 at Dominos": [("200", "MONEY"), ("Dominos", "ORG")],
+    "paid 40 for cab last friday": [("last friday", "DATE")],
+    "bus fare 30 5 december": [("5 december", "DATE")],
+    "five hundred for milk": [("five hundred", "MONEY")],
+}
+
+
+class FakePipeline:
+    pipe_names = ["tok2vec", "tagger", "parser", "ner"]
+
+    def __init__(self):
+        self.calls = []
+
+    def pipe(self, texts, batch_size, disable):
+        texts = list(texts)
+        self.calls.append((texts, disable))
+        for text in texts:
+            ents = [SimpleNamespace(text=t, label_=label) for t, label in ENTITIES.get(text, [])]
+            yield SimpleNamespace(ents=ents)
+
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    fake = FakePipeline()
+    monkeypatch.setattr(nlp.parser, "_load_spacy", lambda model_name: fake)
+    return fake
+
+
+def test_confident_texts_stay_on_the_rules(pipeline):
+    parser = NLPParser()
+    for text in ("bought milk for 50 rupees", "salary 5000 today", "paid 50 on 5 dec"):
+        result = parser.parse(text)
+        assert result.tier == "rules" and result.confidence >= 0.5
+    assert pipeline.calls == []
+
+
+def test_rule_confidence():
+    parser = NLPParser(escalation_threshold=0)
+    assert parser.parse("spent rs 50 on milk yesterday").confidence == 1.0
+    assert parser.parse("paid 50 for milk").confidence == 0.8
+    assert parser.parse("milk 50").confidence == 0.7
+    assert parser.parse("paid 3 guys 200").confidence == 0.4
+    assert parser.parse("paid 40 next monday").confidence == 0.3
+
+
+def test_unsure_texts_are_escalated_together(pipeline):
+    parser = NLPParser()
+    results = list(parser.parse_many(list(ENTITIES) + ["bought pen for 5 rupees"], workers=1))
+
+    assert len(pipeline.calls) == 1
+    texts, disable = pipeline.calls[0]
+    assert texts == list(ENTITIES)
+    assert disable == ["tagger", "parser"]
+
+    dominos, cab, bus, milk, pen = results
+    assert (dominos.transaction.amount, dominos.transaction.merchant) == (200, "Dominos")
+    assert dominos.transaction.tier == "ner"
+    # Weekdays and amounts in words, which the rules cannot read
+    assert cab.transaction.transaction_date == parse_weekday("last friday", date.today())
+    assert cab.transaction.transaction_date < date.today()
+    assert bus.transaction.transaction_date == date(date.today().year, 12, 5)
+    assert (milk.transaction.amount, milk.transaction.tier) == (500, "ner")
+    assert pen.transaction.tier == "rules"
+
+
+def test_without_spacy_the_rules_answer(monkeypatch):
+    def missing(model_name):
+        raise ImportError("No module named 'spacy'")
+
+    monkeypatch.setattr(nlp.parser, "_load_spacy", missing)
+    parser = NLPParser()
+    assert parser.parse("paid 3 guys 200").amount == 3
+    with pytest.raises(ValueError, match="Could not detect any amount"):
+        parser.parse("five hundred for milk")
+    assert parser.tier_stats().escalated == 0
+
+
+def test_tier_stats(pipeline):
+    parser = NLPParser()
+    for text in ("bought pen for 5 rupees", "bought pen for 5 rupees", "paid 3 guys 200"):
+        parser.parse(text)
+    stats = parser.tier_stats()
+    assert stats.parsed == 3 and stats.escalated == 1
+    assert stats.escalation_rate == 0.5
+    assert {tier: info.count for tier, info in stats.tiers.items()} == {
+        "cache": 1, "rules": 1, "ner": 1,
+    }
+    assert stats.tiers["rules"].p50_ms > 0
+
+    parser.tier_stats_clear()
+    assert parser.tier_stats().parsed == 0
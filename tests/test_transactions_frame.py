@@ -0,0 +1,65 @@
+"""
+get_transactions_frame must return the same data as the dict path
+(get_transactions + transactions_to_dataframe), with columnar dtypes.
+"""
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+from utils.data_processor import transactions_to_dataframe
+
+
+@pytest.fixture
+def account_id(db):
+    user_id = db.create_user("frame", "x")
+    account_id = db.add_account(user_id, "Home")
+    other = db.add_account(user_id, "Other")
+    db.add_transactions_bulk(
+        [
+            (account_id, "expense", 12.5, "milk", "Groceries", "2024-01-05"),
+            (account_id, "income", 1000, "salary", "Income", "2024-01-01"),
+            (account_id, "expense", 30, None, "", "2023-12-31"),
+            (account_id, "expense", 7.25, "bus", "transport", "1969-07-20"),
+            (account_id, "expense", 4, "chai", "Uncategorized", "2024-02-29"),
+            (other, "expense", 99, "rent", "Rent", "2024-01-01"),
+        ]
+    )
+    return account_id
+
+
+@pytest.mark.parametrize(
+    "filters",
+    [
+        {},
+        {"start_date": "2024-01-01", "end_date": "2024-01-31"},
+        {"trans_type": "expense", "category": "groceries"},
+        {"category": "no such category"},
+    ],
+)
+def test_frame_matches_dict_path(db, account_id, filters):
+    frame = db.get_transactions_frame(account_id, **filters)
+    expected = transactions_to_dataframe(db.get_transactions(account_id, **filters))
+
+    if expected.empty:
+        assert frame.empty
+        return
+
+    assert list(frame.columns) == list(expected.columns)
+    pd.testing.assert_frame_equal(
+        frame.astype({"type": object, "category": object}),
+        expected,
+        check_dtype=False,
+    )
+
+
+def test_frame_dtypes(db, account_id):
+    frame = db.get_transactions_frame(account_id)
+    assert frame["amount"].dtype == "float64"
+    assert str(frame["transaction_date"].dtype).startswith("datetime64")
+    assert str(frame["created_at"].dtype).startswith("datetime64")
+    assert isinstance(frame["type"].dtype, pd.CategoricalDtype)
+    assert isinstance(frame["category"].dtype, pd.CategoricalDtype)
+    assert set(frame["category"].cat.categories) == {
+        "Groceries", "Income", "Uncategorized", "transport",
+    }
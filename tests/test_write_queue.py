@@ -0,0 +1,147 @@
+"""
+Tests for group commit (database/write_queue.py) and the durability setting.
+"""
+
+import sqlite3
+import threading
+
+import pytest
+
+from database.db_manager import DatabaseManager
+from database.write_queue import GroupCommitQueue
+
+
+@pytest.fixture
+def db_options():
+    return {"group_commit": True}
+
+
+@pytest.fixture
+def account_id(db):
+    user_id = db.create_user("queue", "x")
+    return db.add_account(user_id, "Main")
+
+
+def test_writes_are_committed_and_visible(db, account_id):
+    version = db.data_version
+    tx_id = db.add_transaction(account_id, "expense", 12.5, "lunch", "Food", "2024-03-01")
+    assert db.data_version > version
+    assert db.get_transactions(account_id)[0]["id"] == tx_id
+
+    db.update_transaction(tx_id, "expense", 20, "dinner", "Food", "2024-03-02")
+    assert db.get_transactions(account_id)[0]["description"] == "dinner"
+    assert db.get_account_summary(account_id)["total_expense"] == 20
+
+    db.delete_transaction(tx_id)
+    assert db.get_transactions(account_id) == []
+    assert db.verify_account_balances() == []
+
+
+def test_queued_writes_share_commits(tmp_path):
+    db = DatabaseManager(db_path=str(tmp_path / "batch.db"))
+    user_id = db.create_user("batch", "x")
+    account_id = db.add_account(user_id, "Main")
+    queue = GroupCommitQueue(db.pool, max_batch=64, max_delay_ms=50)
+    try:
+        futures = [
+            queue.submit(
+                lambda conn, i=i: db._insert_transaction(
+                    conn, account_id, "income", i + 1, f"row {i}", "", "2024-01-01"
+                )
+            )
+            for i in range(100)
+        ]
+        ids = [f.result() for f in futures]
+    finally:
+        queue.close()
+        db.close()
+    assert len(set(ids)) == 100
+    assert queue.committed_writes == 100
+    assert queue.committed_batches < 10
+
+
+def test_failed_write_does_not_sink_its_batch(db, account_id):
+    good = [
+        db.add_transaction_async(account_id, "income", 1, "ok", "", "2024-01-01")
+        for _ in range(5)
+    ]
+    bad = db.add_transaction_async(account_id + 999, "income", 1, "bad", "", "2024-01-01")
+    more = db.add_transaction_async(account_id, "income", 1, "ok", "", "2024-01-01")
+
+    with pytest.raises(ValueError):
+        bad.result()
+    assert all(isinstance(f.result(), int) for f in good + [more])
+    assert db.get_account_summary(account_id)["transaction_count"] == 6
+
+
+def test_concurrent_writers(db, account_id):
+    def work():
+        for i in range(50):
+            db.add_transaction(account_id, "expense", 1, "w", "Misc", "2024-02-01")
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert db.get_account_summary(account_id)["transaction_count"] == 400
+    assert db.verify_account_balances() == []
+    assert db.verify_monthly_rollups() == []
+
+
+def test_write_inside_writer_runs_inline(db, account_id):
+    with db.pool.writer():
+        tx_id = db.add_transaction(account_id, "income", 3, "nested", "", "2024-01-01")
+    assert db.get_transactions(account_id)[0]["id"] == tx_id
+
+
+def test_close_commits_pending_writes(tmp_path):
+    path = str(tmp_path / "close.db")
+    db = DatabaseManager(db_path=path, group_commit=True)
+    account_id = db.add_account(db.create_user("close", "x"), "Main")
+    for _ in range(20):
+        db.add_transaction_async(account_id, "income", 1, "late", "", "2024-01-01")
+    db.close()
+
+    db = DatabaseManager(db_path=path)
+    try:
+        assert db.get_account_summary(account_id)["transaction_count"] == 20
+    finally:
+        db.close()
+
+
+@pytest.mark.parametrize("durability, synchronous", [("strict", 2), ("batched", 1)])
+def test_durability_sets_synchronous(tmp_path, durability, synchronous):
+    db = DatabaseManager(db_path=str(tmp_path / "sync.db"), durability=durability)
+    try:
+        with db.pool.writer(transaction=False) as conn:
+            assert conn.execute("PRAGMA synchronous").fetchone()[0] == synchronous
+    finally:
+        db.close()
+
+
+def test_unknown_durability_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        DatabaseManager(db_path=str(tmp_path / "bad.db"), durability="eventually")
+
+
+def test_data_version_sees_commits_from_other_connections(db, account_id):
+    other = DatabaseManager(db_path=db.pool.db_path)
+    try:
+        version, other_version = db.data_version, other.data_version
+        assert db.data_version == version  # stable while nothing changes
+
+        other.add_transaction(account_id, "expense", 5, "from elsewhere", "", "2024-03-01")
+        assert db.data_version != version
+        assert other.data_version != other_version
+
+        # Not even a DatabaseManager, e.g. another process's import
+        version = db.data_version
+        conn = sqlite3.connect(db.pool.db_path)
+        with conn:
+            conn.execute("UPDATE transactions SET description = 'changed'")
+        conn.close()
+        assert db.data_version != version
+    finally:
+        other.close()
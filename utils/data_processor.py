@@ -31,6 +31,25 @@ def transactions_to_dataframe(transactions: List[Dict[str, Any]]) -> pd.DataFram
     return df
 
 
+def period_totals_to_dataframe(totals: List[Dict[str, Any]]) -> pd.DataFrame:
+    """
+    Convert DatabaseManager.get_period_totals rows into a DataFrame with
+    the columns the chart helpers group on (transaction_date, category,
+    type, amount). Each row is one (period, category, type) bucket; a
+    monthly period is dated on the first day of its month.
+    """
+    if not totals:
+        return pd.DataFrame()
+
+    df = pd.DataFrame(totals).rename(columns={"period": "transaction_date", "total_amount": "amount"})
+    # 'YYYY-MM' (monthly) periods are dated on the 1st of the month.
+    df["transaction_date"] = pd.to_datetime(
+        df["transaction_date"].where(df["transaction_date"].str.len() > 7, df["transaction_date"] + "-01")
+    )
+    df["category"] = df["category"].fillna("Uncategorized")
+    return df
+
+
 def df_to_csv_bytes(df: pd.DataFrame) -> bytes:
     """
     Convert a DataFrame to UTF-8 CSV bytes (no index).
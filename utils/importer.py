@@ -0,0 +1,340 @@
+"""
+Bulk import of bank statements (CSV / XLSX) into the transactions table.
+
+Rows are streamed from the file, mapped onto the transactions schema and
+inserted in large executemany batches inside one DB transaction via
+DatabaseManager.add_transactions_bulk. Rows that cannot be mapped are
+reported as RowError entries instead of aborting the whole import.
+
+CLI usage (from the project root):
+    python -m utils.importer statement.csv --account-id 3
+    python -m utils.importer statement.xlsx --account-id 3 --db data/expenses.db
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import io
+import math
+import os
+import re
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from database.db_manager import DatabaseManager
+
+
+# ---------- Column mapping ----------
+
+# Header names (lower-cased, stripped) recognised for each target field.
+COLUMN_ALIASES: Dict[str, List[str]] = {
+    "transaction_date": [
+        "transaction_date", "date", "transaction date", "txn date",
+        "value date", "posting date", "tran date",
+    ],
+    "description": [
+        "description", "narration", "details", "particulars",
+        "remarks", "memo", "transaction details",
+    ],
+    "amount": ["amount", "transaction amount", "amt"],
+    "type": ["type", "dr/cr", "cr/dr", "debit/credit", "transaction type"],
+    "category": ["category"],
+    "debit": ["debit", "withdrawal", "withdrawal amt", "withdrawal amount", "debit amount"],
+    "credit": ["credit", "deposit", "deposit amt", "deposit amount", "credit amount"],
+}
+
+TYPE_VALUES = {
+    "income": "income",
+    "credit": "income",
+    "cr": "income",
+    "expense": "expense",
+    "debit": "expense",
+    "dr": "expense",
+}
+
+DATE_FORMATS = ["%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y", "%d/%m/%y", "%d-%m-%y", "%d.%m.%Y", "%d %b %Y"]
+
+MAX_REPORTED_ERRORS = 1000
+
+_AMOUNT_JUNK = re.compile(r"[₹,\s]|rs\.?|inr", re.IGNORECASE)
+
+Row = Tuple[int, str, float, str, str, str]
+
+
+@dataclass
+class RowError:
+    line: int
+    message: str
+
+
+@dataclass
+class ImportResult:
+    inserted: int = 0
+    error_count: int = 0
+    # Only the first MAX_REPORTED_ERRORS errors are kept.
+    errors: List[RowError] = field(default_factory=list)
+    seconds: float = 0.0
+
+    def add_error(self, line: int, message: str) -> None:
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(RowError(line, message))
+
+
+def map_columns(header: Sequence[Any]) -> Dict[str, int]:
+    """
+    Map target field names to column indexes using COLUMN_ALIASES.
+    Raises ValueError if the header lacks a date column or any amount column.
+    """
+    normalized = [str(h).strip().lower() if h is not None else "" for h in header]
+    mapping: Dict[str, int] = {}
+    for target, aliases in COLUMN_ALIASES.items():
+        for idx, name in enumerate(normalized):
+            if name in aliases:
+                mapping[target] = idx
+                break
+
+    if "transaction_date" not in mapping:
+        raise ValueError("No date column found in header")
+    if "amount" not in mapping and "debit" not in mapping and "credit" not in mapping:
+        raise ValueError("No amount (or debit/credit) column found in header")
+    return mapping
+
+
+# ---------- Value parsing ----------
+
+@lru_cache(maxsize=4096)
+def _parse_date_str(value: str) -> str:
+    # Statements repeat the same few hundred dates, so this is cached.
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).date().isoformat()
+        except ValueError:
+            continue
+    raise ValueError(f"Unrecognised date '{value}'")
+
+
+def _parse_date(value: Any) -> str:
+    if isinstance(value, str) and value:
+        return _parse_date_str(value.strip())
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    if value is None or str(value).strip() == "":
+        raise ValueError("Missing date")
+    return _parse_date_str(str(value).strip())
+
+
+def _parse_amount(value: Any) -> Optional[float]:
+    if value is None or value == "":
+        return None
+    try:
+        amount = float(value)
+    except ValueError:
+        text = _AMOUNT_JUNK.sub("", str(value))
+        if not text:
+            return None
+        if text.startswith("(") and text.endswith(")"):
+            text = "-" + text[1:-1]
+        amount = float(text)
+    # float() also reads "nan", "inf" and overflows like "1e400"; none of
+    # them is an amount, and they would poison balances and rollups.
+    if not math.isfinite(amount):
+        raise ValueError(f"Amount is not a finite number: {value!r}")
+    return amount
+
+
+def make_row_normalizer(mapping: Dict[str, int], account_id: int) -> Callable[[Sequence[Any]], Row]:
+    """
+    Build a function that turns one statement row into an insert tuple
+    for the transactions table. The column lookups are resolved once here
+    rather than per row. The returned function raises ValueError with a
+    readable message if a row cannot be used.
+    """
+    width = max(mapping.values()) + 1
+
+    def column(key: str) -> Callable[[Sequence[Any]], Any]:
+        idx = mapping.get(key)
+        if idx is None:
+            return lambda values: None
+        return lambda values: values[idx]
+
+    get_date = column("transaction_date")
+    get_type = column("type")
+    get_amount = column("amount")
+    get_debit = column("debit")
+    get_credit = column("credit")
+    get_description = column("description")
+    get_category = column("category")
+
+    def normalize(values: Sequence[Any]) -> Row:
+        if len(values) < width:
+            values = list(values) + [None] * (width - len(values))
+
+        tx_date = _parse_date(get_date(values))
+
+        trans_type: Optional[str] = None
+        raw_type = get_type(values)
+        if raw_type is not None and str(raw_type).strip():
+            trans_type = TYPE_VALUES.get(str(raw_type).strip().lower())
+            if trans_type is None:
+                raise ValueError(f"Unknown transaction type '{raw_type}'")
+
+        amount = _parse_amount(get_amount(values))
+        if amount is None:
+            debit = _parse_amount(get_debit(values))
+            if debit:
+                amount, trans_type = debit, trans_type or "expense"
+            else:
+                credit = _parse_amount(get_credit(values))
+                if credit:
+                    amount, trans_type = credit, trans_type or "income"
+        if not amount:
+            raise ValueError("Missing or zero amount")
+
+        if trans_type is None:
+            # Signed single amount column: negative means money going out.
+            trans_type = "expense" if amount < 0 else "income"
+
+        description = get_description(values)
+        category = get_category(values)
+        return (
+            account_id,
+            trans_type,
+            abs(amount),
+            str(description).strip() if description is not None else "",
+            str(category).strip() if category is not None else "",
+            tx_date,
+        )
+
+    return normalize
+
+
+# ---------- Readers ----------
+
+def _csv_rows(source: Union[str, BinaryIO]) -> Iterator[Sequence[Any]]:
+    if isinstance(source, str):
+        with open(source, "r", encoding="utf-8-sig", newline="") as f:
+            yield from csv.reader(f)
+    else:
+        text = io.TextIOWrapper(source, encoding="utf-8-sig", newline="")
+        try:
+            yield from csv.reader(text)
+        finally:
+            text.detach()
+
+
+def _xlsx_rows(source: Union[str, BinaryIO]) -> Iterator[Sequence[Any]]:
+    from openpyxl import load_workbook
+
+    wb = load_workbook(source, read_only=True, data_only=True)
+    try:
+        yield from wb.active.iter_rows(values_only=True)
+    finally:
+        wb.close()
+
+
+def _detect_format(source: Union[str, BinaryIO], fmt: Optional[str]) -> str:
+    if fmt:
+        return fmt.lower()
+    name = source if isinstance(source, str) else getattr(source, "name", "")
+    ext = os.path.splitext(name)[1].lower().lstrip(".")
+    if ext in ("csv", "xlsx"):
+        return ext
+    raise ValueError("Cannot tell the file format; pass fmt='csv' or fmt='xlsx'")
+
+
+# ---------- Public API ----------
+
+def import_statement(
+    db: DatabaseManager,
+    account_id: int,
+    source: Union[str, BinaryIO],
+    fmt: Optional[str] = None,
+    batch_size: int = 50_000,
+) -> ImportResult:
+    """
+    Import a CSV or XLSX statement into `account_id`.
+
+    source: a file path or a binary file object (e.g. a Streamlit upload).
+    fmt: 'csv' or 'xlsx'; guessed from the file name when omitted.
+
+    The first non-empty row is treated as the header. Bad rows are
+    recorded in ImportResult.errors (with their 1-based line number)
+    and skipped; all good rows are inserted in one DB transaction.
+    """
+    fmt = _detect_format(source, fmt)
+    rows = _xlsx_rows(source) if fmt == "xlsx" else _csv_rows(source)
+    result = ImportResult()
+    started = time.perf_counter()
+
+    mapping: Optional[Dict[str, int]] = None
+    line = 0
+    for line, values in enumerate(rows, start=1):
+        if any(v not in (None, "") for v in values):
+            mapping = map_columns(values)
+            break
+    if mapping is None:
+        raise ValueError("The file is empty")
+
+    normalize = make_row_normalizer(mapping, account_id)
+
+    def good_rows() -> Iterator[Row]:
+        for line_no, values in enumerate(rows, start=line + 1):
+            if not any(values):
+                continue
+            try:
+                yield normalize(values)
+            except ValueError as exc:
+                result.add_error(line_no, str(exc))
+
+    result.inserted = db.add_transactions_bulk(good_rows(), batch_size=batch_size)
+    result.seconds = time.perf_counter() - started
+    return result
+
+
+# ---------- CLI ----------
+
+def main(argv: Optional[List[str]] = None) -> int:
+    arg_parser = argparse.ArgumentParser(
+        description="Bulk import a CSV/XLSX bank statement into an account."
+    )
+    arg_parser.add_argument("path", help="Statement file (.csv or .xlsx)")
+    arg_parser.add_argument("--account-id", type=int, required=True)
+    arg_parser.add_argument("--db", default=None, help="SQLite file (default: data/expenses.db)")
+    arg_parser.add_argument("--format", choices=["csv", "xlsx"], default=None)
+    arg_parser.add_argument("--batch-size", type=int, default=50_000)
+    arg_parser.add_argument(
+        "--show-errors", type=int, default=20, help="How many row errors to print"
+    )
+    args = arg_parser.parse_args(argv)
+
+    db = DatabaseManager(db_path=args.db) if args.db else DatabaseManager()
+    try:
+        result = import_statement(
+            db,
+            args.account_id,
+            args.path,
+            fmt=args.format,
+            batch_size=args.batch_size,
+        )
+    finally:
+        db.close()
+
+    print(
+        f"Imported {result.inserted} rows in {result.seconds:.2f}s "
+        f"({result.error_count} rows skipped)."
+    )
+    for err in result.errors[: args.show_errors]:
+        print(f"  line {err.line}: {err.message}")
+    return 0 if result.inserted or not result.error_count else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -84,9 +84,7 @@ def generate_pdf_report(
     else:
         # Limit rows if too many, to avoid huge PDFs (optional)
         max_rows = 100
-        df_display = df.copy()
-        if len(df_display) > max_rows:
-            df_display = df_display.head(max_rows)
+        df_display = df.head(max_rows).copy()
 
         # Select and rename columns for the report
         cols_to_use = []
@@ -0,0 +1,299 @@
+"""
+Process-wide shared resources for the Streamlit app.
+
+Streamlit re-runs app.py on every widget interaction. Building the
+DatabaseManager and NLPParser at module level would reopen SQLite, re-run
+the schema script and rebuild the parser on each rerun, so they are
+created once per process here and shared by all sessions.
+
+Query results are cached too. Every cache key includes
+DatabaseManager.data_version, which changes on each committed write
+(add/update/delete transaction, add/delete account). It includes
+SQLite's data_version of the file, so writes made by another process,
+e.g. a CLI import or another app server, invalidate the cached reads as
+well, on the next rerun of each session.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import pandas as pd
+import streamlit as st
+
+from config import (
+    DB_SHARDING,
+    PARSER_CACHE_SIZE,
+    PARSER_ESCALATION_THRESHOLD,
+    PARSER_SOCKET,
+)
+from database.db_manager import DatabaseManager, PageCursor
+from database.sharding import ShardedDatabaseManager
+from nlp.parser import NLPParser
+from nlp.service import ParserClient
+
+
+# ---------- Shared resources ----------
+
+@st.cache_resource(show_spinner=False)
+def get_db() -> Union[DatabaseManager, ShardedDatabaseManager]:
+    """
+    Single DatabaseManager shared by every session in this process (or
+    its sharded equivalent when DB_SHARDING is set in config.py).
+    """
+    if DB_SHARDING:
+        return ShardedDatabaseManager(mode=DB_SHARDING)
+    return DatabaseManager()
+
+
+def _local_parser() -> NLPParser:
+    return NLPParser(
+        cache_size=PARSER_CACHE_SIZE,
+        escalation_threshold=PARSER_ESCALATION_THRESHOLD,
+    )
+
+
+@st.cache_resource(show_spinner=False)
+def get_parser() -> Union[NLPParser, ParserClient]:
+    """
+    Single NLPParser shared by every session (spaCy loads on first use),
+    or a client of the shared parser service when PARSER_SOCKET is set in
+    config.py; the client parses in-process while the service is down.
+    """
+    if PARSER_SOCKET:
+        return ParserClient(PARSER_SOCKET, fallback=_local_parser)
+    return _local_parser()
+
+
+# ---------- Cached queries ----------
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def _cached_accounts(user_id: int, data_version: int) -> List[Dict[str, Any]]:
+    return get_db().get_all_accounts(user_id=user_id)
+
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def _cached_account_summary(
+    account_id: int,
+    start_date: Optional[str],
+    end_date: Optional[str],
+    data_version: int,
+) -> Dict[str, float]:
+    return get_db().get_account_summary(
+        account_id=account_id,
+        start_date=start_date,
+        end_date=end_date,
+    )
+
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def _cached_accounts_overview(
+    user_id: int,
+    start_date: Optional[str],
+    end_date: Optional[str],
+    data_version: int,
+) -> List[Dict[str, Any]]:
+    return get_db().get_accounts_overview(
+        user_id=user_id,
+        start_date=start_date,
+        end_date=end_date,
+    )
+
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def _cached_transactions_page(
+    account_id: int,
+    start_date: Optional[str],
+    end_date: Optional[str],
+    trans_type: Optional[str],
+    category: Optional[str],
+    limit: int,
+    after: Optional[PageCursor],
+    data_version: int,
+) -> Tuple[List[Dict[str, Any]], Optional[PageCursor]]:
+    return get_db().get_transactions_page(
+        account_id=account_id,
+        start_date=start_date,
+        end_date=end_date,
+        trans_type=trans_type,
+        category=category,
+        limit=limit,
+        after=after,
+    )
+
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def _cached_categories(user_id: int, data_version: int) -> List[Dict[str, Any]]:
+    return get_db().get_categories(user_id=user_id)
+
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def _cached_period_totals(
+    account_id: int,
+    start_date: Optional[str],
+    end_date: Optional[str],
+    trans_type: Optional[str],
+    category: Optional[str],
+    granularity: str,
+    data_version: int,
+) -> List[Dict[str, Any]]:
+    return get_db().get_period_totals(
+        account_id=account_id,
+        start_date=start_date,
+        end_date=end_date,
+        trans_type=trans_type,
+        category=category,
+        granularity=granularity,
+    )
+
+
+@st.cache_data(show_spinner=False, max_entries=128)
+def _cached_search(
+    account_id: int,
+    query: str,
+    start_date: Optional[str],
+    end_date: Optional[str],
+    trans_type: Optional[str],
+    category: Optional[str],
+    limit: int,
+    data_version: int,
+) -> List[Dict[str, Any]]:
+    return get_db().search_transactions(
+        account_id=account_id,
+        query=query,
+        start_date=start_date,
+        end_date=end_date,
+        trans_type=trans_type,
+        category=category,
+        limit=limit,
+    )
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _cached_report_data(
+    account_id: int,
+    start_date: Optional[str],
+    end_date: Optional[str],
+    trans_type: Optional[str],
+    category: Optional[str],
+    data_version: int,
+) -> Tuple[pd.DataFrame, Dict[str, float]]:
+    # One snapshot, so the rows and the totals in a report always agree
+    # even if a write lands in between.
+    with get_db().snapshot() as snap:
+        df = snap.get_transactions_frame(
+            account_id=account_id,
+            start_date=start_date,
+            end_date=end_date,
+            trans_type=trans_type,
+            category=category,
+        )
+        summary = snap.get_account_summary(
+            account_id=account_id,
+            start_date=start_date,
+            end_date=end_date,
+        )
+    return df, summary
+
+
+def load_accounts(user_id: int) -> List[Dict[str, Any]]:
+    return _cached_accounts(user_id, get_db().data_version)
+
+
+def load_account_summary(
+    account_id: int,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+) -> Dict[str, float]:
+    return _cached_account_summary(
+        account_id, start_date, end_date, get_db().data_version
+    )
+
+
+def load_accounts_overview(
+    user_id: int,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    return _cached_accounts_overview(
+        user_id, start_date, end_date, get_db().data_version
+    )
+
+
+def load_report_data(
+    account_id: int,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    trans_type: Optional[str] = None,
+    category: Optional[str] = None,
+) -> Tuple[pd.DataFrame, Dict[str, float]]:
+    """
+    Filtered transactions as a DataFrame plus the account summary for the
+    date range, read from one consistent snapshot (for the downloads).
+    """
+    return _cached_report_data(
+        account_id, start_date, end_date, trans_type, category, get_db().data_version
+    )
+
+
+def load_transactions_page(
+    account_id: int,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    trans_type: Optional[str] = None,
+    category: Optional[str] = None,
+    limit: int = 50,
+    after: Optional[PageCursor] = None,
+) -> Tuple[List[Dict[str, Any]], Optional[PageCursor]]:
+    return _cached_transactions_page(
+        account_id,
+        start_date,
+        end_date,
+        trans_type,
+        category,
+        limit,
+        after,
+        get_db().data_version,
+    )
+
+
+def load_categories(user_id: int) -> List[Dict[str, Any]]:
+    return _cached_categories(user_id, get_db().data_version)
+
+
+def load_period_totals(
+    account_id: int,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    trans_type: Optional[str] = None,
+    category: Optional[str] = None,
+    granularity: str = "month",
+) -> List[Dict[str, Any]]:
+    return _cached_period_totals(
+        account_id,
+        start_date,
+        end_date,
+        trans_type,
+        category,
+        granularity,
+        get_db().data_version,
+    )
+
+
+def load_search_results(
+    account_id: int,
+    query: str,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    trans_type: Optional[str] = None,
+    category: Optional[str] = None,
+    limit: int = 50,
+) -> List[Dict[str, Any]]:
+    return _cached_search(
+        account_id,
+        query,
+        start_date,
+        end_date,
+        trans_type,
+        category,
+        limit,
+        get_db().data_version,
+    )